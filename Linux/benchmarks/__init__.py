@@ -0,0 +1,44 @@
+# benchmarks/__init__.py
+"""
+Benchmarks sin pantalla ni tarjeta de sonido.
+
+    python -m benchmarks                      # todo, tamaños completos
+    python -m benchmarks --quick              # tamaños chicos (para probar)
+    python -m benchmarks --only ingesta,estado
+    python -m benchmarks --compare benchmarks/resultados/anterior.json
+
+Cada suite (bench_*.py) expone run(quick) -> lista de resultados; el runner
+los guarda en JSON (por defecto en benchmarks/resultados/, fuera de git)
+para comparar entre versiones. Los widgets de Tk y el
+mixer de pygame se reemplazan por los stubs de benchmarks.stubs.
+"""
+import os
+import sys
+import time
+
+# Los benchmarks importan utils.* como lo hace main.py (desde la carpeta de la app)
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _APP_DIR not in sys.path:
+    sys.path.insert(0, _APP_DIR)
+
+
+def best_of(fn, repeat=5, setup=None) -> float:
+    """Mejor tiempo (s) de `repeat` corridas; setup() se llama antes de cada una sin medirse."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def result(suite, name, n, seconds, **extra) -> dict:
+    """Un renglón del JSON: suite/nombre/tamaño y el mejor tiempo."""
+    row = {"suite": suite, "name": name, "n": n, "seconds": seconds}
+    row.update(extra)
+    return row
+
+
+__all__ = ["best_of", "result"]
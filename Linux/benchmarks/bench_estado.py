@@ -0,0 +1,58 @@
+# benchmarks/bench_estado.py
+"""
+Persistencia: save_state / load_state con playlists de tamaño creciente
+(y 100 eventos programados), sobre StubTreeview y un archivo temporal.
+"""
+import os
+import tempfile
+from datetime import datetime
+
+from benchmarks import best_of, result
+from benchmarks.biblioteca import write_wav
+from benchmarks.bench_programacion import make_events
+from benchmarks.stubs import StubTreeview
+
+SUITE = "estado"
+SIZES = (100, 1000, 10000, 50000)
+QUICK_SIZES = (100, 1000)
+EVENTS = 100
+
+
+def _filled_playlist(n, folder):
+    from utils.playlist_model import playlist_insert
+    playlist = StubTreeview()
+    for i in range(n):
+        path = os.path.join(folder, f"artista_{i // 500:03d}", f"pista_{i:05d}.mp3")
+        playlist_insert(playlist, (os.path.basename(path), 180 + i % 240, path))
+    return playlist
+
+
+def run(quick=False):
+    from utils import events as evmod
+    from utils.state import save_state, load_state
+
+    rows = []
+    repeat = 3 if quick else 5
+    with tempfile.TemporaryDirectory() as folder:
+        audio_file = os.path.join(folder, "aviso.wav")
+        write_wav(audio_file)
+        target = os.path.join(folder, "estado_bench.pkl")
+        saved = list(evmod.eventos)
+        try:
+            evmod.eventos[:] = make_events(EVENTS, datetime.now(), audio_file)
+            for n in (QUICK_SIZES if quick else SIZES):
+                playlist = _filled_playlist(n, folder)
+                event_list = StubTreeview()
+
+                t = best_of(lambda: save_state(playlist, event_list, None, file_path=target), repeat)
+                rows.append(result(SUITE, "save_state", n, t, bytes=os.path.getsize(target)))
+
+                other, other_events = StubTreeview(), StubTreeview()
+                t = best_of(lambda: load_state(other, other_events, None, file_path=target), repeat)
+                rows.append(result(SUITE, "load_state", n, t))
+        finally:
+            evmod.eventos[:] = saved
+    return rows
+
+
+__all__ = ["run"]
@@ -0,0 +1,40 @@
+# benchmarks/bench_simulador.py
+"""
+Programador completo con reloj virtual (benchmarks.simulador): días de
+programación sintética, 10..100 eventos, cronometrando la corrida entera.
+Además de tiempo, cada renglón trae si algún evento no se disparó o salió
+fuera de tolerancia: sirve de regresión del programador.
+"""
+from datetime import datetime
+
+from benchmarks import result
+from benchmarks.simulador import simulate, synthetic
+
+SUITE = "simulador"
+SIZES = (10, 100)
+DAYS = 7.0
+QUICK_DAYS = 1.0
+
+
+def run(quick=False):
+    from utils import events as evmod
+
+    rows = []
+    days = QUICK_DAYS if quick else DAYS
+    start = datetime(2025, 1, 6, 8, 0, 0)     # fijo: corridas comparables
+    saved = list(evmod.eventos)
+    try:
+        for n in SIZES:
+            playlist, eventos, durations = synthetic(n, 200, start, days)
+            sim = simulate(playlist, eventos, start, days, durations)
+            s = sim.summary()
+            rows.append(result(SUITE, f"{days:g}_dias", n, sim.elapsed,
+                               vueltas=s["vueltas"],
+                               faltantes=s["eventos_esperados"] - s["eventos_disparados"],
+                               fuera_de_tolerancia=s["eventos_fuera_de_tolerancia"]))
+    finally:
+        evmod.eventos[:] = saved
+    return rows
+
+
+__all__ = ["run"]
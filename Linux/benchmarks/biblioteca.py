@@ -0,0 +1,105 @@
+# benchmarks/biblioteca.py
+"""
+Bibliotecas sintéticas: WAV en silencio y MP3 hechos solo de encabezados.
+
+Los MP3 son frames MPEG1 Layer III (128 kbps, 44.1 kHz) con payload en
+ceros: mutagen y utils.audio_header los leen igual que uno real.
+"""
+import os
+import struct
+
+# MPEG1 Layer III, 128 kbps, 44100 Hz, estéreo -> frames de 417 bytes
+MP3_HEADER = b"\xff\xfb\x90\x00"
+MP3_FRAME_LEN = 417
+
+
+def write_wav(path, seconds=0.1, rate=44100, channels=2, bits=16):
+    block = channels * bits // 8
+    data = b"\x00" * (int(rate * seconds) * block)
+    fmt = struct.pack("<HHIIHH", 1, channels, rate, rate * block, block, bits)
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data)) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<I", len(fmt)) + fmt)
+        f.write(b"data" + struct.pack("<I", len(data)) + data)
+
+
+def mp3_frames(n):
+    return (MP3_HEADER + b"\x00" * (MP3_FRAME_LEN - 4)) * n
+
+
+def mp3_vbr_frame(frames, vbri=False):
+    """Primer frame con encabezado Xing (+ tag LAME) o VBRI que declara `frames`."""
+    body = bytearray(MP3_FRAME_LEN - 4)
+    if vbri:
+        header = b"VBRI" + struct.pack(">HHHIIHHHH", 1, 0, 75, frames * MP3_FRAME_LEN, frames, 0, 1, 2, 1)
+    else:
+        xing = b"Xing" + struct.pack(">III", 0x1 | 0x2, frames, frames * MP3_FRAME_LEN)
+        lame = b"LAME3.100" + bytes(12) + bytes((0x24, 0x00, 0x00))   # delay 576, padding 0
+        header = xing + lame
+    body[32:32 + len(header)] = header
+    return MP3_HEADER + bytes(body)
+
+
+def id3v2(size):
+    synchsafe = bytes(((size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F))
+    return b"ID3\x04\x00\x00" + synchsafe + b"\x00" * size
+
+
+def write_mp3(path, payload):
+    with open(path, "wb") as f:
+        f.write(payload)
+
+
+def build_tree(folder, n_tracks, per_folder=50, extras_every=10):
+    """
+    Carpeta con `n_tracks` pistas repartidas en subcarpetas anidadas
+    (artista/álbum), más algún .jpg/.txt que el recorrido debe ignorar.
+    Devuelve las rutas de las pistas en el orden en que se crearon.
+    """
+    paths = []
+    for i in range(n_tracks):
+        album = i // per_folder
+        sub = os.path.join(folder, f"artista_{album // 10:03d}", f"album_{album:04d}")
+        if i % per_folder == 0:
+            os.makedirs(sub, exist_ok=True)
+            with open(os.path.join(sub, "portada.jpg"), "wb") as f:
+                f.write(b"\xff\xd8\xff")
+        if i % 2:
+            path = os.path.join(sub, f"pista_{i:05d}.mp3")
+            write_mp3(path, mp3_frames(4))
+        else:
+            path = os.path.join(sub, f"pista_{i:05d}.wav")
+            write_wav(path, seconds=0.01)
+        if extras_every and i % extras_every == 0:
+            with open(os.path.join(sub, f"notas_{i:05d}.txt"), "w") as f:
+                f.write("x")
+        paths.append(path)
+    return paths
+
+
+def build_duration_library(folder, per_kind):
+    """Un archivo por tipo y por índice: WAV PCM, MP3 CBR, Xing+LAME, VBRI y con ID3v2 grande."""
+    paths = []
+    for i in range(per_kind):
+        frames = 300 + 37 * i
+        kinds = {
+            f"pcm_{i}.wav": None,
+            f"cbr_{i}.mp3": mp3_frames(frames),
+            f"xing_{i}.mp3": mp3_vbr_frame(frames) + mp3_frames(frames),
+            f"vbri_{i}.mp3": mp3_vbr_frame(frames, vbri=True) + mp3_frames(frames),
+            f"id3_{i}.mp3": id3v2(200 * 1024) + mp3_frames(frames),
+        }
+        for name, payload in kinds.items():
+            path = os.path.join(folder, name)
+            if payload is None:
+                write_wav(path, 2 + i % 5)
+            else:
+                write_mp3(path, payload)
+            paths.append(path)
+    return paths
+
+
+__all__ = [
+    "write_wav", "mp3_frames", "mp3_vbr_frame", "id3v2", "write_mp3",
+    "build_tree", "build_duration_library",
+]
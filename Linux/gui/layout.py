@@ -8,18 +8,20 @@ from .botones import crear_controles
 from .tabla_de_reproduccion import crear_tabla_reproduccion
 from .tabla_de_eventos import crear_tabla_eventos
 from .barra_de_progreso import crear_barra_progreso, iniciar_animacion_progress
+from .indicador_carga import crear_indicador_carga
 from .explorador import crear_explorador
 from .menu_app import crear_menu
 from .animation import fade_in_window, slide_pad_in, bind_hover_lift
 from .dnd import install_dnd_glow
-from .window import crear_root
+from .window import crear_root, when_dnd_ready
 
 
 # ---- helper: eliminar selección del playlist ----
 def _eliminar_seleccion_playlist(playlist):
-    seleccion = playlist.selection()
-    for item in seleccion:
-        playlist.delete(item)
+    from utils.playlist import playlist_delete  # mantiene el modelo de la playlist
+    from utils.persistence import persistence
+    playlist_delete(playlist, *playlist.selection())
+    persistence.mark_dirty(playlist)
 
 
 # ---------------------- MAIN ----------------------
@@ -61,6 +63,9 @@ def create_gui():
     progress_bar.pack(padx=10, pady=10)
     iniciar_animacion_progress(progress_bar, speed_px=4, margin=2, bootstyle="primary")
 
+    # Indicador de carga (duraciones en segundo plano); oculto hasta que haya trabajo
+    indicador_carga, cancelar_carga_button = crear_indicador_carga(frame_mode)
+
     # Playlist
     frame_playlist, playlist = crear_tabla_reproduccion(root)
 
@@ -94,8 +99,9 @@ def create_gui():
     for b in botones.values():
         bind_hover_lift(root, b)
 
-    install_dnd_glow(root, tree, frame_explorer)
-    install_dnd_glow(root, playlist, frame_playlist)
+    # tkdnd se carga después de la primera ventana (ver gui.window.enable_dnd)
+    when_dnd_ready(root, lambda: install_dnd_glow(root, tree, frame_explorer))
+    when_dnd_ready(root, lambda: install_dnd_glow(root, playlist, frame_playlist))
 
     # ---- Contexto para menú: refs a widgets que el menú usará ----
     ctx = {
@@ -110,6 +116,8 @@ def create_gui():
         "mode_selector": mode_selector,
         "playlist": playlist,
         "progress_bar": progress_bar,
+        "indicador_carga": indicador_carga,
+        "cancelar_carga_button": cancelar_carga_button,
     }
 
     # Menú (al final, ya con ctx listo)
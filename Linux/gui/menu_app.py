@@ -3,10 +3,12 @@ import ttkbootstrap as ttkb
 from tkinter import filedialog, messagebox
 
 from utils.state import save_state, load_state
+from .ventana_agenda import abrir_agenda
 
 def _clear_ui(ctx):
     try:
-        ctx["playlist"].delete(*ctx["playlist"].get_children(""))
+        from utils.playlist import playlist_clear
+        playlist_clear(ctx["playlist"])
     except Exception:
         pass
     try:
@@ -67,5 +69,9 @@ def crear_menu(root, ctx):
     file_menu.add_command(label="Salir", command=root.quit)
 
     menu_bar.add_cascade(label="Archivo", menu=file_menu)
+
+    view_menu = ttkb.Menu(menu_bar, tearoff=0)
+    view_menu.add_command(label="Agenda (24 h)", command=lambda: abrir_agenda(root))
+    menu_bar.add_cascade(label="Ver", menu=view_menu)
     root.config(menu=menu_bar)
     return menu_bar
@@ -0,0 +1,62 @@
+# gui/ventana_agenda.py
+import os
+
+import ttkbootstrap as ttkb
+
+from utils import reloj
+from utils.agenda import HORIZON
+from utils.state import _format_repeat
+
+
+def abrir_agenda(root):
+    """Ventana con lo que va a sonar en las próximas 24 h (lee la agenda materializada)."""
+    from utils import events as evmod
+
+    win = ttkb.Toplevel(root)
+    win.title("Agenda (próximas 24 h)")
+    win.geometry("560x420")
+    win.grid_rowconfigure(0, weight=1)
+    win.grid_columnconfigure(0, weight=1)
+
+    tabla = ttkb.Treeview(win, columns=("Hora", "Evento", "Repetir", "Archivo"), show="headings")
+    tabla.heading("Hora", text="⏱️ Hora", anchor="center")
+    tabla.heading("Evento", text="🎵 Evento", anchor="w")
+    tabla.heading("Repetir", text="🔁 Repetir", anchor="center")
+    tabla.heading("Archivo", text="📄 Archivo", anchor="w")
+    tabla.column("Hora",    width=90,  anchor="center", stretch=False)
+    tabla.column("Evento",  width=170, anchor="w")
+    tabla.column("Repetir", width=110, anchor="center", stretch=False)
+    tabla.column("Archivo", width=170, anchor="w")
+
+    sb = ttkb.Scrollbar(win, orient="vertical", command=tabla.yview)
+    tabla.configure(yscrollcommand=sb.set)
+    tabla.grid(row=0, column=0, sticky="nsew", padx=(10, 0), pady=10)
+    sb.grid(row=0, column=1, sticky="ns", pady=10, padx=(0, 10))
+
+    total = ttkb.Label(win, text="")
+    total.grid(row=1, column=0, sticky="w", padx=10)
+
+    def refrescar():
+        tabla.delete(*tabla.get_children(""))
+        ahora = reloj.now()
+        disparos = evmod.eventos.agenda.window(ahora, ahora + HORIZON)
+        hoy = ahora.date()
+        for hora, ev in disparos:
+            texto = hora.strftime("%H:%M:%S")
+            if hora.date() != hoy:
+                texto += " (+1)"
+            tabla.insert("", "end", values=(
+                texto,
+                ev.get("nombre", ""),
+                _format_repeat(ev.get("intervalo_repeticion")),
+                os.path.basename(ev.get("archivo") or ""),
+            ))
+        total.configure(text=f"{len(disparos)} disparo(s) hasta {(ahora + HORIZON).strftime('%d/%m %H:%M')}")
+
+    ttkb.Button(win, text="🔄 Actualizar", bootstyle="secondary-outline", command=refrescar)\
+        .grid(row=1, column=0, sticky="e", padx=10, pady=(0, 10))
+    refrescar()
+    return win
+
+
+__all__ = ["abrir_agenda"]
@@ -1,33 +1,32 @@
 import os
 import sys
 import platform
-import random
-import pickle
-import pygame
-from datetime import datetime, timedelta
 from tkinter import TclError
 
-from mutagen.mp3 import MP3
-from mutagen.wave import WAVE
+from utils import startup  # primero: mide lo que viene (--startup-profile)
+
+with startup.phase("import gui (tkinter/ttkbootstrap)"):
+    from gui import create_gui
+    from gui.indicador_carga import actualizar_indicador_carga
+    from gui.window import enable_dnd
+with startup.phase("import utils"):
+    from utils import (
+        save_state, load_state, load_playlist, save_playlist,
+        new_playlist, update_play_mode, on_drop,
+    )
+    from utils import audio
+    from utils.explorer import setup_explorer
+    from utils.probing import prober
+    from utils.persistence import persistence
+    # Para fallback de Wayland (pegar rutas/URIs)
+    from utils.ingestion import ingest_paths, cancel_ingestion
 
-# DnD
+from urllib.parse import urlparse, unquote  # normalizar file:// URIs
+
+# DnD (el módulo Python es liviano; la librería Tcl se carga tras la primera ventana)
 import tkinterdnd2 as td
 from tkinterdnd2 import DND_FILES, DND_TEXT
 
-from gui import create_gui
-from utils import (
-    save_state, load_state, load_playlist, save_playlist,
-    new_playlist, update_play_mode,
-    on_drop, play_song, pause_song, stop_song,
-    next_song, open_event_window
-)
-from utils.explorer import setup_explorer
-from utils.programacion import start_event_loop  # ⬅️ LOOP DE EVENTOS
-# Para fallback de Wayland (pegar rutas/URIs)
-from utils.playlist import add_to_playlist, find_music_files
-
-from urllib.parse import urlparse, unquote  # normalizar file:// URIs
-
 
 # ===================== TKDND PATH PORTABLE (venv / PyInstaller) =====================
 
@@ -87,25 +86,23 @@ def _paste_into_playlist(root, playlist):
     except Exception:
         return 0
 
-    total = 0
-    for item in _parse_text_uri_list(data):
-        p = _to_fs_path(item)
-        if os.path.isdir(p):
-            files = find_music_files(p)
-            add_to_playlist(files, playlist)
-            total += len(files)
-        elif os.path.isfile(p):
-            add_to_playlist([p], playlist)
-            total += 1
-    if total == 0:
-        print("[paste] No se agregaron pistas (duplicados/extensiones no válidas).")
-    return total
+    paths = [p for p in (_to_fs_path(item) for item in _parse_text_uri_list(data))
+             if os.path.isdir(p) or os.path.isfile(p)]
+
+    def _done(total):
+        if total == 0:
+            print("[paste] No se agregaron pistas (duplicados/extensiones no válidas).")
+
+    # Ingesta en streaming: regresa de inmediato, las pistas entran por lotes
+    ingest_paths(playlist, paths, on_done=_done)
+    return len(paths)
 
 
 # ================================== APP ==================================
 
 def run():
-    gui = create_gui()
+    with startup.phase("create_gui"):
+        gui = create_gui()
 
     root = gui["root"]
     tree = gui["tree"]
@@ -118,59 +115,101 @@ def run():
     mode_selector = gui["mode_selector"]
     playlist = gui["playlist"]
     progress_bar = gui["progress_bar"]
-
-    # Cargar tkdnd
-    try:
-        root.tk.eval(f'source "{tkdnd_path}"')
-        root.tk.eval(f'source "{tkdnd_unix_path}"')
-        # Asegurar package require (por si acaso)
-        try:
-            root.tk.call('package', 'require', 'tkdnd')
-        except TclError:
-            pass
-    except TclError as e:
-        print(f"⚠️ Error cargando tkdnd: {e}")
-        print(f"Archivos usados:\n  {tkdnd_path}\n  {tkdnd_unix_path}")
+    indicador_carga = gui["indicador_carga"]
+    cancelar_carga_button = gui["cancelar_carga_button"]
 
     setup_explorer(tree, playlist)
 
-    # --- DnD vs Wayland fallback ---
-    session = (os.environ.get("XDG_SESSION_TYPE") or "").lower()
-    if session == "wayland":
-        # En Wayland, Tk corre en XWayland y Nautilus en Wayland → DnD no llega.
-        # Fallback: pegar desde portapapeles (Ctrl+V / Ctrl+Shift+V)
-        root.bind_all("<Control-v>", lambda e: _paste_into_playlist(root, playlist))
-        root.bind_all("<Control-V>", lambda e: _paste_into_playlist(root, playlist))
-        root.bind_all("<Control-Shift-v>", lambda e: _paste_into_playlist(root, playlist))
-        root.bind_all("<Control-Shift-V>", lambda e: _paste_into_playlist(root, playlist))
-        print("[info] Sesión Wayland detectada: usando fallback de Pegar (Ctrl+V).")
-    else:
-        # Xorg: DnD sí funciona
+    def _setup_dnd():
+        """tkdnd + registro de DnD (o fallback de pegar en Wayland)."""
+        enable_dnd(root)
         try:
-            playlist.drop_target_register(DND_FILES, DND_TEXT)
-            playlist.dnd_bind('<<Drop>>', lambda e: on_drop(e, root, playlist))
+            with startup.phase("tkdnd (source .tcl)"):
+                root.tk.eval(f'source "{tkdnd_path}"')
+                root.tk.eval(f'source "{tkdnd_unix_path}"')
+                # Asegurar package require (por si acaso)
+                try:
+                    root.tk.call('package', 'require', 'tkdnd')
+                except TclError:
+                    pass
         except TclError as e:
-            print(f"[DnD] No se pudo registrar DnD ({e}). Activando fallback pegar.")
+            print(f"⚠️ Error cargando tkdnd: {e}")
+            print(f"Archivos usados:\n  {tkdnd_path}\n  {tkdnd_unix_path}")
+
+        # --- DnD vs Wayland fallback ---
+        session = (os.environ.get("XDG_SESSION_TYPE") or "").lower()
+        if session == "wayland":
+            # En Wayland, Tk corre en XWayland y Nautilus en Wayland → DnD no llega.
+            # Fallback: pegar desde portapapeles (Ctrl+V / Ctrl+Shift+V)
             root.bind_all("<Control-v>", lambda e: _paste_into_playlist(root, playlist))
             root.bind_all("<Control-V>", lambda e: _paste_into_playlist(root, playlist))
-
-    # Botones y bindings
-    add_event_button.config(command=lambda: open_event_window(root, event_list))
-    play_button.config(command=lambda: play_song(root, playlist, progress_bar))
-    pause_button.config(command=lambda: pause_song(playlist, mode_selector))
-    stop_button.config(command=lambda: stop_song(playlist))
-    next_button.config(command=lambda: next_song(root, playlist, progress_bar))
+            root.bind_all("<Control-Shift-v>", lambda e: _paste_into_playlist(root, playlist))
+            root.bind_all("<Control-Shift-V>", lambda e: _paste_into_playlist(root, playlist))
+            print("[info] Sesión Wayland detectada: usando fallback de Pegar (Ctrl+V).")
+        else:
+            # Xorg: DnD sí funciona
+            try:
+                playlist.drop_target_register(DND_FILES, DND_TEXT)
+                playlist.dnd_bind('<<Drop>>', lambda e: on_drop(e, root, playlist))
+            except TclError as e:
+                print(f"[DnD] No se pudo registrar DnD ({e}). Activando fallback pegar.")
+                root.bind_all("<Control-v>", lambda e: _paste_into_playlist(root, playlist))
+                root.bind_all("<Control-V>", lambda e: _paste_into_playlist(root, playlist))
+
+    def _bind_player_buttons():
+        """Reproductor y eventos (programacion, events, widgets): tras la primera ventana."""
+        with startup.phase("import player/eventos"):
+            from utils import play_song, pause_song, stop_song, next_song, open_event_window
+        add_event_button.config(command=lambda: open_event_window(root, event_list))
+        play_button.config(command=lambda: play_song(root, playlist, progress_bar))
+        pause_button.config(command=lambda: pause_song(playlist, mode_selector))
+        stop_button.config(command=lambda: stop_song(playlist))
+        next_button.config(command=lambda: next_song(root, playlist, progress_bar))
+
+    # Progreso / cancelación de la ingesta y lectura de duraciones en segundo plano
+    prober.add_progress_listener(
+        lambda hechas, total: actualizar_indicador_carga(indicador_carga, "Leyendo duraciones", hechas, total)
+    )
+    cancelar_carga_button.config(command=cancel_ingestion)
 
     mode_selector.bind("<<ComboboxSelected>>",
                        lambda e: update_play_mode(e, mode_selector, playlist))
 
-    # Cargar estado (incluye eventos)
-    load_state(playlist, event_list, mode_selector)
+    def _after_first_frame():
+        """Lo que no hace falta para ver la ventana: reproductor, DnD, estado, loop y audio."""
+        startup.mark("primera ventana")
+        _bind_player_buttons()
+        _setup_dnd()
+
+        # Cargar estado (incluye eventos)
+        with startup.phase("load_state"):
+            load_state(playlist, event_list, mode_selector)
+        persistence.bind(playlist, event_list, mode_selector)
+
+        # Programador de eventos: hilo propio que duerme hasta el próximo plazo
+        from utils.programacion import start_event_loop
+        start_event_loop(root, progress_bar, playlist)
+
+        # pygame + mixer en segundo plano: el primer Play/evento ya lo encuentra listo
+        audio.warm_up()
+        startup.report()
+
+    # after_idle corre tras el primer repintado; el after(0) lo deja para la vuelta siguiente
+    root.after_idle(lambda: root.after(0, _after_first_frame))
 
-    # Loop de eventos (cada ~1s)
-    start_event_loop(root, progress_bar, playlist)
+    # Al cerrar: último guardado (si hay cambios pendientes) antes de destruir widgets
+    def _on_close():
+        persistence.shutdown()
+        root.destroy()
+    root.protocol("WM_DELETE_WINDOW", _on_close)
 
     root.mainloop()
+    from utils.scheduler import scheduler
+    scheduler.stop()
+    persistence.shutdown()  # 'Salir' del menú usa root.quit
+    from utils import lateness
+    if lateness.samples():
+        print(lateness.report())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+# tests/__init__.py
+"""
+Pruebas sin pantalla ni tarjeta de sonido (unittest de la biblioteca estándar).
+
+    python -m unittest discover -s tests -t .     # desde la carpeta de la app
+    python -m pytest -q tests                      # si está pytest
+
+Son pruebas diferenciales: cada índice o atajo nuevo se compara contra la
+versión directa (recorrido lineal, fuerza bruta, mutagen). Los archivos y
+widgets falsos salen de benchmarks.biblioteca y benchmarks.stubs.
+"""
+import os
+import sys
+
+# Se importa utils.* como lo hace main.py (desde la carpeta de la app)
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _APP_DIR not in sys.path:
+    sys.path.insert(0, _APP_DIR)
@@ -0,0 +1,149 @@
+# tests/test_agenda.py
+"""
+Agenda (utils.agenda) contra fuerza bruta: los disparos materializados tienen
+que ser exactamente occurrences() de cada evento vivo, pase lo que pase con
+generaciones, bajas perezosas, re-armados sobre la misma grilla y compactación.
+"""
+import os
+import random
+import sys
+import threading
+import unittest
+from datetime import timedelta
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import reloj  # noqa: E402
+from utils.agenda import Agenda, occurrences  # noqa: E402
+
+
+def make_agenda(seconds=3):
+    return Agenda(threading.RLock(), duration_of=lambda ev: ev.get("segundos", seconds))
+
+
+class AgendaTest(unittest.TestCase):
+    def assertMatchesBruteForce(self, ag, events, msg=None):
+        now = reloj.now()
+        start = max(now, ag._start)
+        got = sorted((h, id(e)) for h, e in ag.window(now - timedelta(days=1), now + timedelta(days=2)))
+        got = [g for g in got if g[0] >= start]   # lo vencido puede seguir hasta el próximo refresh
+        want = sorted((h, id(e)) for e in events for h in occurrences(e, start, ag._end))
+        self.assertEqual(got, want, msg)
+
+    def test_random_changes_match_brute_force(self):
+        rng = random.Random(17)
+        now = reloj.now()
+
+        def mk():
+            return {
+                "hora_inicio": now + timedelta(seconds=rng.uniform(-3000, 80000)),
+                "intervalo_repeticion": rng.choice([0, None, 30, 45, 600, 3600]),
+                "segundos": rng.choice([0, 3, 60, 3600]),
+            }
+
+        ag = make_agenda()
+        events = [mk() for _ in range(40)]
+        ag.rebuild(events)
+        for step in range(1500):
+            r = rng.random()
+            if r < 0.3 and events:
+                ev = rng.choice(events)           # disparo: misma grilla, corrida hacia adelante
+                if ev["intervalo_repeticion"]:
+                    ev["hora_inicio"] += timedelta(seconds=ev["intervalo_repeticion"] * rng.randint(0, 3))
+                ag.add(ev)
+            elif r < 0.45 and events:
+                ev = rng.choice(events)           # edición: otra grilla (generación nueva)
+                ev.update(mk())
+                ag.add(ev)
+            elif r < 0.55 and events:
+                ag.discard(events.pop(rng.randrange(len(events))))
+            elif r < 0.65:
+                ev = mk()
+                events.append(ev)
+                ag.add(ev)
+            if step % 50 == 0:
+                self.assertMatchesBruteForce(ag, events, step)
+        self.assertMatchesBruteForce(ag, events)
+
+    def test_discard_is_lazy_then_compacted(self):
+        now = reloj.now()
+        keep = {"hora_inicio": now + timedelta(minutes=1), "intervalo_repeticion": 600}
+        busy = {"hora_inicio": now + timedelta(minutes=1), "intervalo_repeticion": 15}
+        ag = make_agenda()
+        ag.rebuild([keep, busy])
+        live_keep = len(occurrences(keep, ag._start, ag._end))
+        self.assertEqual(len(ag), live_keep + len(occurrences(busy, ag._start, ag._end)))
+
+        ag.discard(busy)
+        # Muchas más muertas que vivas: compacta de una pasada
+        self.assertEqual(ag._stale, 0)
+        self.assertEqual(len(ag._entries), live_keep)
+        self.assertEqual(len(ag), live_keep)
+        self.assertMatchesBruteForce(ag, [keep])
+
+    def test_readd_after_discard_gets_new_generation(self):
+        now = reloj.now()
+        ev = {"hora_inicio": now + timedelta(minutes=5), "intervalo_repeticion": 3600}
+        ag = make_agenda()
+        ag.add(ev)
+        ag.discard(ev)
+        self.assertEqual(len(ag), 0)
+        ag.add(ev)           # mismo objeto (mismo id()): las entradas viejas no reviven
+        self.assertEqual(len(ag), len(occurrences(ev, ag._start, ag._end)))
+        self.assertMatchesBruteForce(ag, [ev])
+
+    def test_same_grid_rearm_only_cuts_the_head(self):
+        now = reloj.now()
+        ev = {"hora_inicio": now + timedelta(minutes=1), "intervalo_repeticion": 60}
+        ag = make_agenda()
+        ag.add(ev)
+        before = len(ag._entries)
+        ev["hora_inicio"] += timedelta(seconds=120)
+        ag.add(ev)
+        # Dos entradas de cabeza pasan a muertas; la cola no se re-materializa
+        self.assertEqual(ag._stale, 2)
+        self.assertEqual(len(ag._entries), before)
+        self.assertMatchesBruteForce(ag, [ev])
+
+    def test_overlapping_matches_brute_force(self):
+        rng = random.Random(19)
+        now = reloj.now()
+        # Duraciones en los bordes de cada clase (2**c - 1, 2**c) y un clip de una hora
+        durations = [0, 1, 2, 3, 4, 7, 8, 63, 64, 3599, 3600]
+        events = [{
+            "hora_inicio": now + timedelta(seconds=rng.uniform(0, 7200)),
+            "intervalo_repeticion": rng.choice([None, 90, 600]),
+            "segundos": rng.choice(durations),
+        } for _ in range(60)]
+        ag = make_agenda()
+        ag.rebuild(events)
+        for _ in range(300):
+            a = now + timedelta(seconds=rng.uniform(0, 9000))
+            b = a + timedelta(seconds=rng.choice([0, 1, 5, 600]))
+            if rng.random() < 0.2:
+                # Justo en el fin de algún disparo (fin >= start es inclusivo)
+                ev = rng.choice(events)
+                hs = occurrences(ev, max(now, ag._start), ag._end)
+                if hs:
+                    a = b = hs[0] + timedelta(seconds=ev["segundos"])
+            got = sorted((h, id(e)) for h, _, e in ag.overlapping(a, b))
+            want = sorted(
+                (h, id(e)) for e in events for h in occurrences(e, max(now, ag._start), ag._end)
+                if h <= b and h + timedelta(seconds=e["segundos"]) >= a
+            )
+            self.assertEqual(got, want, (a, b))
+
+    def test_conflicts_skip_the_event_itself(self):
+        now = reloj.now()
+        clip = {"hora_inicio": now + timedelta(minutes=10), "intervalo_repeticion": None, "segundos": 3600}
+        short = {"hora_inicio": now + timedelta(minutes=40), "intervalo_repeticion": None, "segundos": 5}
+        ag = make_agenda()
+        ag.rebuild([clip, short])
+        self.assertEqual([(h, other) for h, _, other in ag.conflicts(short)],
+                         [(short["hora_inicio"], clip)])
+        self.assertEqual([other for *_, other in ag.conflicts(clip)], [short])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_audio_header.py
+"""
+Lector de encabezados (utils.audio_header) contra mutagen sobre la biblioteca
+sintética de benchmarks.biblioteca, y el caché de utils.metadata cuando la
+lectura falla.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.biblioteca import build_duration_library, mp3_frames, write_mp3, write_wav  # noqa: E402
+from utils import metadata  # noqa: E402
+from utils.audio_header import header_seconds  # noqa: E402
+
+
+def mutagen_seconds(path):
+    from mutagen.mp3 import MP3
+    from mutagen.wave import WAVE
+    audio = MP3(path) if path.lower().endswith(".mp3") else WAVE(path)
+    return audio.info.length
+
+
+class AudioHeaderTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.folder = tmp.name
+
+    def test_matches_mutagen(self):
+        paths = build_duration_library(self.folder, per_kind=6)
+        for path in paths:
+            seconds = header_seconds(path)
+            # Todos los tipos de la biblioteca se resuelven sin caer a mutagen
+            self.assertIsNotNone(seconds, os.path.basename(path))
+            self.assertAlmostEqual(seconds, mutagen_seconds(path), places=3, msg=os.path.basename(path))
+
+    def test_broken_files_fall_back(self):
+        cases = {
+            "vacio.mp3": b"",
+            "basura.mp3": bytes(range(0, 250, 3)) * 4,
+            "cortado.wav": b"RIFF\x00\x00\x00\x00WAVEfmt ",
+            "otro.ogg": mp3_frames(10),
+        }
+        for name, payload in cases.items():
+            path = os.path.join(self.folder, name)
+            write_mp3(path, payload)
+            self.assertIsNone(header_seconds(path), name)
+        self.assertIsNone(header_seconds(os.path.join(self.folder, "no_existe.mp3")))
+
+
+class MetadataCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "pista.wav")
+        write_wav(self.path, seconds=3)
+        # Sin caché en disco y con el LRU vacío
+        for patcher in (mock.patch.object(metadata, "_open_disk", lambda: None),
+                        mock.patch.object(metadata, "_lru", OrderedDict())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_failed_probe_is_not_cached(self):
+        with mock.patch.object(metadata, "_probe", side_effect=[None, 3]) as probe:
+            self.assertEqual(metadata.get_seconds(self.path), 0)
+            self.assertNotIn(self.path, metadata._lru)
+            self.assertEqual(metadata.get_seconds(self.path), 3)   # vuelve a intentar
+            self.assertEqual(metadata.get_seconds(self.path), 3)   # y ahora sí sale del LRU
+        self.assertEqual(probe.call_count, 2)
+
+    def test_unreadable_file_gives_zero(self):
+        path = os.path.join(os.path.dirname(self.path), "roto.mp3")
+        write_mp3(path, b"\x00" * 512)
+        self.assertEqual(metadata.get_duration(path), ("00:00", 0))
+        self.assertNotIn(path, metadata._lru)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# tests/test_event_heap.py
+"""
+EventHeap / EventList contra la selección lineal original de programacion
+(recorrer todos los eventos, quedarse con el segundo más reciente/próximo y
+desempatar con winner_in_bucket).
+"""
+import os
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import events as evmod  # noqa: E402
+from utils import programacion as prog  # noqa: E402
+
+NOW = datetime(2025, 3, 1, 12, 0, 0)
+
+
+def _valid(e):
+    # Disponibilidad fija por nombre de archivo (sin disco ni hilo de fondo)
+    return "ok" in (e.get("archivo") or "")
+
+
+def linear_due(events, now):
+    vencidos = [e for e in events if e.get("hora_inicio") and e["hora_inicio"] <= now]
+    if not vencidos:
+        return None
+    max_sec = max(prog.sec_bucket(e["hora_inicio"]) for e in vencidos)
+    return prog.winner_in_bucket([e for e in vencidos if prog.sec_bucket(e["hora_inicio"]) == max_sec])
+
+
+def linear_future(events, now):
+    futuros = [e for e in events if e.get("hora_inicio") and e["hora_inicio"] > now]
+    if not futuros:
+        return None
+    min_sec = min(prog.sec_bucket(e["hora_inicio"]) for e in futuros)
+    return prog.winner_in_bucket([e for e in futuros if prog.sec_bucket(e["hora_inicio"]) == min_sec])
+
+
+def random_event(rng, i):
+    return {
+        "nombre": rng.choice(["a", "b", "c"]) + str(i % 4),
+        # Pocos segundos distintos: muchos empates dentro del mismo bucket
+        "hora_inicio": NOW + timedelta(seconds=rng.randint(-5, 5), microseconds=rng.randint(0, 999999)),
+        "intervalo_repeticion": rng.choice([None, None, 0, 600, 3600]),
+        "archivo": rng.choice(["/x/ok.wav", "/x/falta.wav"]),
+    }
+
+
+class EventHeapTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(prog, "_has_valid_file", _valid)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(evmod.eventos.clear)
+        evmod.eventos.clear()
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(11)
+        for trial in range(300):
+            evmod.eventos.clear()
+            evmod.eventos.extend(random_event(rng, i) for i in range(rng.randint(0, 25)))
+            # Cambios como los del programa: re-armado, bajas, altas sueltas
+            for _ in range(rng.randint(0, 8)):
+                op = rng.random()
+                if op < 0.4 and evmod.eventos:
+                    ev = rng.choice(evmod.eventos)
+                    ev["hora_inicio"] += timedelta(seconds=rng.randint(-3, 3))
+                    evmod.eventos.reschedule(ev)
+                elif op < 0.7 and evmod.eventos:
+                    evmod.eventos.remove(rng.choice(evmod.eventos))
+                else:
+                    evmod.eventos.append(random_event(rng, trial))
+            for delta in (-6, -1, 0, 0.5, 2, 6):
+                now = NOW + timedelta(seconds=delta)
+                events = list(evmod.eventos)
+                self.assertIs(prog.select_due_event(now), linear_due(events, now), (trial, delta))
+                self.assertIs(prog.next_future_event(now), linear_future(events, now), (trial, delta))
+
+    def test_tie_break_inside_one_second(self):
+        rep = {"nombre": "a", "hora_inicio": NOW.replace(microsecond=900000), "intervalo_repeticion": 30, "archivo": "/x/ok.wav"}
+        one = {"nombre": "z", "hora_inicio": NOW.replace(microsecond=100000), "intervalo_repeticion": None, "archivo": "/x/ok.wav"}
+        broken = {"nombre": "0", "hora_inicio": NOW, "intervalo_repeticion": None, "archivo": "/x/falta.wav"}
+        evmod.eventos.extend([rep, one, broken])
+        # El más tardío dentro del segundo no gana: primero una sola vez con archivo válido
+        self.assertIs(prog.select_due_event(NOW + timedelta(seconds=1)), one)
+        evmod.eventos.remove(one)
+        self.assertIs(prog.select_due_event(NOW + timedelta(seconds=1)), rep)
+
+    def test_hora_changed_without_reschedule(self):
+        early = {"nombre": "a", "hora_inicio": NOW, "intervalo_repeticion": None, "archivo": "/x/ok.wav"}
+        late = {"nombre": "b", "hora_inicio": NOW + timedelta(seconds=10), "intervalo_repeticion": None, "archivo": "/x/ok.wav"}
+        evmod.eventos.extend([early, late])
+        early["hora_inicio"] = NOW + timedelta(seconds=20)   # sin reschedule(): se re-indexa al consultar
+        self.assertIs(prog.next_future_event(NOW), late)
+        self.assertIsNone(prog.select_due_event(NOW + timedelta(seconds=5)))
+        self.assertIs(prog.select_due_event(NOW + timedelta(seconds=25)), early)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,33 @@
-from utils.state import save_state, load_state
-from utils.playlist import load_playlist, save_playlist, new_playlist, update_play_mode, add_to_playlist, on_drop
-from utils.explorer import populate_tree, on_open_node
-from utils.player import play_song, pause_song, stop_song, next_song
-from utils.events import open_event_window
+# Imports perezosos (PEP 562): `from utils import startup` no arrastra pygame,
+# la GUI ni el resto; cada nombre se importa de su módulo al pedirlo.
+import importlib
+
+_EXPORTS = {
+    "save_state": "utils.state",
+    "load_state": "utils.state",
+    "load_playlist": "utils.playlist",
+    "save_playlist": "utils.playlist",
+    "new_playlist": "utils.playlist",
+    "update_play_mode": "utils.playlist",
+    "add_to_playlist": "utils.playlist",
+    "on_drop": "utils.playlist",
+    "populate_tree": "utils.explorer",
+    "on_open_node": "utils.explorer",
+    "play_song": "utils.player",
+    "pause_song": "utils.player",
+    "stop_song": "utils.player",
+    "next_song": "utils.player",
+    "open_event_window": "utils.events",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'utils' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = list(_EXPORTS)
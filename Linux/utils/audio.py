@@ -0,0 +1,409 @@
+# utils/audio.py
+"""
+Acceso perezoso a pygame.mixer.
+
+pygame se importa y el mixer se inicializa recién al primer uso real
+(Play, evento) o en el precalentamiento tras la primera ventana, no al
+importar utils. Las consultas de estado (music_busy) no lo fuerzan: si el
+mixer no existe todavía, no hay nada sonando.
+
+Gapless: queue() encola la pista siguiente en pygame.mixer.music, que la
+empalma sin silencio al terminar la actual. pygame descarta lo encolado con
+load/stop/fadeout; por eso la playlist carga con load() de aquí, que lleva
+la cuenta.
+
+Además de pygame.mixer.music (playlist y eventos leídos de disco) hay una
+'voz' para eventos ya decodificados en memoria (pygame.mixer.Sound, ver
+utils.event_preload): un canal reservado. Para el crossfade (utils.crossfade)
+hay dos canales reservados más, los 'decks': la pista entrante suena en uno
+mientras la saliente (music o el otro deck) baja. busy/position_ms/pause/
+fadeout cubren todas las salidas.
+
+La posición de cada salida sale de un reloj de reproducción propio (marcas
+de reloj.monotonic() al play/pausa/reanudar), no de music.get_pos: get_pos
+ignora el start= de un salto, vuelve a 0 en el empalme gapless y en la
+barra llegaba redondeado al segundo. El reloj da ms y sigue al reloj
+virtual del simulador.
+"""
+import threading
+
+from utils import reloj
+from utils import startup
+
+_lock = threading.Lock()
+_pygame = None
+
+
+def ensure_mixer():
+    """Importa pygame e inicializa el mixer una sola vez; devuelve el módulo pygame."""
+    global _pygame
+    if _pygame is not None:
+        return _pygame
+    with _lock:
+        if _pygame is None:
+            with startup.phase("import pygame"):
+                import pygame
+            with startup.phase("pygame.mixer.init"):
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init()
+            _pygame = pygame
+    return _pygame
+
+
+def music():
+    """pygame.mixer.music, inicializando el mixer si hace falta."""
+    return ensure_mixer().mixer.music
+
+
+def is_ready() -> bool:
+    return _pygame is not None
+
+
+def music_busy() -> bool:
+    """¿Suena algo? Sin mixer inicializado la respuesta es no (y no lo arranca)."""
+    return _pygame is not None and _pygame.mixer.music.get_busy()
+
+
+# ---------------- reloj de reproducción ----------------
+class _PlaybackClock:
+    """Posición (ms) de una salida a partir de marcas monotónicas; la pausa la congela."""
+
+    __slots__ = ("started", "paused_at")
+
+    def __init__(self):
+        self.started = None       # reloj.monotonic() en que la posición valía 0
+        self.paused_at = None
+
+    def start(self, offset_ms=0):
+        self.started = reloj.monotonic() - offset_ms / 1000
+        self.paused_at = None
+
+    def pause(self):
+        if self.started is not None and self.paused_at is None:
+            self.paused_at = reloj.monotonic()
+
+    def resume(self):
+        if self.paused_at is not None:
+            self.started += reloj.monotonic() - self.paused_at
+            self.paused_at = None
+
+    def reset(self):
+        self.started = self.paused_at = None
+
+    @property
+    def paused(self) -> bool:
+        return self.paused_at is not None
+
+    def position_ms(self) -> int:
+        if self.started is None:
+            return 0
+        at = self.paused_at if self.paused_at is not None else reloj.monotonic()
+        return int((at - self.started) * 1000)
+
+
+_music = _PlaybackClock()    # pista en pygame.mixer.music
+
+
+# ---------------- gapless ----------------
+_queued = None           # ruta encolada en music
+_queued_pos = 0          # posición (ms) de la pista en curso al encolar
+
+
+def load(source, namehint=""):
+    """music.load; lo que hubiera encolado se pierde (pygame lo suelta)."""
+    global _queued
+    _queued = None
+    _stop_decks()            # la pista pasa a music: los decks ya no suenan
+    _music.reset()
+    music().set_volume(1.0)
+    if namehint:
+        music().load(source, namehint)
+    else:
+        music().load(source)
+
+
+def play(fade_ms=0, start_ms=0):
+    """music.play de lo cargado con load(); start_ms > 0 arranca más adelante (salto)."""
+    if start_ms > 0:
+        music().play(start=start_ms / 1000, fade_ms=fade_ms)
+    else:
+        music().play(fade_ms=fade_ms)
+    _music.start(start_ms)
+
+
+def queue(source, path, namehint=""):
+    """Encola `source` (ruta o archivo ya leído de `path`) pegada a la pista en curso."""
+    global _queued, _queued_pos
+    _queued_pos = music().get_pos()
+    if namehint:
+        music().queue(source, namehint)
+    else:
+        music().queue(source)
+    _queued = path
+
+
+def queued():
+    return _queued
+
+
+def queue_started() -> bool:
+    """¿El mixer ya pasó a la pista encolada? En el empalme get_pos vuelve a 0."""
+    return _queued is not None and music_busy() and _pygame.mixer.music.get_pos() < _queued_pos
+
+
+def take_queued():
+    """Ruta que empezó a sonar desde la cola (y la cola queda vacía)."""
+    global _queued
+    path, _queued = _queued, None
+    if path is not None:
+        # El reloj pasa a la encolada: lo que lleva sonando desde el empalme
+        _music.start(max(0, music().get_pos()))
+    return path
+
+
+def decode(source, max_mb):
+    """Sound decodificado de `source` (ruta o archivo); None si falla o pasaría de max_mb."""
+    if not is_ready():
+        return None
+    try:
+        sound = _pygame.mixer.Sound(file=source)
+    except Exception:
+        return None
+    return sound if decoded_bytes(sound) <= max_mb * 1024 * 1024 else None
+
+
+def decoded_bytes(sound) -> int:
+    """Memoria que ocupa un Sound decodificado (según el formato del mixer)."""
+    freq, size, channels = _pygame.mixer.get_init()
+    return int(sound.get_length() * freq * channels * abs(size) // 8)
+
+
+def _reserved_channel(index):
+    # Canal 0: voz de eventos; 1 y 2: decks del crossfade
+    pg = ensure_mixer()
+    if pg.mixer.get_num_channels() < RESERVED_CHANNELS:
+        pg.mixer.set_num_channels(RESERVED_CHANNELS)
+    pg.mixer.set_reserved(RESERVED_CHANNELS)
+    return pg.mixer.Channel(index)
+
+
+# ---------------- voz de eventos precargados ----------------
+RESERVED_CHANNELS = 3
+_voice = None            # pygame.mixer.Channel reservado
+_voice_sound = None      # Sound en curso (se suelta al terminar)
+_voice_clock = _PlaybackClock()
+
+
+def _voice_channel():
+    global _voice
+    if _voice is None:
+        _voice = _reserved_channel(0)
+    return _voice
+
+
+def play_sound(sound, fade_ms=0):
+    """Reproduce un evento ya decodificado; corta la música (ya en fade) si sigue."""
+    global _voice_sound, _queued
+    music().stop()
+    _music.reset()
+    _queued = None
+    _stop_decks()
+    _voice_channel().play(sound, fade_ms=fade_ms)
+    _voice_sound = sound
+    _voice_clock.start()
+
+
+def voice_busy() -> bool:
+    return _voice is not None and not _voice_clock.paused and bool(_voice.get_busy())
+
+
+def release_voice():
+    """Suelta el buffer del evento que terminó (o se cortó)."""
+    global _voice_sound
+    if _voice is not None and _voice.get_busy():
+        _voice.stop()
+    _voice_sound = None
+    _voice_clock.reset()
+
+
+# ---------------- decks del crossfade ----------------
+class _Deck:
+    """Canal reservado con una pista de la playlist ya decodificada."""
+
+    def __init__(self, index):
+        self.index = index
+        self.channel = None
+        self.sound = None
+        self.clock = _PlaybackClock()
+
+    def play(self, sound, volume):
+        if self.channel is None:
+            self.channel = _reserved_channel(self.index)
+        self.channel.set_volume(volume)
+        self.channel.play(sound)
+        self.sound = sound
+        self.clock.start()
+
+    def busy(self) -> bool:
+        return self.sound is not None and not self.clock.paused and bool(self.channel.get_busy())
+
+    def set_volume(self, volume):
+        if self.sound is not None:
+            self.channel.set_volume(volume)
+
+    def pause(self):
+        if self.busy():
+            self.channel.pause()
+            self.clock.pause()
+
+    def unpause(self):
+        if self.clock.paused:
+            self.channel.unpause()
+            self.clock.resume()
+
+    def fadeout(self, ms):
+        if self.busy():
+            self.channel.fadeout(ms)
+
+    def stop(self):
+        if self.channel is not None and self.channel.get_busy():
+            self.channel.stop()
+        self.sound = None
+        self.clock.reset()
+
+
+_decks = (_Deck(1), _Deck(2))
+_deck = None             # deck con la pista en curso (None: la pista va por music)
+_outgoing = None         # durante un cruce: "music" o el deck que baja
+
+
+def deck_busy() -> bool:
+    return _deck is not None and _deck.busy()
+
+
+def begin_crossfade(sound):
+    """La pista `sound` arranca en silencio en el deck libre; la actual pasa a ser la saliente."""
+    global _deck, _outgoing
+    if _outgoing is not None:
+        end_crossfade()
+    if deck_busy():
+        _outgoing = _deck
+    elif music_busy():
+        _outgoing = "music"
+    _deck = _decks[1] if _deck is _decks[0] else _decks[0]
+    _deck.play(sound, 0.0)
+
+
+def crossfade_levels(v_in, v_out):
+    if _deck is not None:
+        _deck.set_volume(v_in)
+    if _outgoing == "music":
+        if music_busy():
+            music().set_volume(v_out)
+    elif _outgoing is not None:
+        _outgoing.set_volume(v_out)
+
+
+def crossfading() -> bool:
+    return _outgoing is not None
+
+
+def end_crossfade():
+    """Corta la saliente y deja el volumen de music como estaba."""
+    global _outgoing
+    if _outgoing == "music":
+        if _pygame is not None:
+            music().stop()
+            music().set_volume(1.0)
+        _music.reset()
+    elif _outgoing is not None:
+        _outgoing.stop()
+    _outgoing = None
+
+
+def _stop_decks():
+    global _deck, _outgoing
+    if _outgoing == "music" and _pygame is not None:
+        music().set_volume(1.0)
+    for deck in _decks:
+        deck.stop()
+    _deck = _outgoing = None
+
+
+# ---------------- todas las salidas ----------------
+def busy() -> bool:
+    """¿Suena algo, música, evento en memoria o un deck?"""
+    return music_busy() or voice_busy() or deck_busy()
+
+
+def position_ms() -> int:
+    """Posición de lo que suena, en ms, según el reloj de reproducción de esa salida."""
+    if voice_busy():
+        return _voice_clock.position_ms()
+    if _deck is not None and (_deck.busy() or _deck.clock.paused):
+        return _deck.clock.position_ms()
+    return _music.position_ms()
+
+
+def fadeout(ms):
+    global _queued, _outgoing
+    _queued = None
+    _outgoing = None         # un cruce en curso se abandona: todo baja junto
+    if voice_busy():
+        _voice.fadeout(ms)
+    for deck in _decks:
+        deck.fadeout(ms)
+    if music_busy():
+        music().fadeout(ms)
+
+
+def stop():
+    global _queued
+    _queued = None
+    if _voice is not None:
+        release_voice()
+    _stop_decks()
+    if _pygame is not None:
+        music().stop()
+    _music.reset()
+
+
+def pause():
+    if voice_busy():
+        _voice.pause()
+        _voice_clock.pause()
+    for deck in _decks:
+        deck.pause()
+    if music_busy():
+        music().pause()
+        _music.pause()
+
+
+def unpause():
+    if _voice_clock.paused:
+        _voice.unpause()
+        _voice_clock.resume()
+    for deck in _decks:
+        deck.unpause()
+    if _pygame is not None:
+        music().unpause()
+    _music.resume()
+
+
+def warm_up():
+    """Inicializa el mixer en un hilo aparte para que el primer Play no lo pague."""
+    def _run():
+        try:
+            ensure_mixer()
+        except Exception as e:
+            print(f"⚠️ No se pudo inicializar el audio: {e}")
+    threading.Thread(target=_run, name="audio-init", daemon=True).start()
+
+
+__all__ = [
+    "ensure_mixer", "music", "is_ready", "music_busy", "warm_up",
+    "play_sound", "voice_busy", "release_voice", "busy", "position_ms",
+    "fadeout", "stop", "pause", "unpause",
+    "load", "play", "queue", "queued", "queue_started", "take_queued", "decode", "decoded_bytes",
+    "deck_busy", "begin_crossfade", "crossfade_levels", "crossfading", "end_crossfade",
+]
@@ -0,0 +1,206 @@
+# utils/audio_header.py
+"""
+Duración leyendo solo encabezados (sin mutagen).
+
+- WAV: chunks RIFF 'fmt ' y 'data' -> bytes de audio / byte_rate.
+- MP3: se saltan los ID3v2, se toma el primer frame MPEG Layer III y su
+  encabezado Xing/Info o VBRI (conteo de frames); sin ellos se estima CBR
+  con el tamaño del archivo. El frame siguiente tiene que sincronizar.
+- Si algo es ambiguo (formato raro, RF64, VBR sin encabezado, sync dudoso)
+  devuelve None y metadata cae a mutagen.
+"""
+import os
+import struct
+from typing import Optional
+
+SCAN_BYTES = 64 * 1024     # dónde buscar el primer frame tras los ID3v2
+MAX_CHUNKS = 64            # chunks RIFF a recorrer antes de rendirse
+
+# WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_EXTENSIBLE
+_WAV_FORMATS = (0x0001, 0x0003, 0xFFFE)
+
+# Layer III, kbps por índice (0 = libre, 15 = inválido)
+_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    25: (11025, 12000, 8000),
+}
+_VERSIONS = {3: 1, 2: 2, 0: 25}   # bits de versión -> MPEG1 / MPEG2 / MPEG2.5
+_MONO = 3
+
+
+# ======================= WAV =======================
+
+def _wav_seconds(f, file_size) -> Optional[float]:
+    head = f.read(12)
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return None   # RF64/BW64 y compañía: que lo resuelva mutagen
+
+    byte_rate = None
+    pos = 12
+    for _ in range(MAX_CHUNKS):
+        f.seek(pos)
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        cid, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if cid == b"fmt ":
+            fmt = f.read(16)
+            if len(fmt) < 16:
+                return None
+            audio_format, channels, sample_rate, byte_rate, block_align, _ = struct.unpack("<HHIIHH", fmt)
+            if audio_format not in _WAV_FORMATS or not channels or not sample_rate or not byte_rate:
+                return None
+        elif cid == b"data":
+            if byte_rate is None:
+                return None
+            if size == 0xFFFFFFFF or pos + 8 + size > file_size:
+                return None   # tamaño de streaming o archivo truncado
+            return size / byte_rate
+        pos += 8 + size + (size & 1)   # los chunks se alinean a par
+    return None
+
+
+# ======================= MP3 =======================
+
+def _frame_info(b0, b1, b2, b3):
+    """(versión, kbps, sample_rate, largo_frame, mono) o None si no es Layer III válido."""
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = _VERSIONS.get((b1 >> 3) & 0x03)
+    layer = (b1 >> 1) & 0x03
+    br_idx = b2 >> 4
+    sr_idx = (b2 >> 2) & 0x03
+    if version is None or layer != 1 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    kbps = _BITRATES[1 if version == 1 else 2][br_idx]
+    sample_rate = _RATES[version][sr_idx]
+    padding = (b2 >> 1) & 0x01
+    coef = 144 if version == 1 else 72
+    length = coef * kbps * 1000 // sample_rate + padding
+    return version, kbps, sample_rate, length, (b3 >> 6) == _MONO
+
+
+def _skip_id3v2(f) -> int:
+    """Offset donde termina el último ID3v2 encadenado al inicio."""
+    pos = 0
+    while True:
+        f.seek(pos)
+        head = f.read(10)
+        if len(head) < 10 or head[:3] != b"ID3":
+            return pos
+        size = 0
+        for byte in head[6:10]:
+            if byte & 0x80:
+                return pos   # tamaño no synchsafe: mejor no adivinar
+            size = (size << 7) | byte
+        pos += 10 + size + (10 if head[5] & 0x10 else 0)
+
+
+def _lame_delay(buf, at) -> Optional[int]:
+    """Retardo + relleno (muestras) del tag LAME en `at`; 0 si no hay tag; None si es raro."""
+    tag = buf[at:at + 24]
+    if len(tag) < 24 or not tag.startswith((b"LAME", b"L3.99")):
+        return 0
+    version = tag[:9].lstrip(b"EMAL")        # "3.100", "3.99r", ...
+    digits = version[2:].split(b".")[0]
+    minor = b""
+    for ch in digits:
+        if not 0x30 <= ch <= 0x39:
+            break
+        minor += bytes((ch,))
+    try:
+        major, minor = int(version[:1]), int(minor)
+    except ValueError:
+        return None
+    if (major, minor) < (3, 90):
+        return 0   # tag corto, sin retardo/relleno
+    delay = (tag[21] << 4) | (tag[22] >> 4)
+    padding = ((tag[22] & 0x0F) << 8) | tag[23]
+    return delay + padding
+
+
+def _vbr_seconds(buf, start, info) -> Optional[float]:
+    """Duración según Xing/Info o VBRI del primer frame; None si no hay encabezado VBR."""
+    version, _, sample_rate, _, mono = info
+    samples_per_frame = 1152 if version == 1 else 576
+
+    if version == 1:
+        xing_at = start + (21 if mono else 36)
+    else:
+        xing_at = start + (13 if mono else 21)
+    if buf[xing_at:xing_at + 4] in (b"Xing", b"Info") and len(buf) >= xing_at + 8:
+        flags = struct.unpack(">I", buf[xing_at + 4:xing_at + 8])[0]
+        if not flags & 0x1:
+            return -1.0   # Xing sin conteo de frames: ambiguo
+        frames = struct.unpack(">I", buf[xing_at + 8:xing_at + 12])[0]
+        lame_at = xing_at + 8 + 4 * bool(flags & 0x1) + 4 * bool(flags & 0x2)
+        lame_at += 100 * bool(flags & 0x4) + 4 * bool(flags & 0x8)
+        trim = _lame_delay(buf, lame_at)
+        if trim is None:
+            return -1.0
+        samples = max(0, samples_per_frame * frames - trim)
+        return samples / sample_rate
+
+    vbri_at = start + 36
+    if buf[vbri_at:vbri_at + 4] == b"VBRI" and len(buf) >= vbri_at + 18:
+        frames = struct.unpack(">I", buf[vbri_at + 14:vbri_at + 18])[0]
+        return samples_per_frame * frames / sample_rate
+    return None
+
+
+def _mp3_seconds(f, file_size) -> Optional[float]:
+    audio_start = _skip_id3v2(f)
+    f.seek(audio_start)
+    buf = f.read(SCAN_BYTES)
+
+    idx = buf.find(b"\xff")
+    while 0 <= idx < len(buf) - 4:
+        info = _frame_info(*buf[idx:idx + 4])
+        if info is not None:
+            vbr = _vbr_seconds(buf, idx, info)
+            if vbr is not None:
+                return vbr if vbr >= 0 else None
+            nxt = idx + info[3]
+            # CBR: el frame siguiente debe existir (o ser fin de archivo) y coincidir
+            if nxt + 4 <= len(buf):
+                other = _frame_info(*buf[nxt:nxt + 4])
+                if other is None or other[0] != info[0] or other[2] != info[2]:
+                    idx = buf.find(b"\xff", idx + 1)
+                    continue
+                if other[1] != info[1]:
+                    return None   # bitrate variable sin Xing: lo estima mutagen
+            elif audio_start + nxt < file_size - 128:
+                return None
+            end = file_size
+            f.seek(max(0, file_size - 128))
+            if f.read(3) == b"TAG":
+                end -= 128
+            audio_bytes = end - (audio_start + idx)
+            return audio_bytes * 8 / (info[1] * 1000)
+        idx = buf.find(b"\xff", idx + 1)
+    return None
+
+
+# ======================= Entrada =======================
+
+def header_seconds(file_path: str) -> Optional[float]:
+    """Duración en segundos leyendo solo encabezados; None si hay que usar mutagen."""
+    low = file_path.lower()
+    try:
+        with open(file_path, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if low.endswith(".wav"):
+                return _wav_seconds(f, file_size)
+            if low.endswith(".mp3"):
+                return _mp3_seconds(f, file_size)
+    except (OSError, struct.error, ValueError, IndexError):
+        return None
+    return None
+
+
+__all__ = ["header_seconds"]
@@ -0,0 +1,323 @@
+# utils/event_heap.py
+"""
+Índice por hora_inicio de la lista compartida de eventos (utils.events.eventos).
+
+- EventList es un list normal (se sigue mutando en sitio: append, remove,
+  clear, extend...) que avisa a su EventHeap de cada alta/baja.
+- EventHeap guarda dos montículos: 'futuros' (mínimo por hora) y 'vencidos'
+  (máximo por hora). Consultar qué toca ahora o qué sigue cuesta O(log n)
+  amortizado, no un recorrido de toda la lista.
+- Invalidación perezosa: cada (re)alta lleva un sello; las entradas viejas
+  (evento borrado o re-armado) se descartan al asomarse a la cima. Re-armar
+  un evento repetitivo es solo un push: quien cambie ev["hora_inicio"] debe
+  llamar a EventList.reschedule(ev).
+- El desempate dentro de un mismo segundo lo sigue haciendo
+  programacion.winner_in_bucket sobre el 'bucket' que devuelve el índice.
+- EventList mantiene además la agenda de 24 h (utils.agenda) con las mismas
+  altas/bajas, y pone a vigilar el archivo de cada evento (utils.disponibilidad).
+- Cada evento que entra lleva ev["id"] estable (se guarda con el evento).
+  Como PlaylistModel, EventList avisa a sus suscriptores (la bitácora,
+  utils.persistence) con un registro por cambio: ("ev_put", copia) en cada
+  alta o reschedule, ("ev_del", id) en cada baja, y ("eventos", [copias])
+  solo cuando se reemplaza la lista entera (clear, asignación por slice).
+- La lista se toca desde Tk y desde el hilo del programador (utils.scheduler):
+  altas, bajas y consultas van bajo heap.lock (RLock).
+"""
+import heapq
+import itertools
+import threading
+import uuid
+from datetime import datetime
+
+from utils.agenda import Agenda
+from utils.disponibilidad import availability
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _bucket(dt: datetime) -> datetime:
+    return dt.replace(microsecond=0)
+
+
+def _key(dt: datetime) -> float:
+    """Segundos desde 1970 para datetimes naive (sin mktime ni saltos de DST)."""
+    return (dt - _EPOCH).total_seconds()
+
+
+class EventHeap:
+    def __init__(self, events):
+        self._events = events
+        self._live = {}          # id(evento) -> (evento, sello)
+        self._future = []        # (hora, sello, id)           mínimo primero
+        self._due = []           # (-clave, sello, id, hora)   máximo primero
+        self._stamps = itertools.count()
+        self._moved = False      # hubo re-indexado durante una consulta: repetirla
+        self.lock = threading.RLock()
+
+    # ---------------- altas / bajas ----------------
+    def add(self, ev):
+        """Alta o re-armado: el evento entra (otra vez) con su hora_inicio actual."""
+        with self.lock:
+            stamp = next(self._stamps)
+            self._live[id(ev)] = (ev, stamp)
+            hora = ev.get("hora_inicio")
+            if isinstance(hora, datetime):
+                heapq.heappush(self._future, (hora, stamp, id(ev)))
+
+    def discard(self, ev):
+        with self.lock:
+            self._live.pop(id(ev), None)
+
+    def rebuild(self):
+        """Reconstrucción completa (clear / asignación por slice): heapify, O(n)."""
+        with self.lock:
+            self._live.clear()
+            self._future = []
+            self._due = []
+            for ev in self._events:
+                stamp = next(self._stamps)
+                self._live[id(ev)] = (ev, stamp)
+                hora = ev.get("hora_inicio")
+                if isinstance(hora, datetime):
+                    self._future.append((hora, stamp, id(ev)))
+            heapq.heapify(self._future)
+
+    def __len__(self):
+        return len(self._live)
+
+    # ---------------- validación perezosa ----------------
+    def _resolve(self, hora, stamp, eid):
+        """Evento vivo de una entrada, o None si quedó vieja (re-arma si cambió la hora a mano)."""
+        rec = self._live.get(eid)
+        if rec is None or rec[1] != stamp:
+            return None
+        ev = rec[0]
+        if ev.get("hora_inicio") != hora:
+            self.add(ev)   # alguien cambió hora_inicio sin reschedule(): se re-indexa
+            self._moved = True
+            return None
+        return ev
+
+    def _advance(self, now: datetime):
+        """Pasa de 'futuros' a 'vencidos' todo lo que ya tenga hora <= now."""
+        future = self._future
+        while future and future[0][0] <= now:
+            hora, stamp, eid = heapq.heappop(future)
+            if self._resolve(hora, stamp, eid) is not None:
+                heapq.heappush(self._due, (-_key(hora), stamp, eid, hora))
+
+    def _due_top(self, now: datetime):
+        """Cima válida de 'vencidos' (lo que volvió a ser futuro regresa a su montículo)."""
+        due = self._due
+        while due:
+            _, stamp, eid, hora = due[0]
+            if self._resolve(hora, stamp, eid) is None:
+                heapq.heappop(due)
+            elif hora > now:
+                heapq.heappop(due)
+                heapq.heappush(self._future, (hora, stamp, eid))
+            else:
+                return due[0]
+        return None
+
+    def _future_top(self):
+        future = self._future
+        while future:
+            if self._resolve(*future[0]) is None:
+                heapq.heappop(future)
+            else:
+                return future[0]
+        return None
+
+    # ---------------- consultas ----------------
+    def _query(self, method, *args):
+        # Si una entrada vieja se re-indexó a mitad de la consulta, puede caer en el
+        # montículo que ya se revisó: se repite (solo pasa tras cambios sin reschedule)
+        with self.lock:
+            while True:
+                self._moved = False
+                result = method(*args)
+                if not self._moved:
+                    return result
+
+    def due_bucket(self, now: datetime):
+        """Eventos vencidos (hora <= now) del segundo más reciente; [] si no hay."""
+        return self._query(self._due_bucket, now)
+
+    def future_bucket(self, now: datetime):
+        """Eventos futuros (hora > now) del segundo más próximo; [] si no hay."""
+        return self._query(self._future_bucket, now)
+
+    def upcoming(self, now: datetime, n: int):
+        """Los n próximos eventos futuros (hora > now), en orden de hora."""
+        return self._query(self._upcoming, now, n)
+
+    def between(self, start: datetime, end: datetime):
+        """Eventos con start <= hora_inicio <= end (los más recientes primero)."""
+        return self._query(self._between, start, end)
+
+    def _due_bucket(self, now):
+        self._advance(now)
+        top = self._due_top(now)
+        if top is None:
+            return []
+        sec = _bucket(top[3])
+        taken = []
+        while top is not None and _bucket(top[3]) == sec:
+            taken.append(heapq.heappop(self._due))
+            top = self._due_top(now)
+        for entry in taken:
+            heapq.heappush(self._due, entry)
+        return [self._live[entry[2]][0] for entry in taken]
+
+    def _future_bucket(self, now):
+        self._advance(now)
+        top = self._future_top()
+        if top is None:
+            return []
+        sec = _bucket(top[0])
+        taken = []
+        while top is not None and _bucket(top[0]) == sec:
+            taken.append(heapq.heappop(self._future))
+            top = self._future_top()
+        for entry in taken:
+            heapq.heappush(self._future, entry)
+        return [self._live[entry[2]][0] for entry in taken]
+
+    def _upcoming(self, now, n):
+        self._advance(now)
+        taken = []
+        while len(taken) < n and self._future_top() is not None:
+            taken.append(heapq.heappop(self._future))
+        for entry in taken:
+            heapq.heappush(self._future, entry)
+        return [self._live[entry[2]][0] for entry in taken]
+
+    def _between(self, start, end):
+        self._advance(end)
+        taken = []
+        due = self._due
+        while due:
+            _, stamp, eid, hora = due[0]
+            if self._resolve(hora, stamp, eid) is None:
+                heapq.heappop(due)
+                continue
+            if hora < start:
+                break
+            taken.append(heapq.heappop(due))
+        for entry in taken:
+            heapq.heappush(due, entry)
+        return [self._live[entry[2]][0] for entry in taken]
+
+
+class EventList(list):
+    """La lista compartida de eventos; cada cambio estructural actualiza su EventHeap."""
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self._listeners = []          # callback(registro) por cada cambio (bitácora)
+        self.heap = EventHeap(self)
+        self.agenda = Agenda(self.heap.lock)
+        self._reindex()
+
+    @property
+    def lock(self):
+        """RLock compartido con el índice: tomarlo para recorrer la lista desde otro hilo."""
+        return self.heap.lock
+
+    def subscribe(self, callback):
+        """callback(registro) en el hilo que hizo el cambio (Tk o programador), bajo el lock."""
+        self._listeners.append(callback)
+
+    def _emit(self, *record):
+        for cb in self._listeners:
+            cb(record)
+
+    @staticmethod
+    def _stamp(ev):
+        if not ev.get("id"):
+            ev["id"] = uuid.uuid4().hex
+
+    def _index(self, ev):
+        self._stamp(ev)
+        self.heap.add(ev)
+        self.agenda.add(ev)
+        availability.watch(ev.get("archivo"))
+        if self._listeners:
+            self._emit("ev_put", dict(ev))   # copia: el evento sigue cambiando en sitio
+
+    def _unindex(self, ev):
+        self.heap.discard(ev)
+        self.agenda.discard(ev)
+        if self._listeners:
+            self._emit("ev_del", ev.get("id"))
+
+    def _reindex(self):
+        self.heap.rebuild()
+        self.agenda.rebuild(self)
+        for ev in self:
+            self._stamp(ev)
+            availability.watch(ev.get("archivo"))
+        if self._listeners:
+            self._emit("eventos", [dict(ev) for ev in self])
+
+    def append(self, ev):
+        with self.lock:
+            super().append(ev)
+            self._index(ev)
+
+    def insert(self, i, ev):
+        with self.lock:
+            super().insert(i, ev)
+            self._index(ev)
+
+    def extend(self, events):
+        events = list(events)
+        with self.lock:
+            super().extend(events)
+            for ev in events:
+                self._index(ev)
+
+    def __iadd__(self, events):
+        self.extend(events)
+        return self
+
+    def remove(self, ev):
+        with self.lock:
+            # Por identidad primero: dos eventos iguales no deben confundirse en el índice
+            for i, item in enumerate(self):
+                if item is ev:
+                    super().__delitem__(i)
+                    self._unindex(ev)
+                    return
+            super().remove(ev)
+            self._reindex()
+
+    def pop(self, i=-1):
+        with self.lock:
+            ev = super().pop(i)
+            self._unindex(ev)
+            return ev
+
+    def clear(self):
+        with self.lock:
+            super().clear()
+            self._reindex()
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+            self._reindex()
+
+    def __delitem__(self, key):
+        with self.lock:
+            super().__delitem__(key)
+            self._reindex()
+
+    def reschedule(self, ev):
+        """Tras cambiar ev['hora_inicio'] (re-armar un repetitivo): un push al montículo."""
+        with self.lock:
+            self._index(ev)
+
+
+__all__ = ["EventHeap", "EventList"]
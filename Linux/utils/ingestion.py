@@ -0,0 +1,118 @@
+# utils/ingestion.py
+"""
+Ingesta en streaming de carpetas/archivos soltados o pegados.
+
+- Un hilo recorre las rutas con iter_music_files (os.scandir, generador) y
+  va dejando las pistas en una cola acotada apenas las encuentra.
+- En Tk, cada ~frame se sacan hasta BATCH_SIZE rutas y se insertan con
+  add_to_playlist(validated=True): el recorredor ya comprobó cada archivo,
+  así que el hilo de Tk no hace os.stat; entre lote y lote la ventana sigue
+  respondiendo.
+- cancel_ingestion() corta recorridos en curso y la lectura de duraciones.
+"""
+import os
+import queue
+import threading
+
+from utils.playlist import add_to_playlist, iter_music_files
+from utils.probing import prober
+
+BATCH_SIZE = 250
+FRAME_MS = 16
+QUEUE_MAX = 5000
+
+_FIN = object()
+_active = []
+
+
+def iter_sources(paths):
+    """Expande rutas soltadas: carpetas -> sus pistas (recursivo), archivos -> tal cual."""
+    for p in paths:
+        if os.path.isdir(p):
+            yield from iter_music_files(p)
+        elif os.path.isfile(p):
+            yield p
+
+
+class Ingestion:
+    def __init__(self, playlist, paths, on_done=None):
+        self._playlist = playlist
+        self._paths = list(paths)
+        self._queue = queue.Queue(maxsize=QUEUE_MAX)
+        self._cancelled = threading.Event()
+        self._on_done = on_done
+        self.inserted = 0
+
+    def start(self):
+        threading.Thread(target=self._walk, name="ingesta", daemon=True).start()
+        _active.append(self)
+        self._playlist.after(FRAME_MS, self._pump)
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+        if self in _active:
+            _active.remove(self)
+
+    # ---------------- hilo recorredor ----------------
+    def _put(self, item):
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _walk(self):
+        try:
+            for path in iter_sources(self._paths):
+                if not self._put(path):
+                    return
+        except Exception as e:
+            print(f"⚠️ Error recorriendo carpetas: {e}")
+        finally:
+            self._put(_FIN)
+
+    # ---------------- lado Tk ----------------
+    def _pump(self):
+        if self._cancelled.is_set():
+            return
+        batch = []
+        finished = False
+        while len(batch) < BATCH_SIZE:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _FIN:
+                finished = True
+                break
+            batch.append(item)
+
+        if batch:
+            # El recorredor ya comprobó cada archivo: aquí no se vuelve al disco
+            self.inserted += add_to_playlist(batch, self._playlist, validated=True) or 0
+
+        if finished:
+            if self in _active:
+                _active.remove(self)
+            if self._on_done is not None:
+                self._on_done(self.inserted)
+            return
+        self._playlist.after(FRAME_MS, self._pump)
+
+
+def ingest_paths(playlist, paths, on_done=None):
+    """Arranca la ingesta de `paths` (carpetas y/o archivos) y regresa de inmediato."""
+    return Ingestion(playlist, paths, on_done).start()
+
+
+def cancel_ingestion():
+    """Botón 'Cancelar': corta recorridos en curso y la lectura de duraciones."""
+    for ing in list(_active):
+        ing.cancel()
+    prober.cancel()
+
+
+__all__ = ["ingest_paths", "cancel_ingestion", "iter_sources", "Ingestion"]
@@ -1,16 +1,20 @@
 import sys
 import random
 import contextlib
-import pygame
-from datetime import datetime
-from mutagen.mp3 import MP3
-from mutagen.wave import WAVE
+import functools
+from datetime import datetime, timedelta
 from utils import events as evmod
 from utils import programacion as prog
 from utils import player_state as pst
-
-if not pygame.mixer.get_init():
-    pygame.mixer.init()
+from utils import audio
+from utils import lateness
+from utils import event_preload
+from utils import crossfade
+from utils import reloj
+from utils.scheduler import scheduler
+from utils.cargador import loader
+from utils.metadata import get_duration
+from utils.playlist_model import model_for
 
 @contextlib.contextmanager
 def _suppress_stderr():
@@ -27,145 +31,360 @@ def _suppress_stderr():
             os.close(old_stderr_fd)
             os.close(devnull)
 
+def _serialized(fn):
+    # Botones (hilo de Tk) y programador (su hilo) no deben pisarse el estado
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with scheduler.lock:
+            return fn(*args, **kwargs)
+    return wrapper
+
 def set_current_song_index(index):
     pst.current_song_index = index
 
 def set_paused(value):
     pst.paused = value
 
-def get_duration(file_path):
-    try:
-        if file_path.endswith('.mp3'):
-            audio = MP3(file_path)
-        elif file_path.endswith('.wav'):
-            audio = WAVE(file_path)
-        else:
-            return "00:00", 0
-        duration = int(audio.info.length)
-        minutes, seconds = divmod(duration, 60)
-        return f"{minutes:02}:{seconds:02}", duration
-    except Exception:
-        return "00:00", 0
-
 def update_progress_bar(root, progress_bar):
-    from utils.programacion import handle_event_or_next_song
+    pst._progress_after = None
     if pst.stopped:
         return
     # Si está pausado, NO disparemos el loop de eventos para que no salte a otra rola
     if pst.paused:
-        root.after(pst.progress_update_interval, lambda: update_progress_bar(root, progress_bar))
+        pst._progress_after = root.after(pst.progress_update_interval,
+                                         lambda: update_progress_bar(root, progress_bar))
         return
-    if pygame.mixer.music.get_busy():
-        current_time = pygame.mixer.music.get_pos() // 1000
+    if audio.busy():
+        current_time = audio.position_ms() / 1000
         progress_bar['value'] = (current_time / pst.song_length) * 100 if pst.song_length > 0 else 0
-        root.after(pst.progress_update_interval, lambda: update_progress_bar(root, progress_bar))
+        pst._progress_after = root.after(pst.progress_update_interval,
+                                         lambda: update_progress_bar(root, progress_bar))
     else:
-        handle_event_or_next_song(root, progress_bar, pst.playlist_ref)
+        # La pista terminó: que lo atienda el loop de eventos (un solo timer)
+        prog.wake_now()
+
+def _restart_progress(root, progress_bar):
+    # Una sola cadena: en un empalme (gapless, crossfade, evento) audio.busy()
+    # no llega a dar False, así que la de la pista anterior no terminaría sola
+    if pst._progress_after is not None:
+        root.after_cancel(pst._progress_after)
+    update_progress_bar(root, progress_bar)
 
+def _start_event_audio(path):
+    # Look-ahead: si el evento ya está decodificado en memoria, disparar es solo play()
+    clip = event_preload.take(path)
+    if clip is not None and clip[0] == "sound":
+        audio.play_sound(clip[1], fade_ms=pst.fade_duration)
+        return clip[1].get_length()
+    if clip is None:
+        return None          # hay que leerlo de disco: lo hace el cargador
+    audio.release_voice()
+    with _suppress_stderr():
+        audio.load(clip[1], event_preload.namehint(path))
+    _, length = get_duration(path)
+    audio.play(fade_ms=pst.fade_duration)
+    return length
+
+def _cancel_load():
+    # Lo que se estaba cargando ya no va a sonar
+    if pst._loading_event is not None and pst.evento_en_progreso is pst._loading_event:
+        pst.evento_en_progreso = None
+    pst._loading = pst._loading_event = None
+
+def _event_failed(evento):
+    fail = evento.get("_fails", 0) + 1
+    evento["_fails"] = fail
+    if not evento.get("intervalo_repeticion") or fail >= 3:
+        try:
+            evmod.eventos.remove(evento)
+        except ValueError:
+            pass
+    pst.evento_en_progreso = None
+
+@_serialized
 def reproducir_evento(evento, root, progress_bar):
+    _cancel_load()
     pst.evento_en_progreso = evento
     pst._finished_reported = False
     prog.ensure_anchor(evento)
     try:
-        with _suppress_stderr():
-            pygame.mixer.music.load(evento["archivo"])
+        length = _start_event_audio(evento["archivo"])
     except Exception:
-        fail = evento.get("_fails", 0) + 1
-        evento["_fails"] = fail
-        if not evento.get("intervalo_repeticion") or fail >= 3:
-            try:
-                evmod.eventos.remove(evento)
-            except ValueError:
-                pass
-        pst.evento_en_progreso = None
+        _event_failed(evento)
         return
-    _, pst.song_length = get_duration(evento["archivo"])
-    pygame.mixer.music.play(fade_ms=pst.fade_duration)
-    pst._event_started_at = datetime.now()
-    update_progress_bar(root, progress_bar)
+    if length is None:
+        # Desde disco: el cargador lo lee aparte y el loop espera su respuesta
+        pst._loading_event = evento
+        pst._loading = loader.request(evento["archivo"],
+                                      lambda r: _event_loaded(r, evento, root, progress_bar))
+        return
+    _event_started(evento, root, progress_bar, length)
+
+@_serialized
+def _event_loaded(result, evento, root, progress_bar):
+    if result.token != pst._loading:
+        return
+    pst._loading = pst._loading_event = None
+    if pst.stopped or pst.evento_en_progreso is not evento:
+        return
+    try:
+        if not result.ok:
+            raise OSError(result.error)
+        audio.release_voice()
+        with _suppress_stderr():
+            audio.load(result.source, event_preload.namehint(result.path))
+        audio.play(fade_ms=pst.fade_duration)
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar el evento '{evento.get('nombre', '')}': {e}")
+        _event_failed(evento)
+        prog.wake_now()
+        return
+    event_preload.warm(result.path)   # el próximo disparo, desde la caché
+    _, length = get_duration(result.path)
+    _event_started(evento, root, progress_bar, length)
+
+def _event_started(evento, root, progress_bar, length):
+    pst.song_length = length
+    # Inicio real según el reloj de reproducción: el instante en que la posición valía 0
+    pst._event_started_at = reloj.now() - timedelta(milliseconds=audio.position_ms())
+    programado = evento.get("hora_inicio")
+    late_ms = None
+    if isinstance(programado, datetime):
+        late_ms = lateness.record(evento.get("nombre", ""), programado, pst._event_started_at)
+    prog.ui(lambda: _restart_progress(root, progress_bar))
     intervalo = evento.get("intervalo_repeticion")
     if intervalo and intervalo > 0:
         evento["hora_inicio"] = prog.next_multiple_after(evento["anchor"], intervalo, pst._event_started_at)
+        evmod.eventos.reschedule(evento)
     else:
         try:
             evmod.eventos.remove(evento)
         except ValueError:
             pass
+    prog.rearm_wakeup()
+    # El log va al final: sin consola (build con ventana) print no hace nada
+    if late_ms is not None:
+        print(f"\r[EVENTO] Inicio: '{evento.get('nombre', '')}' ({late_ms:+.0f} ms)", flush=True)
 
+@_serialized
 def play_current_song(root, playlist, progress_bar):
     pst.playlist_ref = playlist
-    songs = playlist.get_children()
-    if not songs:
+    model = model_for(playlist)
+    if not len(model):
         return
-    if pst.current_song_index < 0 or pst.current_song_index >= len(songs):
+    if pst.current_song_index < 0 or pst.current_song_index >= len(model):
         pst.current_song_index = 0
-    playlist.selection_clear()
-    song_id = songs[pst.current_song_index]
-    playlist.selection_set(song_id)
-    playlist.focus(song_id)
-    song_item = playlist.item(song_id)
-    song_path = song_item['values'][2]
-    with _suppress_stderr():
-        pygame.mixer.music.load(song_path)
-    _, pst.song_length = get_duration(song_path)
-    pygame.mixer.music.play(fade_ms=pst.fade_duration)
-    update_progress_bar(root, progress_bar)
+    song_path = model.paths[pst.current_song_index]
+    _cancel_load()
+    # La lectura va en el hilo del cargador; suena cuando llega (_song_loaded)
+    pst._loading = loader.request(song_path, lambda r: _song_loaded(r, root, playlist, progress_bar))
+    prog.rearm_wakeup()
 
+@_serialized
+def _song_loaded(result, root, playlist, progress_bar):
+    if result.token != pst._loading:
+        return
+    pst._loading = None
+    if pst.stopped:
+        return
+    model = model_for(playlist)
+    try:
+        if not result.ok:
+            raise OSError(result.error)
+        audio.release_voice()   # un evento en memoria no sigue sonando debajo de la pista
+        with _suppress_stderr():
+            audio.load(result.source, event_preload.namehint(result.path))
+        audio.play(fade_ms=pst.fade_duration)
+    except Exception as e:
+        pst._load_failures += 1
+        if pst._load_failures >= len(model):
+            print(f"⚠️ No se pudo cargar ninguna pista de la playlist (última: {result.path}: {e})")
+            pst._load_failures = 0
+            return
+        print(f"⚠️ No se pudo cargar '{result.path}': {e}; se salta")
+        next_song(root, playlist, progress_bar)
+        return
+    pst._load_failures = 0
+    if not (0 <= pst.current_song_index < len(model)) or model.paths[pst.current_song_index] != result.path:
+        index = model.index_of(result.path)   # la playlist cambió mientras se cargaba
+        if index is None:
+            pst.current_song_index = max(0, min(pst.current_song_index, len(model) - 1))
+            audio.stop()
+            next_song(root, playlist, progress_bar)
+            return
+        pst.current_song_index = index
+    _now_playing(root, playlist, progress_bar, model)
+
+def _now_playing(root, playlist, progress_bar, model):
+    # Duración, fila resaltada y barra de la pista current_song_index (ya sonando)
+    crossfade.discard()      # lo preparado para el cruce era para la pista anterior
+    song_id = model.iids[pst.current_song_index]
+
+    def _highlight():
+        # Solo UI: resaltar la fila que suena
+        playlist.selection_clear()
+        playlist.selection_set(song_id)
+        playlist.focus(song_id)
+    prog.ui(_highlight)
+    pst.song_length = model.durations[pst.current_song_index]
+    if pst.song_length < 0:
+        _, pst.song_length = get_duration(model.paths[pst.current_song_index])
+    prog.ui(lambda: _restart_progress(root, progress_bar))
+    prog.rearm_wakeup()
+
+@_serialized
 def play_song(root, playlist, progress_bar):
     pst.playlist_ref = playlist
-    songs = playlist.get_children()
-    if not songs:
+    model = model_for(playlist)
+    if not len(model):
         return
     pst.stopped = False
     # marcar que el usuario arrancó reproducción
     pst.playback_started = True
     if pst.paused:
-        pygame.mixer.music.unpause()
+        audio.unpause()
         pst.paused = False
+        prog.rearm_wakeup()
     else:
         selected = playlist.selection()
         if not selected:
             if pst.current_song_index < 0:
                 pst.current_song_index = 0
         else:
-            pst.current_song_index = playlist.index(selected[0])
+            pos = model.position_of_iid(selected[0])
+            pst.current_song_index = pos if pos is not None else 0
         play_current_song(root, playlist, progress_bar)
 
+@_serialized
 def next_song(root, playlist, progress_bar):
     pst.playlist_ref = playlist
     if pst.stopped:
         return
-    songs = playlist.get_children()
-    if not songs:
+    total = len(model_for(playlist))
+    if not total:
         return
-    if pst.play_mode == "Aleatorio":
-        if len(pst.played_songs) >= len(songs):
-            pst.played_songs.clear()
-        remaining_songs = [i for i in range(len(songs)) if i not in pst.played_songs]
-        next_index = random.choice(remaining_songs)
-        pst.played_songs.append(next_index)
-    else:
-        next_index = (pst.current_song_index + 1) % len(songs)
+    next_index = _next_index(total)
+    _mark_played(next_index)
     pst.current_song_index = next_index
     play_current_song(root, playlist, progress_bar)
 
+def _next_index(total):
+    # La que sigue según el modo; en Aleatorio, una que no haya sonado en esta vuelta
+    if pst.play_mode == "Aleatorio":
+        if len(pst.played_songs) >= total:
+            pst.played_songs.clear()
+        remaining_songs = [i for i in range(total) if i not in pst.played_songs]
+        return random.choice(remaining_songs)
+    return (pst.current_song_index + 1) % total
+
+def _mark_played(index):
+    if pst.play_mode == "Aleatorio":
+        pst.played_songs.append(index)
+
+@_serialized
+def queue_next_song(playlist):
+    """Gapless: encola en el mixer la pista que sigue; sonará pegada a la actual."""
+    model = model_for(playlist)
+    total = len(model)
+    if not total:
+        return
+    if pst._queue_loading is not None:
+        return
+    index = _next_index(total)
+    current = pst.current_song_index
+    path = model.paths[index]
+
+    @_serialized
+    def _loaded(result):
+        if result.token != pst._queue_loading:
+            return
+        pst._queue_loading = None
+        # Mientras se leía pudo cambiar la pista, o terminar
+        if not result.ok or pst.current_song_index != current or audio.queued() is not None \
+                or not audio.music_busy():
+            return
+        try:
+            with _suppress_stderr():
+                audio.queue(result.source, path, event_preload.namehint(path))
+        except Exception as e:
+            print(f"⚠️ No se pudo encolar '{path}': {e}")
+            return
+        pst._queued_index = index
+        restante_ms = pst.song_length * 1000 - audio.position_ms()
+        pst._queue_handoff = reloj.monotonic() + max(0, restante_ms) / 1000
+        prog.rearm_wakeup()
+
+    pst._queue_loading = loader.request(path, _loaded)
+
+@_serialized
+def prepare_next_song(playlist):
+    """Crossfade: decodifica en segundo plano la pista que sigue (una sola elección)."""
+    if crossfade.pending() is not None:
+        return
+    model = model_for(playlist)
+    total = len(model)
+    if not total:
+        return
+    index = _next_index(total)
+    seconds = model.durations[index]
+    if seconds < 0:
+        _, seconds = get_duration(model.paths[index])
+    crossfade.prepare(model.paths[index], index, seconds)
+
+@_serialized
+def crossfade_next_song(root, playlist, progress_bar):
+    """Crossfade: la pista preparada entra mientras baja la actual; False si no estaba lista."""
+    ready = crossfade.take()
+    if ready is None:
+        return False
+    path, index, sound = ready
+    model = model_for(playlist)
+    if index >= len(model) or model.paths[index] != path:
+        index = model.index_of(path)
+        if index is None:
+            return False
+    crossfade.start(sound, pst.crossfade_ms, pst.crossfade_curve, scheduler.call_later)
+    _mark_played(index)
+    pst.current_song_index = index
+    _now_playing(root, playlist, progress_bar, model)
+    return True
+
+@_serialized
+def promote_queued_song(root, playlist, progress_bar):
+    """El mixer ya pasó a la pista encolada: índice, duración e interfaz se ponen al día."""
+    path = audio.take_queued()
+    model = model_for(playlist)
+    index = pst._queued_index
+    if index is None or index >= len(model) or model.paths[index] != path:
+        # La playlist cambió mientras tanto: buscarla por ruta
+        index = model.index_of(path)
+        if index is None:
+            return
+    _mark_played(index)
+    pst.current_song_index = index
+    _now_playing(root, playlist, progress_bar, model)
+
+@_serialized
 def pause_song(playlist=None, mode_selector=None):
     # No disparemos nada más; solo toggle pausa
-    if pygame.mixer.music.get_busy() and not pst.paused:
-        pygame.mixer.music.pause()
+    if audio.busy() and not pst.paused:
+        audio.pause()
         pst.paused = True
     elif pst.paused:
-        pygame.mixer.music.unpause()
+        audio.unpause()
         pst.paused = False
+        prog.rearm_wakeup()
 
+@_serialized
 def stop_song(playlist, mode_selector=None):
+    _cancel_load()
     try:
-        if pygame.mixer.music.get_busy():
-            pygame.mixer.music.fadeout(int(pst.fade_duration))
-        else:
-            pygame.mixer.music.stop()
+        if audio.busy():
+            audio.fadeout(int(pst.fade_duration))
+        elif audio.is_ready():
+            audio.stop()
     except Exception:
-        pygame.mixer.music.stop()
+        audio.stop()
     pst.paused = False
     pst.stopped = True
     # al hacer stop, deshabilitar autoplay desde el loop
@@ -174,5 +393,6 @@ def stop_song(playlist, mode_selector=None):
 __all__ = [
     "play_song", "pause_song", "stop_song", "next_song",
     "set_current_song_index", "set_paused", "reproducir_evento",
-    "update_progress_bar"
+    "update_progress_bar", "queue_next_song", "promote_queued_song",
+    "prepare_next_song", "crossfade_next_song",
 ]
@@ -3,9 +3,13 @@ import os
 import pickle
 import urllib.parse  # <- para normalizar URIs file:// en Linux
 from tkinter import filedialog
-from mutagen.mp3 import MP3
-from mutagen.wave import WAVE
-from utils.state import save_state
+from utils.persistence import persistence
+from utils import player_state as pst
+from utils.metadata import get_duration
+from utils.probing import prober
+from utils.playlist_model import (
+    model_for, playlist_insert, playlist_delete, playlist_clear, is_queued, find_row, UNKNOWN,
+)
 
 allowed_extensions = ['.mp3', '.wav']
 played_songs = []
@@ -13,9 +17,11 @@ play_mode = "Orden"
 
 
 def set_play_mode(mode: str):
-    """Fija el modo de reproducción sin disparar eventos de UI."""
-    global play_mode, played_songs
+    """Fija el modo de reproducción sin disparar eventos de UI (estado central en player_state)."""
+    global play_mode
     play_mode = mode or "Orden"
+    pst.play_mode = play_mode
+    pst.played_songs.clear()
     played_songs.clear()
 
 
@@ -27,9 +33,9 @@ def load_playlist(playlist):
     if file_path:
         with open(file_path, "rb") as f:
             playlist_data = pickle.load(f)
-            playlist.delete(*playlist.get_children())
+            playlist_clear(playlist)
             for song in playlist_data.get("playlist", []):
-                playlist.insert("", "end", values=song)
+                playlist_insert(playlist, song)
 
 
 def save_playlist(playlist):
@@ -40,14 +46,14 @@ def save_playlist(playlist):
     )
     if file_path:
         playlist_data = {
-            "playlist": [playlist.item(item)["values"] for item in playlist.get_children()]
+            "playlist": model_for(playlist).rows()
         }
         with open(file_path, "wb") as f:
             pickle.dump(playlist_data, f)
 
 
 def new_playlist(playlist):
-    playlist.delete(*playlist.get_children())
+    playlist_clear(playlist)
 
 
 def update_play_mode(*args):
@@ -58,8 +64,6 @@ def update_play_mode(*args):
       - update_play_mode(event, mode_selector)  (NO guarda estado por faltar playlist)
     Detecta quién es quién por atributos.
     """
-    global play_mode, played_songs
-
     mode_selector = None
     playlist = None
 
@@ -75,36 +79,39 @@ def update_play_mode(*args):
         # Nada que hacer si no sabemos el selector
         return
 
-    play_mode = mode_selector.get() or "Orden"
-    played_songs.clear()
+    set_play_mode(mode_selector.get())
 
-    # Solo guardamos si tenemos playlist y mode_selector
+    # Solo marcamos cambios si tenemos playlist (el guardado real es diferido)
     if playlist is not None:
-        save_state(playlist, mode_selector)
+        persistence.mark_dirty(playlist)
 
 
-def get_duration(file_path):
-    try:
-        if file_path.endswith('.mp3'):
-            audio = MP3(file_path)
-        elif file_path.endswith('.wav'):
-            audio = WAVE(file_path)
-        else:
-            return "00:00", 0
-        duration = int(audio.info.length)
-        minutes, seconds = divmod(duration, 60)
-        return f"{minutes:02}:{seconds:02}", duration
-    except Exception:
-        return "00:00", 0
+def iter_music_files(folder_path):
+    """
+    Generador con os.scandir: entrega cada pista apenas la encuentra
+    (mismo orden que os.walk: archivos de la carpeta y luego subcarpetas).
+    """
+    pending = [folder_path]
+    while pending:
+        current = pending.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in allowed_extensions and entry.is_file():
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue  # sin permisos / carpeta que desapareció
+        pending.extend(reversed(subdirs))
 
 
 def find_music_files(folder_path):
-    music_files = []
-    for root_dir, _, files in os.walk(folder_path):
-        for file in files:
-            if os.path.splitext(file)[1].lower() in allowed_extensions:
-                music_files.append(os.path.join(root_dir, file))
-    return music_files
+    return list(iter_music_files(folder_path))
 
 
 # ======================= Normalización de rutas (Linux) =======================
@@ -124,30 +131,34 @@ def _to_fs_path(p: str) -> str:
 
 # ======================= Inserción en playlist =======================
 
-def add_to_playlist(files, playlist):
+def add_to_playlist(files, playlist, validated=False):
     """
     Inserta en el Treeview con values=(nombre, duración, ruta).
     Evita duplicados comparando la ruta (values[2]).
+    La fila entra al instante con PLACEHOLDER; la duración la llena el prober.
+    validated=True: las rutas ya se comprobaron en otro hilo (lotes de
+    utils.ingestion) y no se vuelve a tocar el disco desde Tk.
+    Devuelve cuántas filas se insertaron.
     """
-    # Rutas ya existentes en la playlist
-    existentes = set()
-    for iid in playlist.get_children():
-        vals = playlist.item(iid).get("values", [])
-        if len(vals) >= 3:
-            existentes.add(str(vals[2]))
+    # Rutas ya existentes: índice del modelo, O(1) por consulta
+    model = model_for(playlist)
 
+    inserted = 0
     for file_path in files:
         file_path = _to_fs_path(file_path)
-        if os.path.isfile(file_path) and os.path.splitext(file_path)[1].lower() in allowed_extensions:
-            if file_path in existentes:
+        if (validated or os.path.isfile(file_path)) and os.path.splitext(file_path)[1].lower() in allowed_extensions:
+            if model.index_of(file_path) is not None:
                 continue  # duplicado, nel
             file_name = os.path.basename(file_path)
-            file_duration, _ = get_duration(file_path)
-            playlist.insert("", "end", values=(file_name, file_duration, file_path))
-            existentes.add(file_path)
+            iid = playlist_insert(playlist, (file_name, UNKNOWN, file_path))
+            prober.submit(playlist, iid, file_path)
+            inserted += 1
 
-    # Guardamos el estado; el mode_selector puede ser None aquí y no pasa nada
-    save_state(playlist, None)
+    # Autoguardado diferido (se coalesce); otra marca cuando ya estén las duraciones
+    persistence.mark_dirty(playlist)
+    if prober.busy():
+        prober.when_idle(lambda: persistence.mark_dirty(playlist))
+    return inserted
 
 
 # ======================= Drag & Drop handler =======================
@@ -158,15 +169,12 @@ def on_drop(event, root, playlist):
         playlist.drop_target_register(DND_FILES)
         playlist.dnd_bind('<<Drop>>', lambda e: on_drop(e, root, playlist))
     Soporta múltiples archivos, carpetas, y URIs file:// en Linux.
+    Las carpetas se recorren en streaming (utils.ingestion), sin congelar la ventana.
     """
+    from utils.ingestion import ingest_paths  # evita import circular
     # print("DROP RAW:", event.data)  # <- descomenta para debug
     file_paths = [_to_fs_path(p) for p in root.tk.splitlist(event.data)]
-    for file_path in file_paths:
-        if os.path.isdir(file_path):
-            music_files = find_music_files(file_path)
-            add_to_playlist(music_files, playlist)
-        elif os.path.isfile(file_path):
-            add_to_playlist([file_path], playlist)
+    ingest_paths(playlist, file_paths)
 
 def _parse_text_uri_list(s: str):
     """
@@ -187,26 +195,23 @@ def paste_into_playlist(root, playlist):
     Soporta:
       - text/uri-list  (file:///…)
       - rutas crudas (una por línea)
+    La ingesta corre en streaming; devuelve cuántas rutas válidas se encolaron.
     """
+    from utils.ingestion import ingest_paths  # evita import circular
     try:
         data = root.clipboard_get()
     except Exception:
         return 0
 
-    # Reusar normalización del drop (si ya la agregaste)
-    conv = globals().get('_to_fs_path', lambda p: p)
-
-    total = 0
-    for item in _parse_text_uri_list(data):
-        p = conv(item)
-        if os.path.isdir(p):
-            total += add_to_playlist(find_music_files(p), playlist) or 0
-        elif os.path.isfile(p):
-            total += add_to_playlist([p], playlist) or 0
-    return total
+    paths = [p for p in (_to_fs_path(item) for item in _parse_text_uri_list(data))
+             if os.path.isdir(p) or os.path.isfile(p)]
+    if paths:
+        ingest_paths(playlist, paths)
+    return len(paths)
 __all__ = [
     "load_playlist", "save_playlist", "new_playlist", "update_play_mode",
     "add_to_playlist", "on_drop", "set_play_mode", "play_mode",
-    "find_music_files", "get_duration", "allowed_extensions",
-    "paste_into_playlist"  # <-- NUEVO
+    "find_music_files", "iter_music_files", "get_duration", "allowed_extensions",
+    "paste_into_playlist",
+    "playlist_insert", "playlist_delete", "playlist_clear", "is_queued", "find_row"
 ]
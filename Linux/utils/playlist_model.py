@@ -0,0 +1,194 @@
+# utils/playlist_model.py
+"""
+Modelo de la playlist del lado de Python.
+
+Los datos viven aquí en columnas compactas (nombres, duraciones en segundos,
+rutas); el Treeview es solo la vista. Player, programación y persistencia
+leen del modelo y no tocan Tk para consultar datos.
+"""
+from array import array
+
+PLACEHOLDER = "--:--"
+UNKNOWN = -1   # duración aún no leída
+
+
+def _fmt(seconds: int) -> str:
+    if seconds < 0:
+        return PLACEHOLDER
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02}:{seconds:02}"
+
+
+def parse_duration(text) -> int:
+    """'MM:SS' (o lo que Tk haya dejado) -> segundos; UNKNOWN si no se puede."""
+    try:
+        minutes, seconds = str(text).split(":")
+        return int(minutes) * 60 + int(seconds)
+    except (ValueError, AttributeError):
+        return UNKNOWN
+
+
+class PlaylistModel:
+    def __init__(self):
+        self.names = []
+        self.durations = array("i")   # segundos; UNKNOWN si falta
+        self.paths = []
+        self.iids = []                # fila del Treeview que pinta cada posición
+        self._pos_by_path = {}
+        self._pos_by_iid = {}
+        self._listeners = []          # callback(registro) por cada cambio (bitácora)
+
+    def __len__(self):
+        return len(self.paths)
+
+    # ---------------- lectura ----------------
+    def index_of(self, path):
+        """Posición de la ruta en la playlist, o None (O(1))."""
+        return self._pos_by_path.get(str(path))
+
+    def position_of_iid(self, iid):
+        return self._pos_by_iid.get(iid)
+
+    def row(self, pos):
+        """(nombre, 'MM:SS', ruta) como lo guardaba el Treeview."""
+        return (self.names[pos], _fmt(self.durations[pos]), self.paths[pos])
+
+    def rows(self):
+        return [self.row(i) for i in range(len(self.paths))]
+
+    def unknown_positions(self):
+        return [i for i, d in enumerate(self.durations) if d == UNKNOWN]
+
+    # ---------------- cambios (para la bitácora) ----------------
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _emit(self, *record):
+        for cb in self._listeners:
+            cb(record)
+
+    # ---------------- escritura ----------------
+    def append(self, name, seconds, path, iid=None):
+        path = str(path)
+        self._pos_by_path[path] = len(self.paths)
+        if iid is not None:
+            self._pos_by_iid[iid] = len(self.paths)
+        self.names.append(str(name))
+        self.durations.append(int(seconds))
+        self.paths.append(path)
+        self.iids.append(iid)
+        if self._listeners:
+            self._emit("pl_add", str(name), int(seconds), path)
+        return len(self.paths) - 1
+
+    def set_duration(self, pos, seconds):
+        self.durations[pos] = int(seconds)
+        if self._listeners:
+            self._emit("pl_dur", self.paths[pos], int(seconds))
+
+    def remove_positions(self, positions):
+        drop = set(positions)
+        if not drop:
+            return
+        if self._listeners:
+            self._emit("pl_del", [self.paths[i] for i in sorted(drop)])
+        keep = [i for i in range(len(self.paths)) if i not in drop]
+        self.names = [self.names[i] for i in keep]
+        self.durations = array("i", (self.durations[i] for i in keep))
+        self.paths = [self.paths[i] for i in keep]
+        self.iids = [self.iids[i] for i in keep]
+        self._reindex()
+
+    def set_iid(self, pos, iid):
+        self.iids[pos] = iid
+        self._pos_by_iid[iid] = pos
+
+    def _reindex(self):
+        self._pos_by_path = {p: i for i, p in enumerate(self.paths)}
+        self._pos_by_iid = {iid: i for i, iid in enumerate(self.iids) if iid is not None}
+
+    def clear(self):
+        self.names.clear()
+        del self.durations[:]
+        self.paths.clear()
+        self.iids.clear()
+        self._pos_by_path.clear()
+        self._pos_by_iid.clear()
+        if self._listeners:
+            self._emit("pl_clear")
+
+
+# ======================= Vista (Treeview) <-> modelo =======================
+
+def model_for(playlist) -> PlaylistModel:
+    """Modelo ligado al Treeview (se adopta una sola vez lo que ya tuviera pintado)."""
+    model = getattr(playlist, "_model", None)
+    if model is None:
+        model = PlaylistModel()
+        for iid in playlist.get_children():
+            vals = playlist.item(iid).get("values", [])
+            if len(vals) >= 3:
+                model.append(vals[0], parse_duration(vals[1]), vals[2], iid)
+        playlist._model = model
+    return model
+
+
+def playlist_insert(playlist, values):
+    """Agrega (nombre, duración, ruta) al modelo y pinta la fila."""
+    name, duration, path = values[0], values[1], values[2]
+    seconds = duration if isinstance(duration, int) else parse_duration(duration)
+    model = model_for(playlist)
+    iid = playlist.insert("", "end", values=(name, _fmt(seconds), path))
+    model.append(name, seconds, path, iid)
+    return iid
+
+
+def playlist_delete(playlist, *iids):
+    """Borra filas del modelo y de la vista (menú contextual, Supr, etc.)."""
+    if not iids:
+        return
+    model = model_for(playlist)
+    model.remove_positions([p for p in map(model.position_of_iid, iids) if p is not None])
+    playlist.delete(*iids)
+
+
+def playlist_clear(playlist):
+    model_for(playlist).clear()
+    playlist.delete(*playlist.get_children())
+
+
+def render(playlist):
+    """Repinta el Treeview completo desde el modelo (p. ej. tras cargar estado)."""
+    model = model_for(playlist)
+    playlist.delete(*playlist.get_children())
+    model._pos_by_iid.clear()
+    for pos in range(len(model)):
+        model.set_iid(pos, playlist.insert("", "end", values=model.row(pos)))
+
+
+def set_row_duration(playlist, iid, seconds):
+    """Actualiza la duración en el modelo y en la fila visible (si sigue existiendo)."""
+    model = model_for(playlist)
+    pos = model.position_of_iid(iid)
+    if pos is None:
+        return False
+    model.set_duration(pos, seconds)
+    playlist.set(iid, "Duración", _fmt(seconds))
+    return True
+
+
+def is_queued(playlist, path) -> bool:
+    return model_for(playlist).index_of(path) is not None
+
+
+def find_row(playlist, path):
+    """iid de la fila con esa ruta, o None."""
+    pos = model_for(playlist).index_of(path)
+    return None if pos is None else model_for(playlist).iids[pos]
+
+
+__all__ = [
+    "PlaylistModel", "PLACEHOLDER", "UNKNOWN", "model_for", "render", "parse_duration",
+    "playlist_insert", "playlist_delete", "playlist_clear",
+    "set_row_duration", "is_queued", "find_row",
+]
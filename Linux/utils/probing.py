@@ -0,0 +1,135 @@
+# utils/probing.py
+"""
+Lectura de duraciones en segundo plano para la playlist.
+
+- add_to_playlist inserta las filas al instante con PLACEHOLDER.
+- Un pool acotado de hilos llama a metadata.get_seconds (nunca toca Tk).
+- Los resultados se aplican al modelo/Treeview por lotes desde el loop de Tk (after).
+- Expone progreso (hechas/total) y cancelación para la UI.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import TclError
+
+from utils.metadata import get_seconds
+from utils.playlist_model import PLACEHOLDER, set_row_duration
+
+MAX_WORKERS = 4
+BATCH_SIZE = 200        # filas actualizadas por pasada de Tk
+BATCH_INTERVAL_MS = 50
+
+
+class DurationProber:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._max_workers = max_workers
+        self._executor = None
+        self._results = queue.SimpleQueue()   # (generación, playlist, iid, segundos)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._futures = set()
+        self._draining = False
+        self.total = 0
+        self.done = 0
+        self._progress_listeners = []
+        self._idle_callback = None
+
+    # ---------------- API ----------------
+    def submit(self, playlist, iid, path):
+        """Encola la lectura de duración de una fila ya insertada."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                thread_name_prefix="duraciones")
+        gen = self._generation
+        fut = self._executor.submit(self._work, gen, playlist, iid, path)
+        with self._lock:
+            self._futures.add(fut)
+        fut.add_done_callback(self._forget)
+        self.total += 1
+        self._ensure_draining(playlist)
+
+    def cancel(self):
+        """Descarta lo pendiente; las filas sin leer se quedan con PLACEHOLDER."""
+        self._generation += 1
+        with self._lock:
+            futures = list(self._futures)
+        for fut in futures:
+            fut.cancel()
+        self._finish()
+
+    def busy(self) -> bool:
+        return self.done < self.total
+
+    def add_progress_listener(self, callback):
+        """callback(hechas, total); total == 0 significa 'sin trabajo'."""
+        self._progress_listeners.append(callback)
+
+    def when_idle(self, callback):
+        """Una sola llamada cuando termine la tanda actual (p. ej. guardar estado)."""
+        self._idle_callback = callback
+
+    # ---------------- internos ----------------
+    def _work(self, gen, playlist, iid, path):
+        if gen != self._generation:
+            return
+        seconds = get_seconds(path)
+        self._results.put((gen, playlist, iid, seconds))
+
+    def _forget(self, fut):
+        with self._lock:
+            self._futures.discard(fut)
+
+    def _ensure_draining(self, playlist):
+        if not self._draining:
+            self._draining = True
+            gen = self._generation
+            playlist.after(BATCH_INTERVAL_MS, lambda: self._drain(playlist, gen))
+
+    def _drain(self, playlist, gen_loop):
+        if gen_loop != self._generation:
+            return  # loop viejo (hubo cancelación)
+        applied = 0
+        while applied < BATCH_SIZE:
+            try:
+                gen, pl, iid, seconds = self._results.get_nowait()
+            except queue.Empty:
+                break
+            applied += 1
+            if gen != self._generation:
+                continue
+            self.done += 1
+            try:
+                set_row_duration(pl, iid, seconds)
+            except TclError:
+                pass  # la fila se borró mientras se leía
+
+        if self.total and self.done >= self.total:
+            self._finish()
+            return
+        self._notify()
+        playlist.after(BATCH_INTERVAL_MS, lambda: self._drain(playlist, gen_loop))
+
+    def _finish(self):
+        self._draining = False
+        self.total = 0
+        self.done = 0
+        self._notify()
+        cb, self._idle_callback = self._idle_callback, None
+        if cb is not None:
+            try:
+                cb()
+            except Exception as e:
+                print(f"⚠️ Error al terminar lectura de duraciones: {e}")
+
+    def _notify(self):
+        for cb in self._progress_listeners:
+            try:
+                cb(self.done, self.total)
+            except Exception:
+                pass
+
+
+# Instancia compartida (una sola playlist en la app)
+prober = DurationProber()
+
+__all__ = ["DurationProber", "prober", "PLACEHOLDER"]
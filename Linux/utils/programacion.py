@@ -1,9 +1,12 @@
 # utils/programacion.py
-import os
+import math
 import sys
 from datetime import datetime, timedelta
 from utils import events as evmod
 from utils import player_state as pst
+from utils import reloj
+from utils.disponibilidad import availability
+from utils.scheduler import scheduler, MAX_WAIT_MS
 
 def is_oneshot(e):
     return not e.get("intervalo_repeticion")
@@ -12,8 +15,8 @@ def sec_bucket(dt: datetime) -> datetime:
     return dt.replace(microsecond=0)
 
 def _has_valid_file(e):
-    p = e.get("archivo") or ""
-    return bool(p) and os.path.isfile(p)
+    # Desde memoria (utils.disponibilidad): el loop nunca hace stat
+    return availability.is_available(e.get("archivo") or "")
 
 def winner_in_bucket(bucket):
     if not bucket:
@@ -39,39 +42,36 @@ def next_multiple_after(anchor: datetime, interval_s: int, t: datetime) -> datet
     k = int(elapsed // interval_s) + 1
     return anchor + timedelta(seconds=interval_s * k)
 
+def _heap():
+    # Índice por hora de la lista compartida (utils.event_heap.EventList)
+    return evmod.eventos.heap
+
 def next_future_event(now: datetime):
-    futuros = [e for e in evmod.eventos if e.get("hora_inicio") and e["hora_inicio"] > now]
-    if not futuros:
-        return None
-    min_sec = min(sec_bucket(e["hora_inicio"]) for e in futuros)
-    bucket = [e for e in futuros if sec_bucket(e["hora_inicio"]) == min_sec]
-    return winner_in_bucket(bucket)
+    return winner_in_bucket(_heap().future_bucket(now))
 
 def select_due_event(now: datetime):
-    vencidos = [e for e in evmod.eventos if e.get("hora_inicio") and e["hora_inicio"] <= now]
-    if not vencidos:
-        return None
-    max_sec = max(sec_bucket(e["hora_inicio"]) for e in vencidos)
-    bucket = [e for e in vencidos if sec_bucket(e["hora_inicio"]) == max_sec]
-    return winner_in_bucket(bucket)
+    return winner_in_bucket(_heap().due_bucket(now))
 
 def reschedule_repeats_after_block(block_start: datetime, block_end: datetime):
-    for e in evmod.eventos:
+    # Consulta de rango sobre el índice por hora: solo lo que cayó dentro del bloque.
+    # No va por agenda.overlapping: se llama al terminar el bloque (block_end es
+    # "ahora"), así que esos disparos ya vencieron y la agenda solo guarda de
+    # ahora en adelante. Importa qué inicios quedaron adentro, no qué ventanas
+    # se cruzan con él (los choques al agregar sí usan la agenda: conflicts()).
+    for e in _heap().between(block_start, block_end):
         intervalo = e.get("intervalo_repeticion")
-        hora = e.get("hora_inicio")
-        if not intervalo or not isinstance(hora, datetime):
+        if not intervalo:
             continue
         ensure_anchor(e)
-        if block_start <= hora <= block_end:
-            e["hora_inicio"] = next_multiple_after(e["anchor"], intervalo, block_end)
+        e["hora_inicio"] = next_multiple_after(e["anchor"], intervalo, block_end)
+        evmod.eventos.reschedule(e)
 
 def pick_event_to_fire(now: datetime):
-    ev = select_due_event(now)
-    if not ev:
+    # El segundo vencido más reciente (mismo bucket que usa select_due_event)
+    same = _heap().due_bucket(now)
+    if not same:
         return None
-    sec = sec_bucket(ev["hora_inicio"])
-    same = [e for e in evmod.eventos if e.get("hora_inicio") and sec_bucket(e["hora_inicio"]) == sec and e["hora_inicio"] <= now]
-    win = winner_in_bucket(same) or ev
+    win = winner_in_bucket(same)
     if not _has_valid_file(win) and is_oneshot(win):
         try:
             evmod.eventos.remove(win)
@@ -99,7 +99,7 @@ def _clear_countdown_line():
     sys.stdout.flush()
 
 def _show_countdown(now):
-    proximo = next_future_event(now)
+    proximo = winner_in_bucket(evmod.eventos.agenda.next_bucket(now))
     if proximo:
         secs = int((proximo["hora_inicio"] - now).total_seconds())
         if secs >= 0 and secs != pst._last_countdown_secs:
@@ -112,47 +112,144 @@ def _show_countdown(now):
             pst._countdown_active = False
             pst._last_countdown_secs = None
 
+EVENT_FADE_MS = 300     # fade de la música que interrumpe un evento
+EVENT_LEAD_MS = 320     # el fade empieza esto antes de hora_inicio
+
+def next_event_time(now: datetime):
+    """hora_inicio más temprana del próximo segundo con eventos (> now), o None."""
+    bucket = _heap().future_bucket(now)
+    return min(e["hora_inicio"] for e in bucket) if bucket else None
+
+def _lookahead(now: datetime):
+    # Los próximos eventos dentro de la ventana de look-ahead se decodifican a memoria;
+    # lo que ya está listo para ellos se re-chequea en segundo plano (el disparo no hace stat)
+    from utils import event_preload
+    if pst.event_lookahead_ms <= 0 and pst.event_cache_mb <= 0:
+        return
+    proximos = _heap().upcoming(now, pst.event_preload_count)
+    if pst.event_lookahead_ms > 0:
+        limite = now + timedelta(milliseconds=pst.event_lookahead_ms)
+        event_preload.preload([e["archivo"] for e in proximos
+                               if e["hora_inicio"] <= limite and _has_valid_file(e)])
+    event_preload.revalidate([e["archivo"] for e in proximos])
+
+def _preroll(root, progress_bar, fire_at: datetime):
+    from utils import audio
+    try:
+        audio.fadeout(EVENT_FADE_MS)
+    except Exception:
+        audio.stop()
+    pst._pending_fire = fire_at
+    delay = max(0, math.ceil((fire_at - reloj.now()).total_seconds() * 1000))
+    scheduler.call_later(delay, lambda: _fire_pending(root, progress_bar))
+
+def _wants_queue():
+    # ¿Encolar la siguiente pista al acercarse el fin? (pistas cortas: como siempre)
+    from utils import audio
+    return (pst.gapless and audio.queued() is None and pst._queue_loading is None
+            and pst.evento_en_progreso is None
+            and pst.playback_started and not pst.paused and not audio.deck_busy()
+            and pst.song_length * 1000 > 2 * GAPLESS_LEAD_MS)
+
+def _wants_crossfade():
+    from utils import audio
+    return (pst.crossfade_ms > 0 and pst.evento_en_progreso is None
+            and pst.playback_started and not pst.paused and not audio.crossfading()
+            and pst.song_length * 1000 > 2 * pst.crossfade_ms)
+
+def _handoff(root, progress_bar, playlist, now: datetime, proxima):
+    # Paso a la pista siguiente sin esperar al fin: crossfade o empalme gapless
+    from utils import audio
+    from utils.crossfade import PREPARE_MS
+    from utils.player import (queue_next_song, promote_queued_song,
+                              prepare_next_song, crossfade_next_song)
+    if playlist is None:
+        return
+    if audio.queued() is not None:
+        if audio.queue_started():
+            promote_queued_song(root, playlist, progress_bar)
+        return
+    if pst.song_length <= 0:
+        return
+    restante_ms = pst.song_length * 1000 - audio.position_ms()
+    # Un evento antes del fin corta la pista con su pre-roll: no hay empalme
+    if proxima is not None and proxima <= now + timedelta(milliseconds=restante_ms + EVENT_LEAD_MS):
+        return
+    if _wants_crossfade():
+        if restante_ms > pst.crossfade_ms + PREPARE_MS:
+            return
+        if restante_ms > pst.crossfade_ms:
+            prepare_next_song(playlist)
+            return
+        if crossfade_next_song(root, playlist, progress_bar):
+            return
+        # No llegó a decodificarse: queda el empalme gapless
+    if _wants_queue() and restante_ms <= GAPLESS_LEAD_MS:
+        queue_next_song(playlist)
+
+def _fire_pending(root, progress_bar):
+    from utils.player import reproducir_evento
+    fire_at, pst._pending_fire = pst._pending_fire, None
+    if fire_at is None or pst.stopped:
+        return
+    # Se vuelve a elegir a la hora del disparo (pudo borrarse o cambiar algo en el fade)
+    ganador = pick_event_to_fire(max(reloj.now(), fire_at))
+    if ganador and _has_valid_file(ganador):
+        reproducir_evento(ganador, root, progress_bar)
+    else:
+        if ganador and is_oneshot(ganador):
+            try:
+                evmod.eventos.remove(ganador)
+            except Exception:
+                pass
+        wake_now()
+
 def handle_event_or_next_song(root, progress_bar, playlist):
-    import pygame
+    from utils import audio
     from utils.player import reproducir_evento, next_song
 
-    if pst.stopped:
+    # Un evento cargándose (utils.cargador) ya ganó: su respuesta despierta el loop.
+    # Una pista cargándose no frena a los eventos (reproducir_evento la cancela);
+    # solo lo que decide la pista siguiente espera a que llegue.
+    if pst.stopped or pst._pending_fire is not None or pst._loading_event is not None:
         return
+    song_loading = pst._loading is not None
 
-    now = datetime.now()
+    now = reloj.now()
+    _lookahead(now)
 
     if pst.evento_en_progreso is not None and is_oneshot(pst.evento_en_progreso):
-        if pygame.mixer.music.get_busy():
+        if audio.busy():
             if pst._countdown_active:
                 _clear_countdown_line()
                 pst._countdown_active = False
                 pst._last_countdown_secs = None
-            root.after(1000, lambda: handle_event_or_next_song(root, progress_bar, playlist))
             return
 
-    try:
-        _show_countdown(now)
-    except Exception:
-        pass
+    if pst.show_countdown:
+        try:
+            _show_countdown(now)
+        except Exception:
+            pass
 
     evento_vencido = select_due_event(now)
 
-    if pygame.mixer.music.get_busy():
+    if audio.busy():
         if evento_vencido is not None:
-            ganador = pick_event_to_fire(now) or evento_vencido
-            if not ganador:
-                root.after(1000, lambda: handle_event_or_next_song(root, progress_bar, playlist))
-                return
-            try:
-                pygame.mixer.music.fadeout(300)
-            except Exception:
-                pygame.mixer.music.stop()
-            root.after(320, lambda ev=ganador: reproducir_evento(ev, root, progress_bar))
+            # Atrasado: fade corto y a sonar
+            _preroll(root, progress_bar, now + timedelta(milliseconds=EVENT_LEAD_MS))
             return
-        root.after(1000, lambda: handle_event_or_next_song(root, progress_bar, playlist))
+        proxima = next_event_time(now)
+        if proxima is not None and (proxima - now).total_seconds() * 1000 <= EVENT_LEAD_MS:
+            # Pre-roll: el fade arranca antes para que el evento suene a su hora exacta
+            _preroll(root, progress_bar, proxima)
+            return
+        if not song_loading:
+            _handoff(root, progress_bar, playlist, now, proxima)
         return
 
     if pst.evento_en_progreso is not None:
+        audio.release_voice()   # el buffer precargado del evento ya no hace falta
         ev_id = id(pst.evento_en_progreso)
         if pst._last_finished_id != ev_id or not pst._finished_reported:
             nombre = pst.evento_en_progreso.get("nombre", "")
@@ -173,7 +270,7 @@ def handle_event_or_next_song(root, progress_bar, playlist):
             pst._finished_reported = True
         pst.evento_en_progreso = None
 
-        now2 = datetime.now()
+        now2 = reloj.now()
         ev2 = select_due_event(now2)
         if ev2 is not None:
             ganador2 = pick_event_to_fire(now2) or ev2
@@ -187,13 +284,14 @@ def handle_event_or_next_song(root, progress_bar, playlist):
                     except Exception:
                         pass
         # REANUDAR playlist solo si el usuario dio Play y no está en pausa
-        if pst.playback_started and not pst.paused and playlist is not None:
+        if pst.playback_started and not pst.paused and playlist is not None and not song_loading:
             next_song(root, playlist, progress_bar)
             return
-        try:
-            _show_countdown(now2)
-        except Exception:
-            pass
+        if pst.show_countdown:
+            try:
+                _show_countdown(now2)
+            except Exception:
+                pass
 
     if evento_vencido is not None:
         ganador = pick_event_to_fire(now) or evento_vencido
@@ -208,17 +306,93 @@ def handle_event_or_next_song(root, progress_bar, playlist):
         return
 
     # Fallback normal: solo avanzar música si el usuario arrancó la reproducción y NO está en pausa
-    if pst.playback_started and not pst.paused and playlist is not None:
+    if pst.playback_started and not pst.paused and playlist is not None and not song_loading:
+        proxima = next_event_time(now)
+        if proxima is not None and (proxima - now).total_seconds() * 1000 <= EVENT_LEAD_MS:
+            return   # el evento llega antes de que la pista se oiga: esperarlo
         next_song(root, playlist, progress_bar)
 
+# ---------------- plazos (los espera el hilo de utils.scheduler) ----------------
+TRACK_POLL_MS = 1000    # pista sin duración conocida: se vigila como antes
+END_SLACK_MS = 30       # margen tras el fin calculado de la pista
+END_RETRY_MS = 100      # la pista dura un poco más que su duración redondeada
+GAPLESS_LEAD_MS = 3000  # gapless: la siguiente pista se encola este tiempo antes del fin
+
+def next_deadline_ms(now: datetime):
+    """
+    Milisegundos hasta lo próximo que hay que atender: siguiente evento,
+    fin de la pista actual o cambio de segundo del contador. None si nada.
+    """
+    from utils import audio
+    if pst.stopped or pst._loading_event is not None:
+        return None
+    candidates = []
+
+    # Un evento único sonando no se corta: ni disparo ni pre-roll hasta que termine
+    bloqueado = pst.evento_en_progreso is not None and is_oneshot(pst.evento_en_progreso) and audio.busy()
+    if pst._pending_fire is None:
+        # Vencido y disparable (p. ej. se programó en el pasado): atender ya
+        vencido = select_due_event(now)
+        if vencido is not None and _has_valid_file(vencido) and not bloqueado:
+            candidates.append(0)
+    proxima = None if pst._pending_fire is not None else next_event_time(now)
+    if proxima is not None:
+        hasta = math.ceil((proxima - now).total_seconds() * 1000)
+        # Con música sonando se despierta antes, para el pre-roll del fade
+        # (ya dentro de la ventana, p. ej. la pista arrancó recién: ahora)
+        if audio.busy() and not bloqueado:
+            hasta = max(0, hasta - EVENT_LEAD_MS)
+        elif audio.busy() and hasta > EVENT_LEAD_MS:
+            hasta -= EVENT_LEAD_MS
+        candidates.append(hasta)
+        # ...y antes aún para precargar el archivo (look-ahead)
+        if hasta > pst.event_lookahead_ms > 0:
+            candidates.append(hasta - pst.event_lookahead_ms)
+    if proxima is not None and pst.show_countdown:
+        # El contador muestra segundos enteros: despertar cuando cambie
+        restante = (next_future_event(now)["hora_inicio"] - now).total_seconds()
+        frac = restante - math.floor(restante)
+        candidates.append(math.ceil(frac * 1000) or 1000)
+
+    # Con una pista cargándose, el fin de la actual no decide nada: su llegada despierta
+    if audio.busy() and pst._loading is None:
+        if audio.queued() is not None:
+            # Gapless: en el empalme, ponerse al día con la pista encolada
+            hasta = math.ceil((pst._queue_handoff - reloj.monotonic()) * 1000)
+            candidates.append(hasta + END_SLACK_MS if hasta > 0 else END_RETRY_MS)
+        elif pst.song_length > 0:
+            restante_ms = pst.song_length * 1000 - audio.position_ms()
+            candidates.append(restante_ms + END_SLACK_MS if restante_ms > 0 else END_RETRY_MS)
+            if restante_ms > GAPLESS_LEAD_MS and _wants_queue():
+                candidates.append(restante_ms - GAPLESS_LEAD_MS)
+            if _wants_crossfade():
+                from utils.crossfade import PREPARE_MS
+                for lead in (pst.crossfade_ms + PREPARE_MS, pst.crossfade_ms):
+                    if restante_ms > lead:
+                        candidates.append(restante_ms - lead)
+        else:
+            candidates.append(TRACK_POLL_MS)
+
+    if not candidates:
+        return None
+    return max(0, min(min(candidates), MAX_WAIT_MS))
+
+def rearm_wakeup():
+    """Recalcula el próximo plazo (tras play, alta de evento...)."""
+    scheduler.rearm()
+
+def wake_now():
+    """Atender ya (p. ej. la pista terminó)."""
+    scheduler.wake_now()
+
+def ui(fn):
+    """Actualizaciones de interfaz: siempre en el hilo de Tk."""
+    scheduler.ui(fn)
+
 def start_event_loop(root, progress_bar, playlist):
     pst.playlist_ref = playlist
-    def _tick():
-        try:
-            handle_event_or_next_song(root, progress_bar, pst.playlist_ref)
-        finally:
-            root.after(1000, _tick)
-    root.after(1000, _tick)
+    pst.progress_bar_ref = progress_bar
+    scheduler.start(root)
 
 __all__ = [
     "is_oneshot",
@@ -226,10 +400,15 @@ __all__ = [
     "winner_in_bucket",
     "ensure_anchor",
     "next_future_event",
+    "next_event_time",
     "select_due_event",
     "next_multiple_after",
     "reschedule_repeats_after_block",
     "pick_event_to_fire",
     "handle_event_or_next_song",
+    "next_deadline_ms",
+    "rearm_wakeup",
+    "wake_now",
+    "ui",
     "start_event_loop",
 ]
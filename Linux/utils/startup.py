@@ -0,0 +1,58 @@
+# utils/startup.py
+"""
+Perfil de arranque: `python main.py --startup-profile`.
+
+Cada import/inicialización pesada se envuelve en phase("nombre"); al pintarse
+la primera ventana se marca el tiempo y, al terminar lo diferido, report()
+imprime la tabla. Lo que ocurra después (p. ej. el mixer al primer Play) se
+imprime en el momento.
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+ENABLED = "--startup-profile" in sys.argv
+
+_t0 = time.perf_counter()
+_phases = []          # (nombre, inicio desde _t0, duración) en segundos
+_reported = False
+
+
+def _line(name, start, took):
+    return f"  {start * 1000:8.1f} ms  {took * 1000:8.1f} ms  {name}"
+
+
+@contextmanager
+def phase(name: str):
+    """Mide un bloque (import, init, carga). Sin --startup-profile no hace nada."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _phases.append((name, start - _t0, end - start))
+        if _reported:
+            print("[arranque]" + _line(name, start - _t0, end - start))
+
+
+def mark(name: str):
+    """Instante sin duración (p. ej. 'primera ventana')."""
+    if ENABLED:
+        _phases.append((name, time.perf_counter() - _t0, 0.0))
+
+
+def report():
+    global _reported
+    if not ENABLED or _reported:
+        return
+    _reported = True
+    print("[arranque]     inicio     duración  fase")
+    for name, start, took in _phases:
+        print("[arranque]" + _line(name, start, took))
+    print(f"[arranque] total hasta aquí: {(time.perf_counter() - _t0) * 1000:.1f} ms")
+
+
+__all__ = ["ENABLED", "phase", "mark", "report"]
@@ -7,6 +7,10 @@ import os.path as _osp
 
 STATE_FILE = "estado_reproductor.pkl"
 
+def _journaled(path: str) -> bool:
+    """¿Es el archivo del autoguardado? (rutas relativas o absolutas, igual da)."""
+    return _osp.normcase(_osp.abspath(path)) == _osp.normcase(_osp.abspath(STATE_FILE))
+
 def _format_repeat(intervalo: Optional[int]) -> str:
     """Devuelve texto 'Una sola vez' | 'Cada N Horas/Minutos/Segundos'."""
     if not intervalo:
@@ -17,36 +21,98 @@ def _format_repeat(intervalo: Optional[int]) -> str:
         return f"Cada {intervalo // 60} Minutos"
     return f"Cada {intervalo} Segundos"
 
-def save_state(playlist, event_list, mode_selector: Optional[object], file_path: Optional[str] = None):
+def build_state(playlist, event_list: Optional[object] = None, mode_selector: Optional[object] = None) -> dict:
     """
-    Guarda:
+    Arma el snapshot a guardar (en el hilo de Tk; es barato):
       - play_mode, current_song_index, paused
-      - playlist (tabla visual)
+      - playlist (filas del modelo)
       - event_list (tabla visual)
-      - eventos (lista real que usa el player: nombre, hora_inicio, intervalo_repeticion, archivo)
+      - eventos (copia de la lista real que usa el player: nombre, hora_inicio, intervalo_repeticion, archivo)
     """
-    from utils.player import current_song_index, paused  # evita import circular al cargar módulo
-    from utils.playlist import play_mode
+    from utils import player_state as pst  # evita import circular al cargar módulo
+    from utils.playlist_model import model_for
     from utils import events as evmod
 
+    with evmod.eventos.lock:   # el hilo del programador también la toca
+        eventos = [dict(e) for e in evmod.eventos]
+    return {
+        "play_mode": pst.play_mode,
+        "current_song_index": pst.current_song_index,
+        "paused": pst.paused,
+        # Tablas visuales
+        "playlist": model_for(playlist).rows() if playlist else [],
+        "event_list": [event_list.item(item)["values"] for item in event_list.get_children()] if event_list else [],
+        # Estructura real de eventos (copias: el hilo escritor no debe ver cambios a medias)
+        "eventos": eventos,
+    }
+
+def write_state(state: dict, target_file: str):
+    """Escritura atómica: archivo temporal + os.replace (nunca queda un .pkl a medias)."""
+    tmp_file = f"{target_file}.tmp"
+    with open(tmp_file, "wb") as f:
+        pickle.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, target_file)
+
+def save_state(playlist, event_list: Optional[object] = None, mode_selector: Optional[object] = None,
+               file_path: Optional[str] = None):
+    """Guardado inmediato (menú Guardar). Para autoguardado usar utils.persistence."""
     target_file = file_path if file_path else STATE_FILE
-
     try:
-        state = {
-            "play_mode": play_mode,
-            "current_song_index": current_song_index,
-            "paused": paused,
-            # Tablas visuales
-            "playlist": [playlist.item(item)["values"] for item in playlist.get_children()],
-            "event_list": [event_list.item(item)["values"] for item in event_list.get_children()],
-            # Estructura real de eventos (para que el loop funcione al reabrir)
-            "eventos": evmod.eventos,
-        }
-        with open(target_file, "wb") as f:
-            pickle.dump(state, f)
+        if not _journaled(target_file):
+            write_state(build_state(playlist, event_list, mode_selector), target_file)
+            return
+        from utils import journal
+        from utils.persistence import persistence
+        if persistence.bound:
+            # Que lo escriba el autoguardado: mismo hilo escritor, mismo gen
+            persistence.save_now()
+            return
+        # Snapshot con gen nuevo y bitácora vacía: la vieja no se reaplica encima
+        state = build_state(playlist, event_list, mode_selector)
+        gen = journal.current_gen + 1
+        state["journal_gen"] = gen
+        write_state(state, target_file)
+        journal.reset_journal(target_file, gen)
+        journal.current_gen = gen
+        journal.record_count = 0
+        journal.stale = False
     except Exception as e:
         print(f"⚠️ No se pudo guardar estado: {e}")
 
+def _read_with_journal(target_file: str) -> Optional[dict]:
+    """
+    Snapshot + replay de la bitácora (solo para STATE_FILE).
+    Deja en utils.journal el gen vigente y si la bitácora en disco quedó vieja.
+    """
+    from utils import journal
+
+    snapshot_exists = os.path.exists(target_file)
+    state = {}
+    if snapshot_exists:
+        with open(target_file, "rb") as f:
+            state = pickle.load(f)
+    if not _journaled(target_file):
+        return state if snapshot_exists else None
+
+    snap_gen = state.get("journal_gen") if snapshot_exists else 0
+    jgen, records = journal.read_journal(target_file)
+    if not snapshot_exists and jgen is None:
+        return None
+
+    journal.current_gen = snap_gen or 0
+    journal.record_count = 0
+    # Snapshot viejo (sin gen) o bitácora de otra generación: compactar en el próximo guardado
+    journal.stale = snap_gen is None or (jgen is not None and jgen != snap_gen)
+    if jgen is not None and jgen == snap_gen and records:
+        journal.replay(state, records)
+        journal.record_count = len(records)
+    # Eventos sin "id" (guardados antes de la bitácora por evento): snapshot nuevo con ids
+    if any(isinstance(e, dict) and not e.get("id") for e in state.get("eventos") or []):
+        journal.stale = True
+    return state
+
 def load_state(playlist, event_list, mode_selector: Optional[object], file_path: Optional[str] = None):
     """
     Carga el estado y:
@@ -57,26 +123,33 @@ def load_state(playlist, event_list, mode_selector: Optional[object], file_path:
       - restaura play_mode, índice y paused
     """
     from utils.player import set_current_song_index, set_paused
-    from utils.playlist import set_play_mode, get_duration
+    from utils.playlist import set_play_mode
+    from utils.playlist_model import model_for, render, parse_duration
+    from utils.probing import prober
+    from utils.metadata import get_duration
     from utils import events as evmod
 
     target_file = file_path if file_path else STATE_FILE
-    if not os.path.exists(target_file):
-        print("⚠️ No existe el archivo de estado.")
-        return
-
     try:
-        with open(target_file, "rb") as f:
-            state = pickle.load(f)
+        state = _read_with_journal(target_file)
     except Exception as e:
         print(f"⚠️ No se pudo cargar estado: {e}")
         return
+    if state is None:
+        print("⚠️ No existe el archivo de estado.")
+        return
 
     try:
         # ---------- Playlist visual ----------
-        playlist.delete(*playlist.get_children())
+        # El modelo se llena en Python y el Treeview se pinta una sola vez
+        model = model_for(playlist)
+        model.clear()
         for row in state.get("playlist", []):
-            playlist.insert("", "end", values=row)
+            if len(row) >= 3:
+                model.append(row[0], parse_duration(row[1]), row[2])
+        render(playlist)
+        for pos in model.unknown_positions():
+            prober.submit(playlist, model.iids[pos], model.paths[pos])
 
         # ---------- Eventos ----------
         event_list.delete(*event_list.get_children())
@@ -170,9 +243,8 @@ def load_state(playlist, event_list, mode_selector: Optional[object], file_path:
             mode_selector.set(loaded_mode)
 
         # Seleccionar ítem actual en playlist si aplica
-        items = playlist.get_children()
-        if 0 <= loaded_index < len(items):
-            song_id = items[loaded_index]
+        if 0 <= loaded_index < len(model):
+            song_id = model.iids[loaded_index]
             playlist.selection_set(song_id)
             playlist.focus(song_id)
 
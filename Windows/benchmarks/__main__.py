@@ -0,0 +1,110 @@
+# benchmarks/__main__.py
+"""
+Runner de la suite: python -m benchmarks [--quick] [--only a,b] [--out x.json] [--compare y.json]
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks import _APP_DIR
+
+SUITES = ("ingesta", "programacion", "estado", "duracion", "simulador")
+REGRESSION = 1.20   # más de +20 % contra la corrida anterior se marca
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_APP_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _default_out():
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(_APP_DIR, "benchmarks", "resultados", f"{stamp}.json")
+
+
+def _print_rows(rows):
+    for r in rows:
+        print(f"  {r['suite']:<13} {r['name']:<28} n={r['n']:<6} {r['seconds'] * 1000:10.3f} ms")
+
+
+def compare(rows, previous_file):
+    with open(previous_file, encoding="utf-8") as f:
+        previous = {(r["suite"], r["name"], r["n"]): r["seconds"] for r in json.load(f)["results"]}
+    print(f"\nComparación contra {previous_file}:")
+    worse = 0
+    for r in rows:
+        old = previous.get((r["suite"], r["name"], r["n"]))
+        if not old:
+            continue
+        ratio = r["seconds"] / old
+        flag = "⚠️" if ratio > REGRESSION else "  "
+        worse += ratio > REGRESSION
+        print(f"{flag} {r['suite']:<13} {r['name']:<28} n={r['n']:<6} x{ratio:5.2f}")
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--quick", action="store_true", help="tamaños chicos")
+    parser.add_argument("--only", default="", help="suites separadas por coma: " + ",".join(SUITES))
+    parser.add_argument("--out", default=None, help="archivo JSON de salida")
+    parser.add_argument("--compare", default=None, help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+
+    selected = [s.strip() for s in args.only.split(",") if s.strip()] or list(SUITES)
+    unknown = [s for s in selected if s not in SUITES]
+    if unknown:
+        parser.error(f"suites desconocidas: {', '.join(unknown)}")
+    out = os.path.abspath(args.out or _default_out())
+
+    rows = []
+    cwd = os.getcwd()
+    # Caché de metadatos y demás archivos relativos van a un directorio desechable
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)
+        try:
+            for name in selected:
+                print(f"[{name}] ...")
+                suite_rows = importlib.import_module(f"benchmarks.bench_{name}").run(quick=args.quick)
+                _print_rows(suite_rows)
+                rows.extend(suite_rows)
+        finally:
+            from utils.metadata import close_cache
+            from utils.probing import prober
+            prober.cancel()
+            close_cache()
+            os.chdir(cwd)
+
+    report = {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "app": os.path.basename(_APP_DIR),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": rows,
+    }
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados: {out}")
+
+    if args.compare:
+        return 1 if compare(rows, args.compare) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
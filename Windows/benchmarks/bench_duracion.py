@@ -0,0 +1,75 @@
+# benchmarks/bench_duracion.py
+"""
+Micro-benchmark: duración por encabezados (utils.audio_header) vs mutagen.
+
+Genera una biblioteca sintética en un directorio temporal (WAV PCM, MP3 CBR,
+MP3 con Xing+LAME, MP3 con VBRI y MP3 con ID3v2 grande al inicio), mide
+ambos caminos sobre los mismos archivos y compara los segundos obtenidos.
+
+Uso (desde la carpeta de la app):
+    python benchmarks/bench_duracion.py [archivos_por_tipo] [repeticiones]
+o como parte de la suite: python -m benchmarks --only duracion
+"""
+import os
+import sys
+import tempfile
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import best_of, result  # noqa: E402
+from benchmarks.biblioteca import build_duration_library  # noqa: E402
+from utils.audio_header import header_seconds  # noqa: E402
+
+SUITE = "duracion"
+
+
+def mutagen_seconds(path):
+    from mutagen.mp3 import MP3
+    from mutagen.wave import WAVE
+    audio = MP3(path) if path.lower().endswith(".mp3") else WAVE(path)
+    return audio.info.length
+
+
+def compare(per_kind, repeat):
+    """(t_encabezados, t_mutagen, n, caídas a mutagen, diferencias)."""
+    with tempfile.TemporaryDirectory() as folder:
+        paths = build_duration_library(folder, per_kind)
+        fast = [header_seconds(p) for p in paths]
+        slow = [mutagen_seconds(p) for p in paths]
+        fast_t = best_of(lambda: [header_seconds(p) for p in paths], repeat)
+        slow_t = best_of(lambda: [mutagen_seconds(p) for p in paths], repeat)
+
+    fallback = sum(1 for s in fast if s is None)
+    mismatch = [
+        (os.path.basename(p), a, b) for p, a, b in zip(paths, fast, slow)
+        if a is not None and int(a) != int(b)
+    ]
+    return fast_t, slow_t, len(paths), fallback, mismatch
+
+
+def run(quick=False):
+    per_kind = 20 if quick else 200
+    fast_t, slow_t, n, fallback, mismatch = compare(per_kind, 3 if quick else 5)
+    return [
+        result(SUITE, "header_seconds", n, fast_t, fallback=fallback, mismatch=len(mismatch)),
+        result(SUITE, "mutagen", n, slow_t),
+    ]
+
+
+def main():
+    per_kind = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    fast_t, slow_t, n, fallback, mismatch = compare(per_kind, repeat)
+    print(f"Archivos: {n} ({per_kind} por tipo), mejor de {repeat}")
+    print(f"  encabezados: {fast_t * 1000:8.1f} ms  ({fast_t / n * 1e6:6.1f} µs/archivo)")
+    print(f"  mutagen:     {slow_t * 1000:8.1f} ms  ({slow_t / n * 1e6:6.1f} µs/archivo)")
+    print(f"  aceleración: x{slow_t / fast_t:.1f}   caídas a mutagen: {fallback}")
+    if mismatch:
+        print(f"⚠️ {len(mismatch)} duraciones distintas (segundos enteros), p. ej.: {mismatch[:5]}")
+    else:
+        print("  duraciones (segundos enteros) idénticas en todos los archivos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_ingesta.py
+"""
+Ingesta: recorrer una biblioteca (find_music_files) y meterla a la playlist
+(add_to_playlist) sobre un StubTreeview, más el caso 'todo duplicado'.
+"""
+import tempfile
+
+from benchmarks import best_of, result
+from benchmarks.biblioteca import build_tree
+from benchmarks.stubs import StubTreeview
+
+SUITE = "ingesta"
+SIZES = (100, 1000, 5000)
+QUICK_SIZES = (100, 500)
+
+
+def run(quick=False):
+    from utils.playlist import add_to_playlist, find_music_files
+    from utils.probing import prober
+
+    rows = []
+    repeat = 3 if quick else 5
+    for n in (QUICK_SIZES if quick else SIZES):
+        with tempfile.TemporaryDirectory() as folder:
+            build_tree(folder, n)
+
+            found = []
+            t = best_of(lambda: found.__setitem__(slice(None), find_music_files(folder)), repeat)
+            rows.append(result(SUITE, "find_music_files", n, t, found=len(found)))
+
+            state = {}
+
+            def fresh():
+                prober.cancel()
+                state["tree"] = StubTreeview()
+
+            t = best_of(lambda: add_to_playlist(found, state["tree"]), repeat, setup=fresh)
+            rows.append(result(SUITE, "add_to_playlist", n, t))
+
+            # Re-soltar la misma carpeta: todo es duplicado (índice por ruta)
+            t = best_of(lambda: add_to_playlist(found, state["tree"]), repeat)
+            rows.append(result(SUITE, "add_to_playlist_duplicados", n, t))
+            prober.cancel()
+    return rows
+
+
+__all__ = ["run"]
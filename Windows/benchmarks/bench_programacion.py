@@ -0,0 +1,90 @@
+# benchmarks/bench_programacion.py
+"""
+Programación de eventos: select_due_event / pick_event_to_fire /
+next_future_event y un tick completo del loop (handle_event_or_next_song)
+con 10..10000 eventos, mitad repetitivos, alrededor de 'ahora'.
+"""
+import contextlib
+import io
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from benchmarks import best_of, result
+from benchmarks.biblioteca import write_wav
+from benchmarks.stubs import StubTreeview, install_stub_mixer
+
+SUITE = "programacion"
+SIZES = (10, 100, 1000, 10000)
+QUICK_SIZES = (10, 100, 1000)
+
+
+def make_events(n, now, audio_file, seed=1234):
+    """n eventos entre -1 h y +1 h de `now`; la mitad se repite cada 5-60 min."""
+    rng = random.Random(seed)
+    eventos = []
+    for i in range(n):
+        hora = (now + timedelta(seconds=rng.randint(-3600, 3600))).replace(microsecond=0)
+        intervalo = rng.choice((300, 600, 1800, 3600)) if i % 2 else None
+        eventos.append({
+            "nombre": f"evento_{i:05d}",
+            "hora_inicio": hora,
+            "intervalo_repeticion": intervalo,
+            "archivo": audio_file,
+            "anchor": hora,
+        })
+    return eventos
+
+
+def run(quick=False):
+    from utils import events as evmod
+    from utils import player_state as pst
+    from utils import programacion as prog
+
+    music = install_stub_mixer()
+    rows = []
+    repeat = 3 if quick else 5
+    now = datetime.now().replace(microsecond=0)
+    with tempfile.TemporaryDirectory() as folder:
+        audio_file = os.path.join(folder, "aviso.wav")
+        write_wav(audio_file)
+        saved = list(evmod.eventos)
+        try:
+            for n in (QUICK_SIZES if quick else SIZES):
+                base = make_events(n, now, audio_file)
+
+                def reset():
+                    # in-place: los módulos comparten la misma lista
+                    evmod.eventos[:] = [dict(e) for e in base]
+
+                reset()
+                t = best_of(lambda: prog.select_due_event(now), repeat)
+                rows.append(result(SUITE, "select_due_event", n, t))
+                t = best_of(lambda: prog.pick_event_to_fire(now), repeat, setup=reset)
+                rows.append(result(SUITE, "pick_event_to_fire", n, t))
+                t = best_of(lambda: prog.next_future_event(now), repeat)
+                rows.append(result(SUITE, "next_future_event", n, t))
+
+                # Tick completo del loop mientras suena música (camino más común)
+                root = StubTreeview()
+
+                def busy():
+                    reset()
+                    music.busy = True
+                    pst.stopped = False
+                    pst.evento_en_progreso = None
+                    pst._pending_fire = None
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    t = best_of(lambda: prog.handle_event_or_next_song(root, {}, None), repeat, setup=busy)
+                rows.append(result(SUITE, "handle_event_or_next_song", n, t))
+        finally:
+            evmod.eventos[:] = saved
+            pst.stopped = False
+            pst.evento_en_progreso = None
+            pst._pending_fire = None
+    return rows
+
+
+__all__ = ["run", "make_events"]
@@ -0,0 +1,448 @@
+# benchmarks/simulador.py
+"""
+Simulador del programador con reloj virtual: una semana de programación en segundos.
+
+Corre el código real (handle_event_or_next_song, reproducir_evento,
+next_song, el pre-roll y el cálculo de plazos del hilo del programador)
+contra:
+  - un reloj virtual (utils.reloj.set_clock) que salta de plazo en plazo;
+  - un mixer falso que responde ocupado/libre según la duración de cada
+    archivo (caché de metadatos, o la duración por defecto si no existe);
+  - archivos siempre disponibles (no se toca el disco).
+
+Sale una línea de tiempo (qué sonó, desde/hasta, retraso de cada evento) y
+un resumen: sirve para revisar una programación antes de salir al aire y
+como prueba de regresión / rendimiento del programador.
+
+Uso (desde la carpeta de la app):
+    python -m benchmarks.simulador --estado estado_reproductor.pkl --dias 7
+    python -m benchmarks.simulador --eventos 40 --canciones 200 --salida linea.csv
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import StubTreeview  # noqa: E402
+
+DEFAULT_SECONDS = 180
+STUCK_LIMIT = 1000      # vueltas seguidas en el mismo instante: se empuja el reloj 1 ms
+
+
+class SimClock:
+    """Reloj virtual: monotónico en segundos desde 0 y hora de pared derivada."""
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self.mono = 0.0
+
+    def monotonic(self) -> float:
+        return self.mono
+
+    def wall(self) -> datetime:
+        return self.start + timedelta(seconds=self.mono)
+
+    def advance_to(self, mono: float):
+        if mono > self.mono:
+            self.mono = mono
+
+
+class SimMusic:
+    """pygame.mixer.music según el reloj virtual: suena mientras no pase la duración del archivo."""
+
+    def __init__(self, sim):
+        self._sim = sim
+        self.loaded = None
+        self._started = None
+        self._end = None
+        self._paused_at = None
+        self._queued = None
+
+    def load(self, path, namehint=""):
+        self.loaded = path if isinstance(path, str) else getattr(path, "name", "")
+        self._queued = None
+
+    def play(self, *a, **kw):
+        self._start(self._sim.clock.mono)
+
+    def _start(self, at):
+        self._started = at
+        self._end = at + self._sim.seconds(self.loaded)
+        self._paused_at = None
+        self._sim.on_play(self.loaded, at, self._end)
+
+    def queue(self, path, namehint="", loops=0):
+        self._queued = path
+
+    def _roll(self):
+        # Gapless: al terminar la pista, la encolada empieza justo en su fin
+        if self._queued is not None and self._end is not None and self._paused_at is None \
+                and self._sim.clock.mono >= self._end:
+            self.loaded, self._queued = self._queued, None
+            self._start(self._end)
+
+    def stop(self):
+        self._queued = None
+        if self.get_busy():
+            self._sim.on_cut(self._sim.clock.mono)
+        self._end = None
+
+    def fadeout(self, ms):
+        self._queued = None
+        if self.get_busy():
+            self._end = min(self._end, self._sim.clock.mono + ms / 1000)
+            self._sim.on_cut(self._end)
+
+    def set_volume(self, value):
+        pass
+
+    def pause(self):
+        if self.get_busy():
+            self._paused_at = self._sim.clock.mono
+
+    def unpause(self):
+        if self._paused_at is not None:
+            shift = self._sim.clock.mono - self._paused_at
+            self._started += shift
+            self._end += shift
+            self._paused_at = None
+
+    def get_busy(self):
+        self._roll()
+        return self._end is not None and self._paused_at is None and self._sim.clock.mono < self._end
+
+    def get_pos(self):
+        self._roll()
+        if self._started is None:
+            return -1
+        return int(((self._paused_at or self._sim.clock.mono) - self._started) * 1000)
+
+
+class _SimMixerModule:
+    def __init__(self, sim):
+        self.music = SimMusic(sim)
+
+    def get_init(self):
+        return (44100, -16, 2)
+
+    def init(self, *a, **kw):
+        pass
+
+
+class _SimPygame:
+    def __init__(self, sim):
+        self.mixer = _SimMixerModule(sim)
+
+
+class _NullRoot:
+    """Sin Tk: las barras de progreso no hacen falta y las after() no corren."""
+
+    def after(self, ms, fn=None, *args):
+        return None
+
+    def after_cancel(self, ident):
+        pass
+
+
+class Simulator:
+    """
+    durations: {ruta: segundos} que manda sobre el caché de metadatos
+    (programaciones sintéticas, archivos que no están en esta máquina).
+    """
+
+    def __init__(self, start: datetime, durations=None, default_seconds=DEFAULT_SECONDS, seed=0):
+        self.clock = SimClock(start)
+        self.durations = dict(durations or {})
+        self.default_seconds = default_seconds
+        self.seed = seed
+        self.timeline = []       # dicts: inicio, fin, tipo, nombre, archivo, programado, retraso_ms
+        self.steps = 0
+        self.stuck = 0           # plazos atascados (se empujó el reloj 1 ms)
+        self.warnings = []       # avisos "⚠️" del reproductor durante la corrida
+        self.elapsed = 0.0
+        self._seconds = {}
+        self._expected = 0
+
+    # ---------------- duraciones ----------------
+    def seconds(self, path) -> int:
+        if path in self.durations:
+            return self.durations[path]
+        secs = self._seconds.get(path)
+        if secs is None:
+            from utils.metadata import get_seconds
+            secs = self._seconds[path] = get_seconds(path or "") or self.default_seconds
+        return secs
+
+    def _get_duration(self, path):
+        from utils.metadata import format_duration
+        secs = self.seconds(path)
+        return format_duration(secs), secs
+
+    # ---------------- línea de tiempo ----------------
+    def on_play(self, path, start_mono, end_mono):
+        from utils import player_state as pst
+        now = self.clock.start + timedelta(seconds=start_mono)
+        self.on_cut(start_mono)
+        ev = pst.evento_en_progreso
+        row = {
+            "inicio": now,
+            "fin": self.clock.start + timedelta(seconds=end_mono),
+            "tipo": "cancion",
+            "nombre": os.path.basename(path or ""),
+            "archivo": path,
+            "programado": None,
+            "retraso_ms": None,
+        }
+        if ev is not None and ev.get("archivo") == path:
+            row["tipo"] = "evento"
+            row["nombre"] = ev.get("nombre", row["nombre"])
+            programado = ev.get("hora_inicio")
+            if isinstance(programado, datetime):
+                row["programado"] = programado
+                row["retraso_ms"] = (now - programado).total_seconds() * 1000
+        self.timeline.append(row)
+
+    def on_cut(self, at_mono):
+        """Lo que sonaba termina en at_mono (stop o fade), si no terminaba antes."""
+        if self.timeline:
+            last = self.timeline[-1]
+            at = self.clock.start + timedelta(seconds=at_mono)
+            if at < last["fin"]:
+                last["fin"] = at
+                last["cortado"] = True
+
+    # ---------------- corrida ----------------
+    @contextlib.contextmanager
+    def _installed(self):
+        """Reloj, mixer y disponibilidad virtuales; al salir, todo vuelve como estaba."""
+        from utils import audio, player, reloj
+        from utils import player_state as pst
+        from utils.cargador import loader
+        from utils.disponibilidad import availability
+
+        saved = (audio._pygame, player.get_duration, pst.show_countdown, pst.event_lookahead_ms,
+                 pst.crossfade_ms, pst.event_cache_mb)
+        audio._pygame = _SimPygame(self)
+        player.get_duration = self._get_duration
+        pst.show_countdown = False
+        pst.event_lookahead_ms = 0          # sin hilos de precarga: el disco no existe aquí
+        pst.crossfade_ms = 0                # sin decodificar: el mixer falso no tiene canales
+        pst.event_cache_mb = 0
+        availability.assume(True)
+        loader.direct = True                # las rutas van directo al mixer falso
+        reloj.set_clock(wall=self.clock.wall, mono=self.clock.monotonic)
+        try:
+            yield
+        finally:
+            reloj.set_clock()
+            availability.assume(None)
+            loader.direct = False
+            (audio._pygame, player.get_duration, pst.show_countdown, pst.event_lookahead_ms,
+             pst.crossfade_ms, pst.event_cache_mb) = saved
+
+    def run(self, playlist, days=7.0, quiet=True):
+        """Simula `days` días desde el inicio; devuelve la línea de tiempo."""
+        from utils import events as evmod
+        from utils import player
+        from utils import player_state as pst
+        from utils.agenda import occurrences
+        from utils.scheduler import scheduler
+
+        end = days * 86400
+        start_wall = self.clock.start
+        self._expected = sum(
+            len(occurrences(ev, start_wall, start_wall + timedelta(days=days), limit=10 ** 6))
+            for ev in evmod.eventos
+        )
+        random.seed(self.seed)
+        out = io.StringIO() if quiet else sys.stdout
+        t0 = time.perf_counter()
+        with self._installed(), contextlib.redirect_stdout(out):
+            root = _NullRoot()
+            progress = {}
+            pst.progress_bar_ref = progress
+            pst.playlist_ref = playlist
+            pst.paused = False
+            pst._pending_fire = None
+            pst.evento_en_progreso = None
+            scheduler.start(root, threaded=False)
+            player.play_song(root, playlist, progress)
+            last, repeats = None, 0
+            while True:
+                wake = scheduler.next_wakeup()
+                if wake is None or wake > end:
+                    break
+                repeats = repeats + 1 if last is not None and wake <= last else 0
+                if repeats >= STUCK_LIMIT:
+                    # Un plazo que vence sin hacer nada (bug): se registra y se sigue
+                    self.stuck += 1
+                    wake, repeats = last + 0.001, 0
+                self.clock.advance_to(wake)
+                last = self.clock.mono
+                scheduler.step()
+                self.steps += 1
+            self.clock.advance_to(end)
+            player.stop_song(playlist)
+            pst._pending_fire = None
+        self.elapsed = time.perf_counter() - t0
+        if quiet:
+            self.warnings = [line for line in out.getvalue().splitlines() if "⚠️" in line]
+        return self.timeline
+
+    # ---------------- salida ----------------
+    def summary(self) -> dict:
+        eventos = [r for r in self.timeline if r["tipo"] == "evento"]
+        retrasos = sorted(r["retraso_ms"] for r in eventos if r["retraso_ms"] is not None)
+        from utils.lateness import TOLERANCE_MS
+        return {
+            "desde": self.clock.start.isoformat(timespec="seconds"),
+            "hasta": self.clock.wall().isoformat(timespec="seconds"),
+            "canciones": len(self.timeline) - len(eventos),
+            "eventos_disparados": len(eventos),
+            "eventos_esperados": self._expected,
+            "eventos_fuera_de_tolerancia": sum(abs(x) > TOLERANCE_MS for x in retrasos),
+            "retraso_max_ms": round(retrasos[-1], 1) if retrasos else None,
+            "cortes": sum(bool(r.get("cortado")) for r in self.timeline),
+            "vueltas": self.steps,
+            "plazos_atascados": self.stuck,
+            "avisos": len(self.warnings),
+            "segundos_reales": round(self.elapsed, 3),
+        }
+
+    def write(self, path):
+        rows = [{
+            "inicio": r["inicio"].isoformat(timespec="milliseconds"),
+            "fin": r["fin"].isoformat(timespec="milliseconds"),
+            "tipo": r["tipo"],
+            "nombre": r["nombre"],
+            "archivo": r["archivo"],
+            "programado": r["programado"].isoformat(timespec="milliseconds") if r["programado"] else "",
+            "retraso_ms": "" if r["retraso_ms"] is None else round(r["retraso_ms"], 1),
+            "cortado": bool(r.get("cortado")),
+        } for r in self.timeline]
+        if path.lower().endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"resumen": self.summary(), "linea_de_tiempo": rows}, f, indent=2, ensure_ascii=False)
+            return
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["inicio"])
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+# ---------------- programaciones ----------------
+def synthetic(n_events, n_songs, start: datetime, days=7.0, seed=1234):
+    """
+    (playlist, eventos, duraciones): canciones de 2:30-5:00 y avisos de 10-60 s;
+    la mitad de los eventos se repite cada 15 min-2 h, el resto cae una vez en la semana.
+    """
+    rng = random.Random(seed)
+    durations = {}
+    playlist = StubTreeview()
+    from utils.playlist_model import model_for, render
+    model = model_for(playlist)
+    model.clear()
+    for i in range(n_songs):
+        path = f"/sim/musica/cancion_{i:04d}.mp3"
+        durations[path] = rng.randint(150, 300)
+        model.append(os.path.basename(path), durations[path], path)
+    render(playlist)
+    eventos = []
+    for i in range(n_events):
+        path = f"/sim/avisos/aviso_{i:03d}.mp3"
+        durations[path] = rng.randint(10, 60)
+        intervalo = rng.choice((900, 1800, 3600, 7200)) if i % 2 else None
+        offset = rng.randint(60, 3600) if intervalo else rng.randint(60, int(days * 86400))
+        hora = (start + timedelta(seconds=offset)).replace(microsecond=0)
+        eventos.append({
+            "nombre": f"aviso_{i:03d}",
+            "hora_inicio": hora,
+            "intervalo_repeticion": intervalo,
+            "archivo": path,
+            "anchor": hora,
+        })
+    return playlist, eventos, durations
+
+
+def from_state(file_path):
+    """(playlist, eventos) de un .pkl de estado, sin pantalla."""
+    from utils import events as evmod
+    from utils.state import load_state
+    playlist = StubTreeview()
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_state(playlist, StubTreeview(), None, file_path)
+    return playlist, [dict(ev) for ev in evmod.eventos]
+
+
+def simulate(playlist, eventos, start, days=7.0, durations=None,
+             default_seconds=DEFAULT_SECONDS, seed=0, quiet=True) -> Simulator:
+    """Carga `eventos` en utils.events.eventos (sin reasignar la lista) y simula."""
+    from utils import events as evmod
+    evmod.eventos[:] = [dict(ev) for ev in eventos]
+    sim = Simulator(start, durations, default_seconds, seed)
+    sim.run(playlist, days, quiet)
+    return sim
+
+
+def _print_timeline(sim, only_events):
+    for r in sim.timeline:
+        if only_events and r["tipo"] != "evento":
+            continue
+        extra = f"  ({r['retraso_ms']:+.0f} ms)" if r["retraso_ms"] is not None else ""
+        corte = "  [cortado]" if r.get("cortado") else ""
+        print(f"{r['inicio']:%a %d/%m %H:%M:%S.%f}"[:-3] + f"  {r['fin']:%H:%M:%S}"
+              f"  {r['tipo']:<7} {r['nombre']}{extra}{corte}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.simulador")
+    parser.add_argument("--estado", default=None, help=".pkl de estado a simular")
+    parser.add_argument("--eventos", type=int, default=20, help="eventos sintéticos (sin --estado)")
+    parser.add_argument("--canciones", type=int, default=100, help="canciones sintéticas (sin --estado)")
+    parser.add_argument("--dias", type=float, default=7.0)
+    parser.add_argument("--desde", default=None, help="AAAA-MM-DD[THH:MM:SS] (por defecto, ahora)")
+    parser.add_argument("--duracion-por-defecto", type=int, default=DEFAULT_SECONDS,
+                        help="segundos para archivos sin duración conocida")
+    parser.add_argument("--semilla", type=int, default=0, help="para el modo Aleatorio")
+    parser.add_argument("--salida", default=None, help="línea de tiempo en .csv o .json")
+    parser.add_argument("--mostrar", choices=("nada", "eventos", "todo"), default="eventos")
+    parser.add_argument("--verbose", action="store_true", help="dejar pasar la salida del reproductor")
+    args = parser.parse_args(argv)
+
+    start = datetime.fromisoformat(args.desde) if args.desde else datetime.now().replace(microsecond=0)
+    if args.estado:
+        playlist, eventos = from_state(args.estado)
+        durations = None
+    else:
+        playlist, eventos, durations = synthetic(args.eventos, args.canciones, start, args.dias)
+
+    sim = simulate(playlist, eventos, start, args.dias, durations,
+                   args.duracion_por_defecto, args.semilla, quiet=not args.verbose)
+    if args.mostrar != "nada":
+        _print_timeline(sim, only_events=args.mostrar == "eventos")
+    for line in sim.warnings[:20]:
+        print(line)
+    print()
+    for k, v in sim.summary().items():
+        print(f"  {k:<28} {v}")
+    if args.salida:
+        sim.write(args.salida)
+        print(f"\nLínea de tiempo: {os.path.abspath(args.salida)}")
+    return 0
+
+
+__all__ = ["Simulator", "SimClock", "SimMusic", "synthetic", "from_state", "simulate"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
@@ -0,0 +1,149 @@
+# benchmarks/stubs.py
+"""
+Sustitutos sin pantalla ni audio.
+
+- StubTreeview: lo que usan playlist/estado/prober de ttk.Treeview (insert,
+  item, set, delete, selection, after...). Los after() se guardan y solo
+  corren con run_pending().
+- StubMixer: imita pygame.mixer.music; install_stub_mixer() lo deja en
+  utils.audio para que nada abra el dispositivo de sonido.
+"""
+import itertools
+from tkinter import TclError
+
+_COLUMNS = {"Nombre": 0, "Duración": 1, "Ruta": 2}
+
+
+class StubTreeview:
+    def __init__(self):
+        self._rows = {}           # iid -> lista de valores (dict conserva el orden)
+        self._ids = itertools.count(1)
+        self._selection = ()
+        self._after = []
+
+    # ---------------- filas ----------------
+    def insert(self, parent, index, values=(), **kw):
+        iid = f"I{next(self._ids):05X}"
+        self._rows[iid] = list(values)
+        return iid
+
+    def get_children(self, item=""):
+        return tuple(self._rows)
+
+    def item(self, iid, option=None, **kw):
+        if iid not in self._rows:
+            raise TclError(f"Item {iid} not found")
+        if option == "values":
+            return tuple(self._rows[iid])
+        return {"values": list(self._rows[iid])}
+
+    def set(self, iid, column, value=None):
+        if iid not in self._rows:
+            raise TclError(f"Item {iid} not found")
+        self._rows[iid][_COLUMNS[column]] = value
+
+    def delete(self, *iids):
+        for iid in iids:
+            self._rows.pop(iid, None)
+
+    def index(self, iid):
+        return list(self._rows).index(iid)
+
+    # ---------------- selección ----------------
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, *iids):
+        self._selection = iids
+
+    def selection_clear(self, *a):
+        self._selection = ()
+
+    def focus(self, *a):
+        return ""
+
+    def see(self, *a):
+        pass
+
+    # ---------------- timers ----------------
+    def after(self, ms, fn=None, *args):
+        self._after.append((fn, args))
+        return f"after#{len(self._after)}"
+
+    def after_idle(self, fn, *args):
+        return self.after(0, fn, *args)
+
+    def after_cancel(self, ident):
+        pass
+
+    def run_pending(self):
+        """Corre los after() acumulados (una vuelta; lo que reprogramen queda para la siguiente)."""
+        pending, self._after = self._after, []
+        for fn, args in pending:
+            fn(*args)
+
+
+class StubMusic:
+    def __init__(self):
+        self.busy = False
+        self.loaded = None
+        self.calls = 0
+
+    def load(self, path, namehint=""):
+        self.calls += 1
+        self.loaded = path
+
+    def play(self, *a, **kw):
+        self.calls += 1
+        self.busy = True
+
+    def queue(self, path, namehint="", loops=0):
+        self.calls += 1
+
+    def stop(self):
+        self.calls += 1
+        self.busy = False
+
+    def fadeout(self, ms):
+        self.stop()
+
+    def set_volume(self, value):
+        pass
+
+    def pause(self):
+        self.calls += 1
+
+    def unpause(self):
+        self.calls += 1
+
+    def get_busy(self):
+        return self.busy
+
+    def get_pos(self):
+        return 0
+
+
+class _StubMixerModule:
+    def __init__(self):
+        self.music = StubMusic()
+
+    def get_init(self):
+        return (44100, -16, 2)
+
+    def init(self, *a, **kw):
+        pass
+
+
+class _StubPygame:
+    def __init__(self):
+        self.mixer = _StubMixerModule()
+
+
+def install_stub_mixer() -> StubMusic:
+    """Reemplaza el pygame perezoso de utils.audio; devuelve el stub de music."""
+    from utils import audio
+    audio._pygame = _StubPygame()
+    return audio._pygame.mixer.music
+
+
+__all__ = ["StubTreeview", "StubMusic", "install_stub_mixer"]
@@ -0,0 +1,40 @@
+# gui/indicador_carga.py
+import ttkbootstrap as ttkb
+
+def crear_indicador_carga(parent):
+    """
+    Fila compacta: 'Leyendo duraciones 120/500  [=====]  ✖ Cancelar'.
+    Se crea SIN empacar; se muestra/oculta sola con actualizar_indicador_carga.
+    Retorna (frame, botón_cancelar).
+    """
+    frame = ttkb.Frame(parent)
+
+    label = ttkb.Label(frame, text="")
+    pb = ttkb.Progressbar(frame, length=160, mode="determinate", maximum=100, bootstyle="info")
+    btn_cancelar = ttkb.Button(frame, text="✖ Cancelar", bootstyle="secondary-outline")
+
+    label.pack(side="left", padx=(0, 6))
+    pb.pack(side="left", padx=6)
+    btn_cancelar.pack(side="left", padx=6)
+
+    frame._label = label
+    frame._pb = pb
+    frame._visible = False
+    return frame, btn_cancelar
+
+
+def actualizar_indicador_carga(indicador, texto, hechas, total):
+    """total == 0 -> ocultar; si no, mostrar 'texto hechas/total' y el avance."""
+    if not total:
+        if indicador._visible:
+            indicador.pack_forget()
+            indicador._visible = False
+        return
+    if not indicador._visible:
+        indicador.pack(padx=5, pady=(0, 5))
+        indicador._visible = True
+    indicador._label.configure(text=f"{texto} {hechas}/{total}")
+    indicador._pb["value"] = (hechas / total) * 100
+
+
+__all__ = ["crear_indicador_carga", "actualizar_indicador_carga"]
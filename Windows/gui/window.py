@@ -1,12 +1,42 @@
 # gui/window.py
+import tkinter as tk
 import ttkbootstrap as ttkb
 from tkinterdnd2 import TkinterDnD
 
-class CustomTk(TkinterDnD.Tk):
+class CustomTk(tk.Tk, TkinterDnD.DnDWrapper):
+    """
+    Igual que TkinterDnD.Tk, pero la librería tkdnd (Tcl + binario) no se carga
+    en el constructor: enable_dnd() lo hace después de pintar la primera ventana.
+    """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.TkdndVersion = None
+        self._dnd_pending = []
         ttkb.Style("cyborg")
 
+def when_dnd_ready(root, callback):
+    """Ejecuta callback() cuando tkdnd esté cargado (de inmediato si ya lo está)."""
+    if getattr(root, "TkdndVersion", None):
+        callback()
+    else:
+        root._dnd_pending.append(callback)
+
+def enable_dnd(root):
+    """Carga tkdnd (package require) y corre lo que esperaba por él. True si quedó activo."""
+    from utils import startup
+    if root.TkdndVersion:
+        return True
+    try:
+        with startup.phase("tkdnd (package require)"):
+            root.TkdndVersion = TkinterDnD._require(root)
+    except RuntimeError as e:
+        print(f"⚠️ Error cargando tkdnd: {e}")
+        return False
+    pending, root._dnd_pending = root._dnd_pending, []
+    for callback in pending:
+        callback()
+    return True
+
 def crear_root(title="Reproductor con eventos", size="1000x600"):
     root = CustomTk()
     root.title(title)
@@ -1,26 +1,29 @@
 import os
 import sys
 import platform
-import pickle
-import pygame
-from datetime import datetime, timedelta
 from tkinter import TclError
 
 print(">>> MAIN EN:", os.path.abspath(__file__))
 
-from mutagen.mp3 import MP3
-from mutagen.wave import WAVE
+from utils import startup  # primero: mide lo que viene (--startup-profile)
+
+# DnD (el módulo Python es liviano; la librería Tcl se carga tras la primera ventana)
 from tkinterdnd2 import DND_FILES
 
-from gui import create_gui
-from utils import (
-    save_state, load_state, load_playlist, save_playlist,
-    new_playlist, update_play_mode,
-    on_drop, play_song, pause_song, stop_song,
-    next_song, open_event_window
-)
-from utils.explorer import setup_explorer
-from utils.programacion import start_event_loop
+with startup.phase("import gui (tkinter/ttkbootstrap)"):
+    from gui import create_gui
+    from gui.indicador_carga import actualizar_indicador_carga
+    from gui.window import enable_dnd
+with startup.phase("import utils"):
+    from utils import (
+        save_state, load_state, load_playlist, save_playlist,
+        new_playlist, update_play_mode, on_drop,
+    )
+    from utils import audio
+    from utils.explorer import setup_explorer
+    from utils.probing import prober
+    from utils.persistence import persistence
+    from utils.ingestion import cancel_ingestion
 
 # ---------------- tkdnd detection (Windows/Linux & PyInstaller) ----------------
 def _find_tkdnd_paths():
@@ -73,7 +76,8 @@ def _find_tkdnd_paths():
 # -----------------------------------------------------------------------------
 
 def run():
-    gui = create_gui()
+    with startup.phase("create_gui"):
+        gui = create_gui()
 
     root = gui["root"]
     tree = gui["tree"]
@@ -86,53 +90,93 @@ def run():
     mode_selector = gui["mode_selector"]
     playlist = gui["playlist"]
     progress_bar = gui["progress_bar"]
-
-    # Cargar tkdnd (portable y seguro en Windows usando / y tk.call)
-    tkdnd_dir, tkdnd_path, tkdnd_unix_path = _find_tkdnd_paths()
-    try:
-        if tkdnd_dir and tkdnd_path and os.path.isfile(tkdnd_path):
-            tkdnd_dir_posix = tkdnd_dir.replace("\\", "/")
-            tkdnd_path_posix = tkdnd_path.replace("\\", "/")
-            os.environ["TKDND_LIBRARY"] = tkdnd_dir_posix
-            root.tk.call('source', tkdnd_path_posix)
-            if tkdnd_unix_path and os.path.isfile(tkdnd_unix_path) and os.name != "nt":
-                root.tk.call('source', tkdnd_unix_path.replace("\\", "/"))
-        else:
-            raise TclError("No se encontró carpeta tkdnd válida.")
-    except TclError as e:
-        print("⚠️ Error cargando tkdnd:", e)
-        print("Rutas probadas:")
-        print("  dir:", tkdnd_dir)
-        print("  tcl:", tkdnd_path)
-        print("  unix:", tkdnd_unix_path)
+    indicador_carga = gui["indicador_carga"]
+    cancelar_carga_button = gui["cancelar_carga_button"]
 
     setup_explorer(tree, playlist)
 
-    # Drag-and-drop
-    try:
-        playlist.drop_target_register(DND_FILES)
-        playlist.dnd_bind('<<Drop>>', lambda e: on_drop(e, root, playlist))
-    except TclError:
-        pass
-
-    # Botones
-    add_event_button.config(command=lambda: open_event_window(root, event_list))
-    play_button.config(command=lambda: play_song(root, playlist, progress_bar))
-    pause_button.config(command=lambda: pause_song(playlist, mode_selector))
-    stop_button.config(command=lambda: stop_song(playlist))
-    next_button.config(command=lambda: next_song(root, playlist, progress_bar))
+    def _setup_dnd():
+        """tkdnd (portable y seguro en Windows usando / y tk.call) + registro de DnD."""
+        enable_dnd(root)
+        tkdnd_dir, tkdnd_path, tkdnd_unix_path = _find_tkdnd_paths()
+        try:
+            with startup.phase("tkdnd (source .tcl)"):
+                if tkdnd_dir and tkdnd_path and os.path.isfile(tkdnd_path):
+                    tkdnd_dir_posix = tkdnd_dir.replace("\\", "/")
+                    tkdnd_path_posix = tkdnd_path.replace("\\", "/")
+                    os.environ["TKDND_LIBRARY"] = tkdnd_dir_posix
+                    root.tk.call('source', tkdnd_path_posix)
+                    if tkdnd_unix_path and os.path.isfile(tkdnd_unix_path) and os.name != "nt":
+                        root.tk.call('source', tkdnd_unix_path.replace("\\", "/"))
+                else:
+                    raise TclError("No se encontró carpeta tkdnd válida.")
+        except TclError as e:
+            print("⚠️ Error cargando tkdnd:", e)
+            print("Rutas probadas:")
+            print("  dir:", tkdnd_dir)
+            print("  tcl:", tkdnd_path)
+            print("  unix:", tkdnd_unix_path)
+
+        # Drag-and-drop
+        try:
+            playlist.drop_target_register(DND_FILES)
+            playlist.dnd_bind('<<Drop>>', lambda e: on_drop(e, root, playlist))
+        except TclError:
+            pass
+
+    def _bind_player_buttons():
+        """Reproductor y eventos (programacion, events, widgets): tras la primera ventana."""
+        with startup.phase("import player/eventos"):
+            from utils import play_song, pause_song, stop_song, next_song, open_event_window
+        add_event_button.config(command=lambda: open_event_window(root, event_list))
+        play_button.config(command=lambda: play_song(root, playlist, progress_bar))
+        pause_button.config(command=lambda: pause_song(playlist, mode_selector))
+        stop_button.config(command=lambda: stop_song(playlist))
+        next_button.config(command=lambda: next_song(root, playlist, progress_bar))
+
+    # Progreso / cancelación de la ingesta y lectura de duraciones en segundo plano
+    prober.add_progress_listener(
+        lambda hechas, total: actualizar_indicador_carga(indicador_carga, "Leyendo duraciones", hechas, total)
+    )
+    cancelar_carga_button.config(command=cancel_ingestion)
 
     mode_selector.bind("<<ComboboxSelected>>", lambda e: update_play_mode(e, mode_selector, playlist))
 
-    # Cargar estado
-    load_state(playlist, event_list, mode_selector)
+    def _after_first_frame():
+        """Lo que no hace falta para ver la ventana: reproductor, DnD, estado, loop y audio."""
+        startup.mark("primera ventana")
+        _bind_player_buttons()
+        _setup_dnd()
+
+        # Cargar estado
+        with startup.phase("load_state"):
+            load_state(playlist, event_list, mode_selector)
+        persistence.bind(playlist, event_list, mode_selector)
+
+        # Programador de eventos: hilo propio que duerme hasta el próximo plazo
+        from utils.programacion import start_event_loop
+        start_event_loop(root, progress_bar, playlist)
+
+        # pygame + mixer en segundo plano: el primer Play/evento ya lo encuentra listo
+        audio.warm_up()
+        startup.report()
+
+    # after_idle corre tras el primer repintado; el after(0) lo deja para la vuelta siguiente
+    root.after_idle(lambda: root.after(0, _after_first_frame))
 
-    # Loop de eventos (cada 1s)
-    start_event_loop(root, progress_bar, playlist)
+    # Al cerrar: último guardado (si hay cambios pendientes) antes de destruir widgets
+    def _on_close():
+        persistence.shutdown()
+        root.destroy()
+    root.protocol("WM_DELETE_WINDOW", _on_close)
 
     root.mainloop()
+    from utils.scheduler import scheduler
+    scheduler.stop()
+    persistence.shutdown()  # 'Salir' del menú usa root.quit
+    from utils import lateness
+    if lateness.samples():
+        print(lateness.report())
 
 if __name__ == "__main__":
-    if not pygame.mixer.get_init():
-        pygame.mixer.init()
     run()
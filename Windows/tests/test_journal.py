@@ -0,0 +1,116 @@
+# tests/test_journal.py
+"""
+Bitácora (utils.journal) y autoguardado (utils.persistence): un registro cortado
+por un crash, generaciones que no coinciden, replay de cada tipo de registro y
+la vuelta completa EventList -> bitácora -> load.
+"""
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import StubTreeview  # noqa: E402
+from utils import events as evmod  # noqa: E402
+from utils import journal  # noqa: E402
+from utils.persistence import PersistenceService  # noqa: E402
+from utils.state import STATE_FILE, _read_with_journal, write_state  # noqa: E402
+
+T0 = datetime(2025, 1, 1, 8, 0, 0)
+
+
+def by_id(events):
+    return sorted(events, key=lambda e: e["id"])
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        cwd = os.getcwd()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(tmp.name)            # STATE_FILE es relativo al directorio de trabajo
+        journal.current_gen, journal.record_count, journal.stale = 0, 0, False
+        evmod.eventos.clear()
+        self.addCleanup(evmod.eventos.clear)
+
+    def test_truncated_record_is_dropped_and_cut(self):
+        journal.append_records(STATE_FILE, 3, [("pl_clear",), ("flags", "Secuencial", 1, False)])
+        partial = pickle.dumps(("pl_add", "x", 10, "/m/x.mp3"))[:-5]
+        with open(journal.journal_path(STATE_FILE), "ab") as f:
+            f.write(partial)             # crash a mitad de escribir
+
+        gen, records = journal.read_journal(STATE_FILE)
+        self.assertEqual(gen, 3)
+        self.assertEqual(records, [("pl_clear",), ("flags", "Secuencial", 1, False)])
+
+        # Se recortó: lo que se agregue después se vuelve a leer entero
+        journal.append_records(STATE_FILE, 3, [("pl_dur", "/m/y.mp3", 7)])
+        self.assertEqual(journal.read_journal(STATE_FILE)[1][-1], ("pl_dur", "/m/y.mp3", 7))
+
+    def test_journal_of_another_generation_is_ignored(self):
+        # Crash entre el snapshot nuevo (gen 5) y reset_journal: queda la bitácora del gen 4
+        write_state({"playlist": [["a", "00:05", "/m/a.mp3"]], "eventos": [], "journal_gen": 5}, STATE_FILE)
+        journal.append_records(STATE_FILE, 4, [("pl_clear",)])
+        state = _read_with_journal(STATE_FILE)
+        self.assertEqual(state["playlist"], [["a", "00:05", "/m/a.mp3"]])
+        self.assertTrue(journal.stale)
+        self.assertEqual(journal.current_gen, 5)
+
+    def test_replay_every_record_kind(self):
+        old = {"id": "e1", "nombre": "viejo", "hora_inicio": T0}
+        legacy = {"nombre": "sin id", "hora_inicio": T0}
+        state = {"playlist": [["a", "00:05", "/m/a.mp3"], ["b", "00:07", "/m/b.mp3"]], "eventos": [old, legacy]}
+        nuevo = {"id": "e2", "nombre": "nuevo", "hora_inicio": T0 + timedelta(hours=1)}
+        records = [
+            ("pl_add", "c", 9, "/m/c.mp3"),
+            ("pl_add", "a", 5, "/m/a.mp3"),                     # duplicado: se ignora
+            ("pl_dur", "/m/b.mp3", 70),
+            ("pl_del", ["/m/a.mp3"]),
+            ("ev_put", dict(old, nombre="editado")),
+            ("ev_put", nuevo),
+            ("ev_del", "nope"),
+            ("flags", "Aleatorio", 2, True),
+        ]
+        journal.replay(state, records)
+        self.assertEqual(state["playlist"], [("b", "01:10", "/m/b.mp3"), ("c", "00:09", "/m/c.mp3")])
+        self.assertEqual([e["nombre"] for e in state["eventos"]], ["editado", "sin id", "nuevo"])
+        self.assertEqual((state["play_mode"], state["current_song_index"], state["paused"]), ("Aleatorio", 2, True))
+
+        # La lista entera (clear / slice) reemplaza, y lo que sigue se aplica encima
+        journal.replay(state, [("eventos", [old]), ("ev_del", "e1"), ("ev_put", nuevo)])
+        self.assertEqual(state["eventos"], [nuevo])
+
+    def test_event_changes_round_trip_through_the_journal(self):
+        evmod.eventos.extend({"nombre": f"e{i}", "hora_inicio": T0 + timedelta(minutes=i),
+                              "intervalo_repeticion": 900, "archivo": "/m/x.wav"} for i in range(50))
+        service = PersistenceService()
+        service.bind(StubTreeview(), StubTreeview())
+        self.addCleanup(evmod.eventos._listeners.remove, service._on_event_change)
+        journal.stale = True
+        service.shutdown()                               # snapshot inicial
+        self.assertEqual(journal.read_journal(STATE_FILE)[1], [])
+
+        ev = evmod.eventos[5]
+        ev["hora_inicio"] += timedelta(minutes=15)
+        evmod.eventos.reschedule(ev)
+        gone = evmod.eventos[7]
+        evmod.eventos.remove(gone)
+        evmod.eventos.append({"nombre": "nuevo", "hora_inicio": T0, "intervalo_repeticion": None, "archivo": "/m/y.wav"})
+        service.shutdown()
+
+        _, records = journal.read_journal(STATE_FILE)
+        # Un registro por cambio, no la lista entera
+        self.assertEqual([r[0] for r in records], ["ev_put", "ev_del", "ev_put"])
+        self.assertEqual(records[1][1], gone["id"])
+        state = _read_with_journal(STATE_FILE)
+        self.assertEqual(by_id(state["eventos"]), by_id(dict(e) for e in evmod.eventos))
+        self.assertFalse(journal.stale)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,332 @@
+# utils/agenda.py
+"""
+Agenda materializada: cada disparo concreto de las próximas 24 h, ordenado.
+
+- Un evento de una sola vez aporta su hora_inicio; uno repetitivo, su
+  hora_inicio + k * intervalo_repeticion hasta el horizonte.
+- La mantiene EventList (utils.event_heap) bajo el mismo lock: alta, baja y
+  re-armado (disparo, reschedule) solo tocan las entradas de ese evento.
+- Bajas perezosas: cada evento tiene una vigencia (generación, desde); una
+  entrada de otra generación, o anterior a 'desde', está muerta y las
+  lecturas la saltan. Dar de baja es O(1) y se compacta de una pasada
+  cuando lo muerto supera a lo vivo. Al re-armarse un repetitivo sobre la
+  misma grilla (el disparo normal) solo se corta su cabeza vencida y se
+  completa su cola hasta el horizonte; si cambió la grilla, sus entradas
+  nuevas se mezclan en lote con las ordenadas, sin insort por entrada.
+- Lo vencido se descarta y el horizonte se extiende de a EXTEND_STEP al leer.
+- Lecturas por bisect, O(log n): next_bucket (contador), window (vista de
+  agenda) y overlapping/conflicts (choques al agregar un evento).
+- Índice de intervalos: cada disparo ocupa [hora, hora + duración del
+  archivo]. Además de la lista general, las entradas se reparten por clase
+  de duración (potencias de dos: 0, 1, 2-3, 4-7, ... segundos), cada clase
+  ordenada por inicio. "Qué suena entre a y b" hace, por clase, un bisect
+  desde a - (tope de la clase) hasta b y filtra por fin: un clip de una hora
+  ya no obliga a recorrer una hora de disparos de los eventos cortos, y lo
+  que se mira de más en cada clase es menos que la duración de sus propios
+  disparos. O(c · log n + k), con c clases en uso.
+"""
+import bisect
+import itertools
+import math
+from collections import deque
+from datetime import datetime, timedelta
+
+from utils import reloj
+from utils.metadata import get_seconds
+
+HORIZON = timedelta(hours=24)
+EXTEND_STEP = timedelta(minutes=10)
+MAX_PER_EVENT = 10000     # un evento cada pocos segundos no debe inflar la agenda sin fin
+SMALL_MERGE = 16          # hasta tantas entradas nuevas, insort; más, mezcla en lote
+
+
+def event_seconds(ev) -> int:
+    """Duración del archivo del evento (caché de metadatos); 0 si no se sabe."""
+    return get_seconds(ev.get("archivo") or "") or 0
+
+
+def occurrences(ev, start: datetime, end: datetime, limit=MAX_PER_EVENT):
+    """Horas de disparo de `ev` dentro de [start, end] (como mucho `limit`)."""
+    hora = ev.get("hora_inicio")
+    if not isinstance(hora, datetime):
+        return []
+    intervalo = ev.get("intervalo_repeticion")
+    if not intervalo or intervalo <= 0:
+        return [hora] if start <= hora <= end else []
+    step = timedelta(seconds=intervalo)
+    first = hora + step * max(0, math.ceil((start - hora) / step))
+    if first > end:
+        return []
+    n = min(limit, (end - first) // step + 1)
+    if n <= 0:
+        return []
+    return list(itertools.accumulate(itertools.repeat(step, n - 1), initial=first))
+
+
+class Agenda:
+    def __init__(self, lock, duration_of=event_seconds):
+        self._lock = lock         # el RLock de EventList
+        self._duration_of = duration_of
+        self._durations = {}      # id(evento) -> segundos (se calcula una vez por evento)
+        self._entries = []        # (hora, seq, id(evento), generación) ordenadas; incluye muertas
+        self._classes = {}        # clase de duración -> las mismas entradas, ordenadas por inicio
+        self._events = {}         # id(evento) -> evento
+        self._by_event = {}       # id(evento) -> deque de sus entradas vivas, en orden
+        self._valid = {}          # id(evento) -> (generación, desde): vigencia de sus entradas
+        self._grid = {}           # id(evento) -> (hora_inicio, intervalo) con que se materializó
+        self._stale = 0           # entradas muertas que siguen en _entries
+        self._seq = itertools.count()
+        self._gens = itertools.count()
+        self._start = None        # desde dónde está materializada
+        self._end = None          # horizonte actual
+
+    # ---------------- mantenimiento (bajo el lock de EventList) ----------------
+    def _ensure_window(self):
+        if self._end is None:
+            self._start = reloj.now()
+            self._end = self._start + HORIZON
+
+    def _live(self, entry) -> bool:
+        valid = self._valid.get(entry[2])
+        return valid is not None and valid[0] == entry[3] and entry[0] >= valid[1]
+
+    def _new_entries(self, eid, horas):
+        gen = self._valid[eid][0]
+        mine = self._by_event.setdefault(eid, deque())
+        out = list(zip(horas, self._seq, itertools.repeat(eid), itertools.repeat(gen)))
+        mine.extend(out)
+        return out
+
+    @staticmethod
+    def _duration_class(secs) -> int:
+        return int(secs).bit_length()   # 0 | 1 | 2-3 | 4-7 | ... segundos
+
+    def _class_of(self, eid) -> int:
+        return self._duration_class(self._durations.get(eid, 0))
+
+    @staticmethod
+    def _merge_into(entries, new):
+        """Mezcla `new` (ordenada) en `entries` sin recorrerla por cada entrada."""
+        if not entries or new[0] >= entries[-1]:
+            entries.extend(new)
+        elif len(new) <= SMALL_MERGE:
+            for entry in new:
+                bisect.insort(entries, entry)
+        else:
+            entries.extend(new)
+            entries.sort()           # dos tramos ya ordenados: timsort los mezcla en O(n)
+
+    def _merge(self, new):
+        """Suma entradas (ordenadas o no) a la lista general y a la de su clase."""
+        if not new:
+            return
+        new.sort()
+        self._merge_into(self._entries, new)
+        by_class = {}
+        for entry in new:
+            by_class.setdefault(self._class_of(entry[2]), []).append(entry)
+        for c, part in by_class.items():
+            self._merge_into(self._classes.setdefault(c, []), part)
+
+    def _kill(self, eid):
+        """Todas las entradas de `eid` pasan a muertas (O(1) en la lista ordenada)."""
+        mine = self._by_event.pop(eid, None)
+        if mine:
+            self._stale += len(mine)
+        self._valid.pop(eid, None)
+        self._grid.pop(eid, None)
+
+    def _compact(self):
+        if self._stale > 1024 and self._stale > len(self._entries) - self._stale:
+            self._entries = [e for e in self._entries if self._live(e)]
+            self._classes = {c: live for c, live in
+                             ((c, [e for e in part if self._live(e)]) for c, part in self._classes.items())
+                             if live}
+            self._stale = 0
+
+    def _remember_duration(self, ev):
+        eid = id(ev)
+        if eid not in self._durations:
+            try:
+                secs = max(0, int(self._duration_of(ev)))
+            except Exception:
+                secs = 0
+            self._durations[eid] = secs
+
+    @staticmethod
+    def _grid_of(ev):
+        return ev.get("hora_inicio"), ev.get("intervalo_repeticion")
+
+    def _same_grid(self, eid, grid) -> bool:
+        """¿`grid` es la misma serie materializada, solo corrida hacia adelante?"""
+        old = self._grid.get(eid)
+        if old is None:
+            return False
+        (h0, i0), (h1, i1) = old, grid
+        if not (isinstance(h0, datetime) and isinstance(h1, datetime)):
+            return False
+        if not i0 or i0 <= 0 or i0 != i1 or h1 < h0:
+            return False
+        return (h1 - h0) % timedelta(seconds=i0) == timedelta(0)
+
+    def add(self, ev):
+        """Alta o re-armado: reemplaza los disparos de `ev` (la duración se conserva)."""
+        self._ensure_window()
+        eid = id(ev)
+        grid = self._grid_of(ev)
+        self._events[eid] = ev
+        self._remember_duration(ev)
+        if self._same_grid(eid, grid):
+            self._advance(ev, grid[0])
+        else:
+            self._kill(eid)
+            self._valid[eid] = (next(self._gens), datetime.min)
+            self._merge(self._new_entries(eid, occurrences(ev, self._start, self._end)))
+        self._grid[eid] = grid
+        self._compact()
+
+    def _advance(self, ev, desde):
+        # Re-armado del disparo: se corta la cabeza hasta la nueva hora_inicio y
+        # se completa la cola hasta el horizonte (típicamente una entrada)
+        eid = id(ev)
+        gen, _ = self._valid[eid]
+        self._valid[eid] = (gen, desde)
+        mine = self._by_event.setdefault(eid, deque())
+        while mine and mine[0][0] < desde:
+            mine.popleft()
+            self._stale += 1
+        after = mine[-1][0] + timedelta(microseconds=1) if mine else max(self._start, desde)
+        horas = occurrences(ev, after, self._end, limit=MAX_PER_EVENT - len(mine))
+        self._merge(self._new_entries(eid, horas))
+
+    def discard(self, ev):
+        eid = id(ev)
+        self._events.pop(eid, None)
+        self._kill(eid)
+        self._durations.pop(eid, None)
+        self._compact()
+
+    def rebuild(self, events):
+        self._entries = []
+        self._classes = {}
+        self._events = {}
+        self._by_event = {}
+        self._valid = {}
+        self._grid = {}
+        self._stale = 0
+        durations, self._durations = self._durations, {}
+        self._start = self._end = None
+        self._ensure_window()
+        gen = next(self._gens)
+        for ev in events:
+            eid = id(ev)
+            self._events[eid] = ev
+            if eid in durations:
+                self._durations[eid] = durations[eid]
+            else:
+                self._remember_duration(ev)
+            self._valid[eid] = (gen, datetime.min)
+            self._grid[eid] = self._grid_of(ev)
+            new = self._new_entries(eid, occurrences(ev, self._start, self._end))
+            self._classes.setdefault(self._class_of(eid), []).extend(new)
+        for part in self._classes.values():
+            part.sort()
+            self._entries.extend(part)
+        self._entries.sort()         # unos pocos tramos ordenados (uno por clase)
+
+    def _refresh(self, now: datetime):
+        """Suelta lo vencido y corre el horizonte si hace falta."""
+        self._ensure_window()
+        cut = bisect.bisect_left(self._entries, (now,))
+        if cut:
+            for entry in self._entries[:cut]:
+                if self._live(entry):
+                    self._by_event[entry[2]].popleft()
+                else:
+                    self._stale -= 1
+            del self._entries[:cut]
+            for part in self._classes.values():
+                del part[:bisect.bisect_left(part, (now,))]
+        self._start = max(self._start, now)
+        if now + HORIZON < self._end + EXTEND_STEP:
+            return
+        old_end, self._end = self._end, now + HORIZON + EXTEND_STEP
+        new = []
+        for eid, ev in self._events.items():
+            mine = self._by_event.get(eid, ())
+            horas = occurrences(ev, old_end + timedelta(microseconds=1), self._end,
+                                limit=MAX_PER_EVENT - len(mine))
+            new.extend(self._new_entries(eid, horas))
+        self._merge(new)
+
+    # ---------------- lecturas ----------------
+    def window(self, start: datetime, end: datetime):
+        """[(hora, evento)] con start <= hora <= end, en orden."""
+        with self._lock:
+            self._refresh(reloj.now())
+            lo = bisect.bisect_left(self._entries, (start,))
+            hi = bisect.bisect_right(self._entries, (end, math.inf))
+            return [(e[0], self._events[e[2]]) for e in self._entries[lo:hi] if self._live(e)]
+
+    def next_bucket(self, now: datetime):
+        """Eventos del próximo segundo con disparos (hora > now); [] si no hay."""
+        with self._lock:
+            self._refresh(now)
+            entries = self._entries
+            i = bisect.bisect_right(entries, (now, math.inf))
+            while i < len(entries) and not self._live(entries[i]):
+                i += 1
+            if i >= len(entries):
+                return []
+            sec = entries[i][0].replace(microsecond=0)
+            out = []
+            while i < len(entries) and entries[i][0].replace(microsecond=0) == sec:
+                if self._live(entries[i]):
+                    out.append(self._events[entries[i][2]])
+                i += 1
+            return out
+
+    def duration(self, ev) -> int:
+        return self._durations.get(id(ev), 0)
+
+    def overlapping(self, start: datetime, end: datetime):
+        """[(inicio, fin, evento)] de los disparos cuya ventana se cruza con [start, end]."""
+        with self._lock:
+            self._refresh(reloj.now())
+            out = []
+            for c, part in self._classes.items():
+                # En la clase c nadie dura más de 2**c - 1 segundos
+                lo = bisect.bisect_left(part, (start - timedelta(seconds=(1 << c) - 1),))
+                hi = bisect.bisect_right(part, (end, math.inf))
+                for entry in part[lo:hi]:
+                    h, _, eid, _ = entry
+                    fin = h + timedelta(seconds=self._durations.get(eid, 0))
+                    if fin >= start and self._live(entry):
+                        out.append((h, fin, self._events[eid]))
+            out.sort(key=lambda t: t[0])
+            return out
+
+    def conflicts(self, ev, seconds=None):
+        """
+        [(hora_nuevo, hora_otro, otro)]: disparos de `ev` (próximas 24 h) que se
+        pisan con la ventana de otro evento. `seconds`: duración de `ev` si no
+        está en la agenda todavía.
+        """
+        if seconds is None:
+            seconds = self._durations.get(id(ev))
+            if seconds is None:
+                seconds = event_seconds(ev)
+        dur = timedelta(seconds=max(0, seconds))
+        now = reloj.now()
+        out = []
+        for h in occurrences(ev, now, now + HORIZON, limit=1000):
+            for inicio, _, other in self.overlapping(h, h + dur):
+                if other is not ev:
+                    out.append((h, inicio, other))
+        return out
+
+    def __len__(self):
+        return len(self._entries) - self._stale
+
+
+__all__ = ["Agenda", "occurrences", "event_seconds", "HORIZON"]
@@ -0,0 +1,108 @@
+# utils/cargador.py
+"""
+Carga de archivos de audio fuera del hilo de Tk y del programador.
+
+- request(path, on_done) abre y valida el archivo en un hilo propio; on_done
+  corre después en el hilo del programador (bajo su lock) con el resultado.
+- Hasta STREAM_ABOVE_MB se lee entero a memoria: music.load sobre bytes es
+  inmediato y un USB lento o un recurso de red ya no congela la interfaz ni
+  atrasa el loop de eventos. Más grande (WAV, FLAC largos) solo se abre y se
+  valida; music lo lee desde disco, en streaming, como siempre.
+- LOAD_TIMEOUT_MS acota abrir y validar, que es lo que se cuelga con un
+  recurso caído. Leer entero un archivo chico suma un plazo según su tamaño
+  (MIN_READ_MB_S): un archivo lento pero vivo no se salta.
+- Si la lectura falla o no termina a tiempo, on_done recibe el error y el
+  reproductor salta esa pista. Un hilo colgado en el disco queda ahí
+  (daemon) sin frenar los pedidos siguientes.
+"""
+import io
+import itertools
+import math
+import os
+import threading
+
+from utils import reloj
+from utils.scheduler import scheduler
+
+LOAD_TIMEOUT_MS = 5000
+STREAM_ABOVE_MB = 16        # ~1,5 min de WAV a 44.1 kHz estéreo; más grande, desde disco
+MIN_READ_MB_S = 1.0         # velocidad mínima aceptada al leer entero un archivo chico
+
+
+class LoadResult:
+    """ok: source es BytesIO (o la ruta, si es grande); si no, error dice por qué."""
+
+    __slots__ = ("token", "path", "source", "error")
+
+    def __init__(self, token, path, source=None, error=None):
+        self.token = token
+        self.path = path
+        self.source = source
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Loader:
+    def __init__(self):
+        self._seq = itertools.count(1)
+        self.direct = False      # sin leer nada: source = ruta (simulador, benchmarks)
+
+    def request(self, path, on_done, timeout_ms=LOAD_TIMEOUT_MS) -> int:
+        """Pide `path`; devuelve el token que llevará el LoadResult."""
+        token = next(self._seq)
+        if self.direct:
+            scheduler.call_later(0, lambda: on_done(LoadResult(token, path, source=path)))
+            return token
+        lock = threading.Lock()
+        done = []
+        limit = [reloj.monotonic() + timeout_ms / 1000]
+
+        def finish(result):
+            with lock:
+                if done:
+                    return
+                done.append(result)
+            scheduler.call_later(0, lambda: on_done(result))
+
+        def validated(size):
+            # Abrió bien: leerlo entero tiene su propio plazo, según el tamaño
+            with lock:
+                limit[0] = reloj.monotonic() + timeout_ms / 1000 + size / (MIN_READ_MB_S * 1024 * 1024)
+
+        def work():
+            try:
+                finish(LoadResult(token, path, source=self._read(path, validated)))
+            except Exception as e:
+                finish(LoadResult(token, path, error=str(e) or type(e).__name__))
+
+        def check():
+            with lock:
+                left = limit[0] - reloj.monotonic()
+            if left > 0:
+                scheduler.call_later(math.ceil(left * 1000), check)
+            else:
+                finish(LoadResult(token, path, error="no respondió a tiempo"))
+
+        threading.Thread(target=work, name="cargador", daemon=True).start()
+        scheduler.call_later(timeout_ms, check)
+        return token
+
+    @staticmethod
+    def _read(path, validated):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= 0:
+                raise ValueError("archivo vacío")
+            head = f.read(4096)      # al menos que se pueda leer
+            if size > STREAM_ABOVE_MB * 1024 * 1024:
+                return path
+            validated(size)
+            return io.BytesIO(head + f.read())
+
+
+loader = Loader()
+
+__all__ = ["Loader", "LoadResult", "loader", "LOAD_TIMEOUT_MS", "STREAM_ABOVE_MB"]
@@ -0,0 +1,97 @@
+# utils/crossfade.py
+"""
+Crossfade entre pistas de la playlist (pst.crossfade_ms > 0).
+
+- PREPARE_MS antes de que empiece el cruce, la pista siguiente se decodifica
+  en un hilo aparte (pygame.mixer.Sound); ni Tk ni el programador esperan.
+- A pst.crossfade_ms del fin, si ya está lista, arranca en un deck (canal
+  reservado de utils.audio) y los volúmenes se cruzan según
+  pst.crossfade_curve, en pasos de STEP_MS desde el hilo del programador.
+  El avance sale de la posición de la entrante: una pausa congela el cruce.
+- Si no llegó a decodificarse o pasaría de MAX_DECODED_MB, no hay cruce: la
+  pista termina y sigue el camino de siempre (gapless o next_song).
+"""
+import math
+import threading
+
+from utils import audio
+
+PREPARE_MS = 15000
+STEP_MS = 50
+MAX_DECODED_MB = 128     # ~12 min a 44.1 kHz estéreo; más largo, sin cruce
+
+CURVES = {
+    # nombre: (entrante, saliente) para x de 0 a 1
+    "lineal": (lambda x: x, lambda x: 1 - x),
+    "potencia": (lambda x: math.sin(x * math.pi / 2), lambda x: math.cos(x * math.pi / 2)),
+}
+
+_lock = threading.Lock()
+_next = None             # [ruta, índice, Sound | None, terminado]
+_generation = 0          # cada cruce nuevo invalida los pasos del anterior
+
+
+def _decode(entry):
+    sound = audio.decode(entry[0], MAX_DECODED_MB)
+    with _lock:
+        entry[2], entry[3] = sound, True
+
+
+def prepare(path, index, seconds):
+    """Decodificar en segundo plano la pista `index` (idempotente para la misma)."""
+    global _next
+    with _lock:
+        if _next is not None and _next[0] == path and _next[1] == index:
+            return
+        freq, size, channels = audio.ensure_mixer().mixer.get_init()
+        if seconds <= 0 or seconds * freq * channels * abs(size) // 8 > MAX_DECODED_MB * 1024 * 1024:
+            _next = [path, index, None, True]
+            return
+        _next = entry = [path, index, None, False]
+    threading.Thread(target=_decode, args=(entry,), name="crossfade-decode", daemon=True).start()
+
+
+def pending():
+    """(ruta, índice) de la pista preparada o preparándose; None si no hay."""
+    with _lock:
+        return (_next[0], _next[1]) if _next is not None else None
+
+
+def take():
+    """(ruta, índice, Sound) si la preparada está lista; si no, None (y se descarta)."""
+    global _next
+    with _lock:
+        entry, _next = _next, None
+    if entry is None or not entry[3] or entry[2] is None:
+        return None
+    return entry[0], entry[1], entry[2]
+
+
+def discard():
+    global _next
+    with _lock:
+        _next = None
+
+
+def start(sound, fade_ms, curve, call_later):
+    """Arranca el cruce hacia `sound`; call_later(ms, fn) agenda los pasos."""
+    global _generation
+    _generation += 1
+    gen = _generation
+    fade_in, fade_out = CURVES.get(curve, CURVES["potencia"])
+    audio.begin_crossfade(sound)
+
+    def _step():
+        if gen != _generation or not audio.crossfading():
+            return
+        x = min(1.0, audio.position_ms() / fade_ms)
+        audio.crossfade_levels(fade_in(x), fade_out(x))
+        if x >= 1.0:
+            audio.end_crossfade()
+        else:
+            call_later(STEP_MS, _step)
+
+    _step()
+
+
+__all__ = ["PREPARE_MS", "CURVES", "prepare", "pending", "take", "discard", "start"]
@@ -0,0 +1,123 @@
+# utils/disponibilidad.py
+"""
+¿Existe el archivo de un evento? Respuesta desde memoria, nunca desde el disco.
+
+- El loop de eventos pregunta is_available(ruta) en cada vuelta y para cada
+  evento de un bucket; un stat sobre un recurso de red o un USB dormido puede
+  bloquear, así que aquí solo se lee un dict.
+- Un hilo en segundo plano revisa las rutas vigiladas cada REFRESH_S: primero
+  el directorio (si su mtime no cambió y la respuesta es reciente, no se toca
+  el archivo), luego el archivo.
+- Ruta nunca vista (evento nuevo o recién editado): UN os.path.isfile en el
+  momento, como antes; la respuesta queda guardada y desde ahí se vigila.
+"""
+import os
+import stat
+import threading
+import time
+
+REFRESH_S = 5.0
+MAX_AGE_S = 60.0      # aunque el directorio no cambie, re-chequear cada tanto
+
+
+class FileAvailability:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files = {}         # ruta -> (disponible, chequeado_en)
+        self._dirs = {}          # directorio -> mtime_ns (None si no se pudo leer)
+        self._watched = set()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._assumed = None     # respuesta fija (simulador); None = revisar de verdad
+
+    # ---------------- API ----------------
+    def watch(self, path):
+        """Vigilar `path` (idempotente); la primera revisión es inmediata."""
+        if not path:
+            return
+        with self._lock:
+            if path in self._watched:
+                return
+            self._watched.add(path)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="disponibilidad", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def is_available(self, path) -> bool:
+        if not path:
+            return False
+        if self._assumed is not None:
+            return self._assumed
+        entry = self._files.get(path)
+        if entry is None:
+            ok = os.path.isfile(path)
+            self._files.setdefault(path, (ok, time.monotonic()))
+            self.watch(path)
+            return ok
+        return entry[0]
+
+    def assume(self, value):
+        """Responder siempre `value` sin mirar el disco (None vuelve a lo normal)."""
+        self._assumed = value
+
+    def invalidate(self, path=None):
+        """Olvida lo sabido (de una ruta o de todas) y fuerza una revisión."""
+        with self._lock:
+            if path is None:
+                self._files.clear()
+                self._dirs.clear()
+            else:
+                self._files.pop(path, None)
+                self._dirs.pop(os.path.dirname(path), None)
+        self._wakeup.set()
+
+    def refresh_now(self):
+        self._refresh()
+
+    # ---------------- hilo ----------------
+    def _run(self):
+        while True:
+            self._wakeup.wait(REFRESH_S)
+            self._wakeup.clear()
+            try:
+                self._refresh()
+            except Exception as e:
+                print(f"⚠️ Error revisando archivos de eventos: {e}")
+
+    @staticmethod
+    def _stat_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh(self):
+        with self._lock:
+            watched = list(self._watched)
+        by_dir = {}
+        for path in watched:
+            by_dir.setdefault(os.path.dirname(path), []).append(path)
+
+        now = time.monotonic()
+        for folder, paths in by_dir.items():
+            dir_mtime = self._stat_mtime(folder) if folder else None
+            dir_changed = self._dirs.get(folder, -1) != dir_mtime
+            self._dirs[folder] = dir_mtime
+            for path in paths:
+                entry = self._files.get(path)
+                if entry is not None and not dir_changed and now - entry[1] < MAX_AGE_S:
+                    continue
+                if dir_mtime is None and folder:
+                    self._files[path] = (False, now)   # carpeta/unidad no disponible
+                    continue
+                try:
+                    ok = stat.S_ISREG(os.stat(path).st_mode)
+                except OSError:
+                    ok = False
+                self._files[path] = (ok, now)
+
+
+availability = FileAvailability()
+
+__all__ = ["FileAvailability", "availability", "REFRESH_S"]
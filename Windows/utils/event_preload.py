@@ -0,0 +1,211 @@
+# utils/event_preload.py
+"""
+Look-ahead y caché de eventos: antes de hora_inicio los archivos de los
+próximos eventos se leen y decodifican en un hilo aparte
+(pygame.mixer.Sound). Al dispararse, reproducir_evento solo toca memoria.
+
+- Los clips decodificados quedan en una caché LRU con tope de memoria
+  (pst.event_cache_mb), por ruta y firma (mtime, tamaño): un aviso corto que
+  se repite cada 15 min no se vuelve a leer ni a decodificar.
+- take() (el disparo) solo mira memoria: ni un stat. La firma se re-chequea
+  en segundo plano (revalidate, desde la pasada de look-ahead del loop, cada
+  REVALIDATE_S como mucho); si el archivo cambió en disco, la entrada se
+  descarta y el próximo disparo lo vuelve a leer.
+- Un evento que salió desde disco (sin look-ahead o sin tiempo de
+  precargar) se decodifica después en segundo plano (warm): el próximo
+  disparo ya sale de la caché.
+- Si el mixer todavía no existe, la decodificación falla o el audio
+  decodificado pasaría de MAX_DECODED_MB (o del tope de la caché), el
+  archivo no se cachea: en el look-ahead queda solo en bytes y el evento
+  sale por music.load(BytesIO), en streaming, como antes.
+"""
+import io
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utils import player_state as pst
+
+MAX_DECODED_MB = 64   # un evento de ~6 min a 44.1 kHz estéreo; más largo, solo bytes
+REVALIDATE_S = 2.0    # firma de un clip listo: re-chequeo en segundo plano cada tanto
+
+_lock = threading.Lock()
+_entries = {}         # ruta -> (firma, clip) ; clip None mientras se prepara (look-ahead)
+_cache = OrderedDict()   # ruta -> (firma, Sound, bytes decodificados) ; LRU
+_cache_bytes = 0
+_checked = {}         # ruta -> time.monotonic() del último chequeo de firma
+_validating = False
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_mtime, st.st_size
+
+
+def _decode(data):
+    from utils import audio
+    return audio.decode(io.BytesIO(data), MAX_DECODED_MB)
+
+
+def _remember(path, sig, sound) -> bool:
+    """Guarda el clip en la caché (expulsando lo menos usado); False si no entra."""
+    global _cache_bytes
+    from utils import audio
+    size = audio.decoded_bytes(sound)
+    budget = pst.event_cache_mb * 1024 * 1024
+    if size > budget:
+        return False
+    with _lock:
+        old = _cache.pop(path, None)
+        if old is not None:
+            _cache_bytes -= old[2]
+        _cache[path] = (sig, sound, size)
+        _cache_bytes += size
+        while _cache_bytes > budget:
+            _, (_, _, freed) = _cache.popitem(last=False)
+            _cache_bytes -= freed
+    return True
+
+
+def _forget(path):
+    global _cache_bytes
+    with _lock:
+        old = _cache.pop(path, None)
+        if old is not None:
+            _cache_bytes -= old[2]
+
+
+def _prepare(path, keep_bytes=True):
+    try:
+        sig = _signature(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        with _lock:
+            _checked[path] = time.monotonic()
+    except OSError as e:
+        print(f"⚠️ No se pudo precargar el evento {path}: {e}")
+        with _lock:
+            _entries.pop(path, None)
+        return
+    sound = _decode(data)
+    if sound is not None and _remember(path, sig, sound):
+        with _lock:
+            _entries.pop(path, None)
+        return
+    if not keep_bytes:
+        return
+    clip = ("sound", sound) if sound is not None else ("bytes", data)
+    with _lock:
+        if path in _entries:
+            _entries[path] = (sig, clip)
+
+
+def preload(paths):
+    """
+    Deja en memoria los archivos `paths` (próximos eventos, en orden) y suelta
+    lo precargado en bytes que ya no está en la lista (la caché de clips se
+    queda). No bloquea; lo ya listo no se relee.
+    """
+    paths = [p for p in dict.fromkeys(paths) if p]
+    start = []
+    with _lock:
+        for stale in [p for p in _entries if p not in paths]:
+            del _entries[stale]
+        for p in paths:
+            if p not in _entries and p not in _cache:
+                _entries[p] = (None, None)
+                start.append(p)
+    for p in start:
+        threading.Thread(target=_prepare, args=(p,), name="event-preload", daemon=True).start()
+
+
+def warm(path):
+    """Decodificar `path` a la caché en segundo plano (tras un disparo desde disco)."""
+    if pst.event_cache_mb <= 0:
+        return
+    with _lock:
+        if not path or path in _cache or path in _entries:
+            return
+    threading.Thread(target=_prepare, args=(path, False), name="event-preload", daemon=True).start()
+
+
+def revalidate(paths):
+    """Re-chequear en segundo plano la firma de lo listo para `paths`; lo cambiado se suelta."""
+    global _validating
+    now = time.monotonic()
+    with _lock:
+        if _validating:
+            return
+        due = [p for p in dict.fromkeys(paths)
+               if (p in _cache or _entries.get(p, (None, None))[1] is not None)
+               and now - _checked.get(p, -math.inf) >= REVALIDATE_S]
+        if not due:
+            return
+        _validating = True
+    threading.Thread(target=_validate, args=(due,), name="event-preload", daemon=True).start()
+
+
+def _validate(paths):
+    global _validating
+    try:
+        for path in paths:
+            try:
+                sig = _signature(path)
+            except OSError:
+                sig = None
+            with _lock:
+                _checked[path] = time.monotonic()
+                cached = _cache.get(path)
+                entry = _entries.get(path)
+                if entry is not None and entry[1] is not None and entry[0] != sig:
+                    del _entries[path]
+            if cached is not None and cached[0] != sig:
+                _forget(path)
+    finally:
+        with _lock:
+            _validating = False
+
+
+def take(path: str):
+    """
+    Clip listo para `path`: ("sound", Sound) o ("bytes", BytesIO); None si no
+    está listo. Solo memoria: la firma ya la vigila revalidate(). Un clip de
+    la caché se queda en ella; los bytes del look-ahead se entregan una sola vez.
+    """
+    with _lock:
+        cached = _cache.get(path)
+        if cached is not None:
+            _cache.move_to_end(path)
+        entry = _entries.pop(path, None)
+    if cached is not None:
+        return ("sound", cached[1])
+    if entry is None or entry[1] is None:
+        return None
+    kind, obj = entry[1]
+    return (kind, obj) if kind == "sound" else (kind, io.BytesIO(obj))
+
+
+def cache_usage():
+    """(clips, MB) en la caché."""
+    with _lock:
+        return len(_cache), _cache_bytes / (1024 * 1024)
+
+
+def namehint(path: str) -> str:
+    """Extensión para music.load(fileobj, namehint): 'mp3', 'wav'..."""
+    return os.path.splitext(path)[1].lstrip(".").lower()
+
+
+def clear():
+    global _cache_bytes
+    with _lock:
+        _entries.clear()
+        _cache.clear()
+        _checked.clear()
+        _cache_bytes = 0
+
+
+__all__ = ["MAX_DECODED_MB", "REVALIDATE_S", "preload", "warm", "revalidate", "take",
+           "cache_usage", "namehint", "clear"]
@@ -2,12 +2,14 @@ import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from datetime import datetime, timedelta
-from utils.playlist import get_duration
+from utils.event_heap import EventList
+from utils.metadata import get_duration
+from utils.persistence import persistence
 
 __all__ = ["open_event_window", "eventos"]
 
-# Lista compartida que usa el player
-eventos = []
+# Lista compartida que usa el player (indexada por hora: utils.event_heap)
+eventos = EventList()
 
 def open_event_window(root, event_list):
     def agregar_evento():
@@ -58,13 +60,26 @@ def open_event_window(root, event_list):
             else:
                 intervalo = n
 
-        # Guardar en la lista interna que consume el player
-        eventos.append({
+        nuevo = {
             "nombre": nombre_evento or os.path.basename(archivo_evento),
             "hora_inicio": evento_programado,
             "intervalo_repeticion": intervalo,   # None si es una sola vez
             "archivo": archivo_evento,
-        })
+        }
+
+        # Choques con lo que ya está en la agenda de 24 h
+        choques = eventos.agenda.conflicts(nuevo)
+        if choques:
+            hora_nuevo, hora_otro, otro = choques[0]
+            detalle = (f"A las {hora_nuevo.strftime('%H:%M:%S')} se pisa con "
+                       f"'{otro.get('nombre', '')}' ({hora_otro.strftime('%H:%M:%S')})")
+            if len(choques) > 1:
+                detalle += f" y {len(choques) - 1} choque(s) más"
+            if not messagebox.askyesno("Conflicto", f"{detalle}.\n¿Agregar de todos modos?"):
+                return
+
+        # Guardar en la lista interna que consume el player
+        eventos.append(nuevo)
 
         # Pintar en la tabla visual con 4 columnas: Pista | Tiempo | Duración | Repetir
         file_name = os.path.basename(archivo_evento)
@@ -95,6 +110,10 @@ def open_event_window(root, event_list):
             "end",
             values=(file_name, evento_programado.strftime("%H:%M:%S"), file_duration, rep_text)
         )
+        persistence.mark_dirty()
+        # El nuevo evento puede vencer antes que el plazo ya armado
+        from utils.programacion import rearm_wakeup
+        rearm_wakeup()
 
         event_window.destroy()
 
@@ -0,0 +1,142 @@
+# utils/journal.py
+"""
+Bitácora append-only de cambios para estado_reproductor.pkl.
+
+El .pkl es un snapshot completo con "journal_gen"; al lado vive
+estado_reproductor.pkl.journal: un stream de pickles que empieza con
+("gen", N) y sigue con registros de cambio:
+
+  ("pl_add", nombre, segundos, ruta)   ("pl_del", [rutas])
+  ("pl_dur", ruta, segundos)           ("pl_clear",)
+  ("ev_put", dict)                     ("ev_del", id)
+  ("flags", play_mode, índice, paused)
+
+ev_put da de alta o reemplaza un evento por su "id"; ("eventos", [dicts])
+reemplaza la lista entera (clear y asignaciones por slice de EventList).
+
+Cargar = snapshot + replay de la bitácora (si su gen coincide). Compactar =
+escribir snapshot con gen+1 y reiniciar la bitácora; si se corta a la mitad,
+la bitácora vieja (gen distinto) simplemente se ignora.
+"""
+import os
+import pickle
+
+JOURNAL_SUFFIX = ".journal"
+COMPACT_EVERY = 5000        # registros antes de compactar en un snapshot
+
+# Estado de la bitácora del STATE_FILE (lo fija load_state / la compactación)
+current_gen = 0
+record_count = 0
+stale = False               # la bitácora en disco no corresponde al snapshot
+
+
+def journal_path(state_file: str) -> str:
+    return state_file + JOURNAL_SUFFIX
+
+
+def read_journal(state_file: str):
+    """
+    (gen, registros). Un último registro cortado (crash) se descarta y se
+    recorta del archivo, para que lo que se agregue después sí se pueda leer.
+    """
+    path = journal_path(state_file)
+    if not os.path.exists(path):
+        return None, []
+    records = []
+    gen = None
+    try:
+        with open(path, "r+b") as f:
+            good_end = 0
+            while True:
+                try:
+                    rec = pickle.load(f)
+                except Exception:
+                    if good_end < os.fstat(f.fileno()).st_size:
+                        print("⚠️ Bitácora con registro incompleto; se usa hasta el último válido.")
+                        f.truncate(good_end)
+                    break
+                good_end = f.tell()
+                if gen is None:
+                    if not (isinstance(rec, tuple) and rec and rec[0] == "gen"):
+                        return None, []
+                    gen = rec[1]
+                    continue
+                records.append(rec)
+    except OSError as e:
+        print(f"⚠️ No se pudo leer la bitácora: {e}")
+        return None, []
+    return gen, records
+
+
+def append_records(state_file: str, gen: int, records):
+    """Agrega registros al final (crea la bitácora con su encabezado si no existe)."""
+    path = journal_path(state_file)
+    new_file = not os.path.exists(path)
+    with open(path, "ab") as f:
+        if new_file:
+            pickle.dump(("gen", gen), f)
+        for rec in records:
+            pickle.dump(rec, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def reset_journal(state_file: str, gen: int):
+    """Bitácora vacía para el snapshot recién escrito (temp + rename)."""
+    path = journal_path(state_file)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(("gen", gen), f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def replay(state: dict, records) -> dict:
+    """Aplica los registros sobre el dict del snapshot (no toca Tk)."""
+    from utils.playlist_model import PlaylistModel, parse_duration
+
+    model = PlaylistModel()
+    for row in state.get("playlist", []):
+        if len(row) >= 3:
+            model.append(row[0], parse_duration(row[1]), row[2])
+    eventos = None           # id -> evento, armado al primer ev_put/ev_del
+
+    for rec in records:
+        op = rec[0]
+        if op == "pl_add":
+            _, name, seconds, path = rec
+            if model.index_of(path) is None:
+                model.append(name, seconds, path)
+        elif op == "pl_del":
+            model.remove_positions([p for p in map(model.index_of, rec[1]) if p is not None])
+        elif op == "pl_dur":
+            pos = model.index_of(rec[1])
+            if pos is not None:
+                model.set_duration(pos, rec[2])
+        elif op == "pl_clear":
+            model.clear()
+        elif op == "eventos":
+            state["eventos"] = rec[1]
+            eventos = None
+        elif op in ("ev_put", "ev_del"):
+            if eventos is None:
+                eventos = {e.get("id") or object(): e for e in state.get("eventos") or []}
+            if op == "ev_put":
+                eventos[rec[1]["id"]] = rec[1]
+            else:
+                eventos.pop(rec[1], None)
+            state["eventos"] = eventos
+        elif op == "flags":
+            state["play_mode"], state["current_song_index"], state["paused"] = rec[1], rec[2], rec[3]
+
+    state["playlist"] = model.rows()
+    if isinstance(state.get("eventos"), dict):
+        state["eventos"] = list(state["eventos"].values())
+    return state
+
+
+__all__ = [
+    "COMPACT_EVERY", "journal_path", "read_journal",
+    "append_records", "reset_journal", "replay",
+]
@@ -0,0 +1,81 @@
+# utils/lateness.py
+"""
+Puntualidad de los eventos: hora programada (hora_inicio) vs. inicio real del
+audio. reproducir_evento llama a record() justo después de play(); report()
+resume las últimas muestras (histograma + percentiles) y se imprime al cerrar.
+"""
+from collections import deque
+from datetime import datetime
+
+TOLERANCE_MS = 50                 # objetivo: ±50 ms
+EDGES_MS = (-50, 0, 10, 25, 50, 100, 250, 500, 1000)
+MAX_SAMPLES = 1000
+
+_samples = deque(maxlen=MAX_SAMPLES)   # (nombre, programado, inicio, retraso_ms)
+
+
+def record(nombre: str, programado: datetime, inicio: datetime) -> float:
+    """Registra un disparo; devuelve el retraso en ms (negativo = adelantado)."""
+    late_ms = (inicio - programado).total_seconds() * 1000
+    _samples.append((nombre, programado, inicio, late_ms))
+    return late_ms
+
+
+def samples():
+    return list(_samples)
+
+
+def clear():
+    _samples.clear()
+
+
+def histogram():
+    """[(etiqueta, cuenta)] con los cortes de EDGES_MS (retraso firmado, en ms)."""
+    counts = [0] * (len(EDGES_MS) + 1)
+    for *_, late_ms in _samples:
+        for i, edge in enumerate(EDGES_MS):
+            if late_ms <= edge:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<= {EDGES_MS[0]} ms"]
+    labels += [f"{lo} .. {hi} ms" for lo, hi in zip(EDGES_MS, EDGES_MS[1:])]
+    labels.append(f"> {EDGES_MS[-1]} ms")
+    return list(zip(labels, counts))
+
+
+def _percentile(values, q):
+    k = min(len(values) - 1, max(0, round(q * (len(values) - 1))))
+    return values[k]
+
+
+def summary():
+    """n, dentro de tolerancia, p50/p95/máx en ms; None si no hubo disparos."""
+    if not _samples:
+        return None
+    values = sorted(late_ms for *_, late_ms in _samples)
+    return {
+        "n": len(values),
+        "en_tolerancia": sum(1 for v in values if abs(v) <= TOLERANCE_MS),
+        "p50_ms": _percentile(values, 0.50),
+        "p95_ms": _percentile(values, 0.95),
+        "max_ms": values[-1],
+    }
+
+
+def report() -> str:
+    s = summary()
+    if s is None:
+        return "[EVENTO] Puntualidad: sin disparos"
+    lines = [
+        f"[EVENTO] Puntualidad: {s['en_tolerancia']}/{s['n']} dentro de ±{TOLERANCE_MS} ms"
+        f" | p50 {s['p50_ms']:+.0f} ms | p95 {s['p95_ms']:+.0f} ms | máx {s['max_ms']:+.0f} ms"
+    ]
+    for label, count in histogram():
+        if count:
+            lines.append(f"  {label:>16}  {count:5d}  {'#' * min(count, 50)}")
+    return "\n".join(lines)
+
+
+__all__ = ["TOLERANCE_MS", "record", "samples", "clear", "histogram", "summary", "report"]
@@ -0,0 +1,162 @@
+# utils/metadata.py
+"""
+Caché de metadatos de pistas (por ahora: duración en segundos).
+
+- Una sola fuente para playlist, player, eventos y estado.
+- Clave: (ruta, tamaño, mtime). Si el archivo cambia, se vuelve a leer
+  (encabezados propios; mutagen solo si son ambiguos).
+- LRU en memoria delante de un caché en disco (shelve/dbm.dumb), así
+  reabrir la app o re-agregar la biblioteca no vuelve a parsear nada.
+- Si la lectura falla (p. ej. un recurso de red que no respondió) se
+  devuelve 0 pero no se guarda: la próxima consulta vuelve a intentar.
+"""
+import os
+import atexit
+import shelve
+import dbm.dumb
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from utils.audio_header import header_seconds
+
+CACHE_FILE = "metadatos_cache"   # dbm.dumb crea .dat / .dir / .bak
+LRU_MAX = 4096
+
+_lock = threading.RLock()
+_lru = OrderedDict()   # ruta -> (tamaño, mtime_ns, segundos)
+_disk = None           # shelve abierto bajo demanda
+_disk_failed = False
+_pending = 0           # escrituras sin sync
+SYNC_EVERY = 500
+
+
+def format_duration(seconds: int) -> str:
+    minutes, seconds = divmod(int(seconds or 0), 60)
+    return f"{minutes:02}:{seconds:02}"
+
+
+def _probe(file_path: str) -> Optional[int]:
+    """
+    Lee la duración real: primero solo encabezados (utils.audio_header) y,
+    si el encabezado es ambiguo, con mutagen (lento: parsea el archivo).
+    None si no se pudo leer (no se guarda en el caché).
+    """
+    seconds = header_seconds(file_path)
+    if seconds is not None:
+        return int(seconds)
+
+    from mutagen.mp3 import MP3
+    from mutagen.wave import WAVE
+    try:
+        low = file_path.lower()
+        if low.endswith('.mp3'):
+            audio = MP3(file_path)
+        elif low.endswith('.wav'):
+            audio = WAVE(file_path)
+        else:
+            return 0
+        return int(getattr(audio.info, "length", 0) or 0)
+    except Exception:
+        return None
+
+
+def _open_disk():
+    """Devuelve el shelve (o None si no se pudo abrir). Ojo: un Shelf vacío es falsy."""
+    global _disk, _disk_failed
+    if _disk is None and not _disk_failed:
+        try:
+            _disk = shelve.Shelf(dbm.dumb.open(CACHE_FILE, "c"))
+        except Exception as e:
+            print(f"⚠️ Caché de metadatos no disponible: {e}")
+            _disk_failed = True
+    return _disk
+
+
+def _remember(file_path, entry):
+    _lru[file_path] = entry
+    _lru.move_to_end(file_path)
+    while len(_lru) > LRU_MAX:
+        _lru.popitem(last=False)
+
+
+def get_seconds(file_path: str) -> int:
+    """Duración en segundos, usando LRU -> disco -> mutagen (en ese orden)."""
+    global _pending
+    if not file_path:
+        return 0
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return 0
+    size, mtime = st.st_size, st.st_mtime_ns
+
+    with _lock:
+        entry = _lru.get(file_path)
+        if entry is not None and entry[0] == size and entry[1] == mtime:
+            _lru.move_to_end(file_path)
+            return entry[2]
+
+        disk = _open_disk()
+        if disk is not None:
+            try:
+                entry = disk.get(file_path)
+            except Exception:
+                entry = None
+            if entry is not None and entry[0] == size and entry[1] == mtime:
+                _remember(file_path, entry)
+                return entry[2]
+
+    # Parseo fuera del lock: otros hilos pueden seguir consultando el caché
+    seconds = _probe(file_path)
+    if seconds is None:
+        return 0
+    entry = (size, mtime, seconds)
+
+    with _lock:
+        _remember(file_path, entry)
+        disk = _open_disk()
+        if disk is not None:
+            try:
+                disk[file_path] = entry
+                _pending += 1
+                if _pending >= SYNC_EVERY:
+                    disk.sync()
+                    _pending = 0
+            except Exception:
+                pass
+    return seconds
+
+
+def get_duration(file_path):
+    """Compatibilidad: devuelve ("MM:SS", segundos) como el get_duration de siempre."""
+    seconds = get_seconds(file_path)
+    return format_duration(seconds), seconds
+
+
+def flush_cache():
+    """Baja a disco el índice pendiente del caché."""
+    global _pending
+    with _lock:
+        if _disk is not None:
+            try:
+                _disk.sync()
+            except Exception:
+                pass
+        _pending = 0
+
+
+def close_cache():
+    global _disk
+    with _lock:
+        if _disk is not None:
+            try:
+                _disk.close()
+            except Exception:
+                pass
+        _disk = None
+
+
+atexit.register(close_cache)
+
+__all__ = ["get_duration", "get_seconds", "format_duration", "flush_cache", "close_cache"]
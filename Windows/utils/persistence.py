@@ -0,0 +1,167 @@
+# utils/persistence.py
+"""
+Autoguardado del estado con escritura diferida (write-behind) sobre bitácora.
+
+- Cada cambio del modelo de la playlist llega como registro (utils.journal) y
+  marca 'hay cambios'; mark_dirty() arma UN timer de Tk, así muchos cambios
+  seguidos (p. ej. soltar 500 archivos) terminan en una sola escritura.
+- Los eventos avisan igual (EventList.subscribe): un registro por alta,
+  reschedule o baja, según ev["id"]. Pueden llegar desde el hilo del
+  programador (disparos); el timer se arma siempre en el hilo de Tk.
+- Al vencer el timer, los registros pendientes (más flags) se agregan al
+  final de la bitácora desde un hilo escritor: el costo es proporcional al
+  cambio, no al tamaño de la biblioteca ni de la lista de eventos.
+- Cada journal.COMPACT_EVERY registros se compacta: snapshot completo con
+  temp + rename (utils.state.write_state) y bitácora nueva.
+- shutdown() hace el último guardado al cerrar y espera al escritor;
+  save_now() fuerza un snapshot (Guardar sobre el archivo del autoguardado).
+"""
+import threading
+from collections import deque
+
+from utils import journal
+from utils import player_state as pst
+from utils.state import STATE_FILE, build_state, write_state
+
+
+class PersistenceService:
+    def __init__(self, target_file=STATE_FILE):
+        self.target_file = target_file
+        self._playlist = None
+        self._event_list = None
+        self._mode_selector = None
+        self._timer = None
+        self._records = []        # registros del modelo y de eventos aún sin bitácora
+        self._records_lock = threading.Lock()   # los de eventos llegan también del programador
+        self._last_flags = None
+        self._cond = threading.Condition()
+        self._jobs = deque()
+        self._writing = False
+        self._thread = None
+
+    def bind(self, playlist, event_list=None, mode_selector=None):
+        """Widgets de los que se arma el snapshot (se llama una vez, tras load_state)."""
+        from utils import events as evmod
+        from utils.playlist_model import model_for
+        self._playlist = playlist
+        self._event_list = event_list
+        self._mode_selector = mode_selector
+        self._last_flags = self._flags()
+        model_for(playlist).subscribe(self._on_model_change)
+        evmod.eventos.subscribe(self._on_event_change)
+
+    # ---------------- lado Tk ----------------
+    def _on_model_change(self, record):
+        with self._records_lock:
+            self._records.append(record)
+        self.mark_dirty()
+
+    def _on_event_change(self, record):
+        from utils.scheduler import scheduler
+        with self._records_lock:
+            self._records.append(record)
+        scheduler.ui(self.mark_dirty)
+
+    def mark_dirty(self, playlist=None):
+        if self._playlist is None and playlist is not None:
+            self._playlist = playlist
+        if self._playlist is None or self._timer is not None:
+            return
+        self._timer = self._playlist.after(pst.autosave_interval_ms, self._flush)
+
+    @property
+    def dirty(self) -> bool:
+        return self._timer is not None
+
+    @staticmethod
+    def _flags():
+        return (pst.play_mode, pst.current_song_index, pst.paused)
+
+    def _flush(self):
+        self._timer = None
+        with self._records_lock:
+            records, self._records = self._records, []
+
+        flags = self._flags()
+        if flags != self._last_flags:
+            records.append(("flags",) + flags)
+            self._last_flags = flags
+
+        if journal.stale or journal.record_count + len(records) > journal.COMPACT_EVERY:
+            self._compact()
+        elif records:
+            journal.record_count += len(records)
+            self._enqueue(("append", records, journal.current_gen))
+
+    def _compact(self):
+        try:
+            state = build_state(self._playlist, self._event_list, self._mode_selector)
+        except Exception as e:
+            print(f"⚠️ No se pudo armar el estado a guardar: {e}")
+            return
+        gen = journal.current_gen + 1
+        state["journal_gen"] = gen
+        journal.current_gen = gen
+        journal.record_count = 0
+        journal.stale = False
+        self._enqueue(("snapshot", state, gen))
+
+    @property
+    def bound(self) -> bool:
+        return self._playlist is not None
+
+    def save_now(self, timeout=5.0):
+        """Snapshot completo ya (menú Guardar sobre el mismo archivo) y espera al escritor."""
+        if self._playlist is None:
+            return
+        journal.stale = True
+        self.shutdown(timeout)
+
+    def shutdown(self, timeout=5.0):
+        """Último guardado (cambios pendientes, flags, eventos) y espera al escritor."""
+        if self._playlist is None:
+            return
+        if self._timer is not None:
+            try:
+                self._playlist.after_cancel(self._timer)
+            except Exception:
+                pass
+        self._flush()
+        with self._cond:
+            self._cond.wait_for(lambda: not self._jobs and not self._writing, timeout)
+
+    # ---------------- hilo escritor ----------------
+    def _enqueue(self, job):
+        with self._cond:
+            if job[0] == "snapshot":
+                self._jobs.clear()   # el snapshot ya incluye lo que estaba en cola
+            self._jobs.append(job)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="autoguardado", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._jobs))
+                kind, payload, gen = self._jobs.popleft()
+                self._writing = True
+            try:
+                if kind == "snapshot":
+                    write_state(payload, self.target_file)
+                    journal.reset_journal(self.target_file, gen)
+                else:
+                    journal.append_records(self.target_file, gen, payload)
+            except Exception as e:
+                print(f"⚠️ No se pudo guardar estado: {e}")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+
+# Instancia compartida
+persistence = PersistenceService()
+
+__all__ = ["PersistenceService", "persistence"]
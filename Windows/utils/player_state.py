@@ -4,9 +4,18 @@ current_song_index = -1
 paused = False
 play_mode = "Orden"
 fade_duration = 2000
+gapless = True              # encolar la pista siguiente para que empalme sin silencio
+crossfade_ms = 0            # cruce entre pistas de la playlist (0 = no)
+crossfade_curve = "potencia"   # "potencia" (volumen percibido parejo) o "lineal"
+event_lookahead_ms = 5000   # decodificar los próximos eventos este tiempo antes (0 = no)
+event_preload_count = 3     # cuántos próximos eventos se precargan
+event_cache_mb = 128        # tope de memoria de los clips de eventos decodificados (LRU; 0 = sin caché)
 song_length = 0
 progress_update_interval = 1000
+show_countdown = True      # contador en consola (el simulador lo apaga: despierta cada segundo)
+autosave_interval_ms = 3000   # como mucho un guardado de estado cada 3 s
 playlist_ref = None
+progress_bar_ref = None
 evento_en_progreso = None
 stopped = False
 _last_countdown_secs = None
@@ -14,6 +23,14 @@ _countdown_active = False
 _event_started_at = None
 _last_finished_id = None
 _finished_reported = False
+_pending_fire = None       # hora a la que disparará el evento en pre-roll (fade en curso)
+_queued_index = None       # gapless: índice de la pista encolada en el mixer
+_queue_handoff = None      # gapless: monotónico del empalme previsto
+_queue_loading = None      # gapless: token del cargador de la pista a encolar
+_loading = None            # token del cargador (utils.cargador) de lo que está por sonar
+_loading_event = None      # evento cuyo archivo se está cargando (None: una pista)
+_load_failures = 0         # pistas seguidas que no se pudieron cargar
+_progress_after = None     # id del root.after de la barra de progreso (una sola cadena)
 
 # NUEVO: solo avanzar la playlist si el usuario presionó Play
 playback_started = False
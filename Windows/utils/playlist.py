@@ -4,9 +4,12 @@ import re
 import pickle
 from urllib.parse import urlparse, unquote
 from tkinter import filedialog
-from mutagen.mp3 import MP3
-from mutagen.wave import WAVE
-from utils.state import save_state
+from utils.persistence import persistence
+from utils.metadata import get_duration
+from utils.probing import prober
+from utils.playlist_model import (
+    model_for, playlist_insert, playlist_delete, playlist_clear, is_queued, find_row, UNKNOWN,
+)
 from utils import player_state as pst  # <-- unificamos estado aquí
 
 allowed_extensions = ['.mp3', '.wav']
@@ -31,9 +34,9 @@ def load_playlist(playlist):
     if file_path:
         with open(file_path, "rb") as f:
             playlist_data = pickle.load(f)
-            playlist.delete(*playlist.get_children())
+            playlist_clear(playlist)
             for song in playlist_data.get("playlist", []):
-                playlist.insert("", "end", values=song)
+                playlist_insert(playlist, song)
 
 def save_playlist(playlist):
     file_path = filedialog.asksaveasfilename(
@@ -43,13 +46,13 @@ def save_playlist(playlist):
     )
     if file_path:
         playlist_data = {
-            "playlist": [playlist.item(item)["values"] for item in playlist.get_children()]
+            "playlist": model_for(playlist).rows()
         }
         with open(file_path, "wb") as f:
             pickle.dump(playlist_data, f)
 
 def new_playlist(playlist):
-    playlist.delete(*playlist.get_children())
+    playlist_clear(playlist)
 
 def update_play_mode(*args):
     """
@@ -73,41 +76,58 @@ def update_play_mode(*args):
     # Actualizamos el estado central
     set_play_mode(mode_selector.get())
 
-    # Guardamos si tenemos playlist
+    # Marcamos cambios si tenemos playlist (el guardado real es diferido)
     if playlist is not None:
-        # event_list y mode_selector son opcionales en save_state
-        save_state(playlist, None, mode_selector)
+        persistence.mark_dirty(playlist)
 
-def get_duration(file_path):
-    try:
-        if file_path.lower().endswith('.mp3'):
-            audio = MP3(file_path)
-        elif file_path.lower().endswith('.wav'):
-            audio = WAVE(file_path)
-        else:
-            return "00:00", 0
-        duration = int(audio.info.length)
-        minutes, seconds = divmod(duration, 60)
-        return f"{minutes:02}:{seconds:02}", duration
-    except Exception:
-        return "00:00", 0
-
-def add_to_playlist(files, playlist):
+def add_to_playlist(files, playlist, validated=False):
+    """
+    Inserta pistas en la playlist (sin duplicados) y devuelve cuántas filas entraron.
+    validated=True: rutas ya comprobadas en otro hilo (utils.ingestion); Tk no toca el disco.
+    """
+    model = model_for(playlist)
+    inserted = 0
     for file_path in files:
-        if os.path.isfile(file_path) and os.path.splitext(file_path)[1].lower() in allowed_extensions:
+        if (validated or os.path.isfile(file_path)) and os.path.splitext(file_path)[1].lower() in allowed_extensions:
+            if model.index_of(file_path) is not None:
+                continue
             file_name = os.path.basename(file_path)
-            file_duration, _ = get_duration(file_path)
-            playlist.insert("", "end", values=(file_name, file_duration, file_path))
-    # Guardamos el estado (parámetros opcionales en save_state)
-    save_state(playlist)
+            # Fila al instante; la duración la llena el prober en segundo plano
+            iid = playlist_insert(playlist, (file_name, UNKNOWN, file_path))
+            prober.submit(playlist, iid, file_path)
+            inserted += 1
+    # Autoguardado diferido (se coalesce); otra marca cuando ya estén las duraciones
+    persistence.mark_dirty(playlist)
+    if prober.busy():
+        prober.when_idle(lambda: persistence.mark_dirty(playlist))
+    return inserted
+
+def iter_music_files(folder_path):
+    """
+    Generador con os.scandir: entrega cada pista apenas la encuentra
+    (mismo orden que os.walk: archivos de la carpeta y luego subcarpetas).
+    """
+    pending = [folder_path]
+    while pending:
+        current = pending.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in allowed_extensions and entry.is_file():
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue  # sin permisos / carpeta que desapareció
+        pending.extend(reversed(subdirs))
+
 
 def find_music_files(folder_path):
-    music_files = []
-    for root_dir, _, files in os.walk(folder_path):
-        for file in files:
-            if os.path.splitext(file)[1].lower() in allowed_extensions:
-                music_files.append(os.path.join(root_dir, file))
-    return music_files
+    return list(iter_music_files(folder_path))
 
 def _parse_dnd_paths_fallback(dnd_data: str):
     if not dnd_data:
@@ -130,20 +150,18 @@ def _parse_dnd_paths_fallback(dnd_data: str):
     return paths
 
 def on_drop(event, root, playlist):
+    from utils.ingestion import ingest_paths  # evita import circular
     try:
         file_paths = root.tk.splitlist(event.data)
     except Exception:
         file_paths = _parse_dnd_paths_fallback(event.data)
 
-    for file_path in file_paths:
-        if os.path.isdir(file_path):
-            music_files = find_music_files(file_path)
-            add_to_playlist(music_files, playlist)
-        elif os.path.isfile(file_path):
-            add_to_playlist([file_path], playlist)
+    # Carpetas en streaming (utils.ingestion): la ventana no se congela
+    ingest_paths(playlist, file_paths)
 
 __all__ = [
     "load_playlist", "save_playlist", "new_playlist", "update_play_mode",
-    "add_to_playlist", "on_drop", "set_play_mode", "get_play_mode"
+    "add_to_playlist", "on_drop", "set_play_mode", "get_play_mode",
+    "playlist_insert", "playlist_delete", "playlist_clear", "is_queued", "find_row"
 ]
 1
\ No newline at end of file
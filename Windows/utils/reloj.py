@@ -0,0 +1,65 @@
+# utils/reloj.py
+"""
+Reloj del programador de eventos.
+
+- monotonic(): para plazos y esperas (no salta con NTP ni cambios de hora).
+- now(): hora de pared derivada del monotónico a partir de un ancla; así
+  dos lecturas seguidas nunca retroceden.
+- reconcile(): compara con la hora de pared real y, si se separaron más de
+  RESYNC_TOLERANCE_S (reloj del sistema ajustado, suspensión...), re-ancla
+  y devuelve el salto en segundos. El hilo del programador lo llama en cada
+  vuelta.
+- set_clock(): reemplaza ambas fuentes (simulaciones, benchmarks).
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+RESYNC_TOLERANCE_S = 0.5
+
+_lock = threading.Lock()
+_wall = datetime.now
+_mono = time.monotonic
+_anchor = None        # (monotónico, hora de pared) del último anclaje
+
+
+def _reanchor():
+    global _anchor
+    _anchor = (_mono(), _wall())
+    return _anchor
+
+
+def monotonic() -> float:
+    return _mono()
+
+
+def now() -> datetime:
+    with _lock:
+        mono0, wall0 = _anchor or _reanchor()
+        return wall0 + timedelta(seconds=_mono() - mono0)
+
+
+def reconcile() -> float:
+    """Re-ancla si la hora de pared se movió respecto al monotónico; devuelve el salto (s)."""
+    with _lock:
+        if _anchor is None:
+            _reanchor()
+            return 0.0
+        mono0, wall0 = _anchor
+        drift = (_wall() - (wall0 + timedelta(seconds=_mono() - mono0))).total_seconds()
+        if abs(drift) > RESYNC_TOLERANCE_S:
+            _reanchor()
+            return drift
+        return 0.0
+
+
+def set_clock(wall=None, mono=None):
+    """Fuentes de tiempo propias (None = las del sistema)."""
+    global _wall, _mono, _anchor
+    with _lock:
+        _wall = wall or datetime.now
+        _mono = mono or time.monotonic
+        _anchor = None
+
+
+__all__ = ["RESYNC_TOLERANCE_S", "monotonic", "now", "reconcile", "set_clock"]
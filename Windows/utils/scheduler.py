@@ -0,0 +1,208 @@
+# utils/scheduler.py
+"""
+Hilo del programador de eventos.
+
+- El núcleo (handle_event_or_next_song, disparos en pre-roll, cálculo del
+  próximo plazo) corre en un hilo propio que duerme hasta un plazo en
+  utils.reloj.monotonic(); un diálogo lento o un mainloop ocupado ya no
+  atrasa los eventos.
+- El estado de reproducción (player_state, audio, eventos) se toca bajo
+  scheduler.lock; los botones del reproductor toman el mismo lock.
+- A Tk solo vuelven las actualizaciones de interfaz: ui(fn) las encola y,
+  si la cola estaba vacía, pide UN root.after(0, ...) que la vacía (desde el
+  hilo de Tk corre directo). Sin nada encolado, Tk no tiene ningún timer.
+  Ese after lo pide un hilo aparte ("aviso-tk"): una llamada a Tk desde otro
+  hilo espera al mainloop, y el programador no puede esperar a Tk con su
+  lock tomado (los botones toman el mismo lock).
+"""
+import heapq
+import itertools
+import queue
+import threading
+
+from utils import player_state as pst
+from utils import reloj
+
+MAX_WAIT_MS = 60000     # tope de sueño: re-sincroniza con la hora de pared al menos así
+
+
+class Scheduler:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._cond = threading.Condition()
+        self._deadline = None        # monotónico de la próxima corrida del handler
+        self._recompute = False      # solo recalcular el plazo (play, alta de evento...)
+        self._timers = []            # (monotónico, seq, fn): disparos en pre-roll
+        self._seq = itertools.count()
+        self._ui = queue.SimpleQueue()
+        self._ui_lock = threading.Lock()
+        self._drain_armed = False    # ya hay un after(0) pedido (o por pedirse) para vaciar _ui
+        self._poke = threading.Event()
+        self._thread = None
+        self._running = False
+        self._root = None
+
+    # ---------------- API ----------------
+    def start(self, root, threaded=True):
+        """
+        Arranca el hilo. threaded=False no crea hilo: quien llama avanza el
+        programador con step() (simulador con reloj virtual).
+        """
+        self._root = root
+        if threaded and self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="programador", daemon=True)
+            self._thread.start()
+            threading.Thread(target=self._notify_tk, name="aviso-tk", daemon=True).start()
+        self.wake_now()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._poke.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def wake_now(self):
+        """Correr el handler ya."""
+        with self._cond:
+            self._deadline = reloj.monotonic()
+            self._cond.notify()
+
+    def rearm(self):
+        """Recalcular el próximo plazo (sin correr el handler)."""
+        with self._cond:
+            self._recompute = True
+            self._cond.notify()
+
+    def call_later(self, delay_ms, fn):
+        """fn() en el hilo del programador dentro de delay_ms (bajo el lock)."""
+        with self._cond:
+            heapq.heappush(self._timers, (reloj.monotonic() + delay_ms / 1000, next(self._seq), fn))
+            self._cond.notify()
+
+    def next_wakeup(self):
+        """Monotónico del próximo vencimiento (handler o disparo), o None."""
+        with self._cond:
+            if self._recompute:
+                return reloj.monotonic()
+            limits = [t for t in (self._deadline, self._timers[0][0] if self._timers else None)
+                      if t is not None]
+            return min(limits) if limits else None
+
+    def step(self):
+        """Una vuelta sin esperar: lo vencido a la hora actual (sin hilo propio)."""
+        with self._cond:
+            timers, run_handler = self._collect()
+        self._pass(timers, run_handler)
+
+    def ui(self, fn):
+        """fn() en el hilo de Tk (directo si ya estamos en él o no hay hilo)."""
+        if self._thread is None or threading.current_thread() is threading.main_thread():
+            fn()
+        else:
+            self._ui.put(fn)
+            with self._ui_lock:
+                if self._drain_armed:
+                    return
+                self._drain_armed = True
+            self._poke.set()
+
+    # ---------------- hilo ----------------
+    def _wait(self):
+        """Bloquea hasta que venza algo; devuelve (timers vencidos, ¿correr handler?)."""
+        with self._cond:
+            while self._running:
+                now = reloj.monotonic()
+                due_timer = self._timers and self._timers[0][0] <= now
+                due_handler = self._deadline is not None and self._deadline <= now
+                if due_timer or due_handler or self._recompute:
+                    break
+                limits = [t for t in (self._deadline, self._timers[0][0] if self._timers else None)
+                          if t is not None]
+                self._cond.wait(min(limits) - now if limits else None)
+            if not self._running:
+                return None, False
+            return self._collect()
+
+    def _collect(self):
+        # Bajo self._cond
+        now = reloj.monotonic()
+        timers = []
+        while self._timers and self._timers[0][0] <= now:
+            timers.append(heapq.heappop(self._timers)[2])
+        run_handler = self._deadline is not None and self._deadline <= now
+        self._deadline = None
+        self._recompute = False
+        return timers, run_handler
+
+    def _run(self):
+        while True:
+            timers, run_handler = self._wait()
+            if timers is None:
+                return
+            jump = reloj.reconcile()
+            if jump:
+                print(f"⚠️ La hora del sistema cambió {jump:+.1f} s; se recalculan los plazos")
+            self._pass(timers, run_handler)
+
+    def _pass(self, timers, run_handler):
+        """Corre lo vencido y deja armado el próximo plazo."""
+        from utils.programacion import handle_event_or_next_song, next_deadline_ms
+        with self.lock:
+            for fn in timers:
+                try:
+                    fn()
+                except Exception as e:
+                    print(f"⚠️ Error en disparo programado: {e}")
+            if run_handler:
+                try:
+                    handle_event_or_next_song(self._root, pst.progress_bar_ref, pst.playlist_ref)
+                except Exception as e:
+                    print(f"⚠️ Error en el loop de eventos: {e}")
+            try:
+                delay = next_deadline_ms(reloj.now())
+            except Exception as e:
+                print(f"⚠️ Error calculando el próximo plazo: {e}")
+                delay = None
+        deadline = reloj.monotonic() + (MAX_WAIT_MS if delay is None else delay) / 1000
+        with self._cond:
+            # Un wake_now() que llegó mientras corría el handler manda
+            if self._deadline is None or deadline < self._deadline:
+                self._deadline = deadline
+
+    # ---------------- lado Tk ----------------
+    def _notify_tk(self):
+        while True:
+            self._poke.wait()
+            self._poke.clear()
+            if not self._running:
+                return
+            try:
+                self._root.after(0, self._drain_ui)
+            except Exception as e:      # Tk ya cerrado
+                print(f"⚠️ No se pudo avisar a la interfaz: {e}")
+                return
+
+    def _drain_ui(self):
+        with self._ui_lock:
+            self._drain_armed = False    # lo que llegue desde ahora pide otro after
+        while True:
+            try:
+                fn = self._ui.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn()
+            except Exception as e:
+                print(f"⚠️ Error actualizando la interfaz: {e}")
+
+
+scheduler = Scheduler()
+
+__all__ = ["Scheduler", "scheduler", "MAX_WAIT_MS"]
@@ -7,6 +7,10 @@ import os.path as _osp
 
 STATE_FILE = "estado_reproductor.pkl"
 
+def _journaled(path: str) -> bool:
+    """¿Es el archivo del autoguardado? (rutas relativas o absolutas, igual da)."""
+    return _osp.normcase(_osp.abspath(path)) == _osp.normcase(_osp.abspath(STATE_FILE))
+
 def _format_repeat(intervalo: Optional[int]) -> str:
     if not intervalo:
         return "Una sola vez"
@@ -16,21 +20,38 @@ def _format_repeat(intervalo: Optional[int]) -> str:
         return f"Cada {intervalo // 60} Minutos"
     return f"Cada {intervalo} Segundos"
 
-def _get_duration_local(file_path: str):
-    try:
-        from mutagen.mp3 import MP3
-        from mutagen.wave import WAVE
-        if file_path and file_path.lower().endswith(".mp3"):
-            audio = MP3(file_path)
-        elif file_path and file_path.lower().endswith(".wav"):
-            audio = WAVE(file_path)
-        else:
-            return "00:00", 0
-        duration = int(getattr(audio.info, "length", 0) or 0)
-        m, s = divmod(duration, 60)
-        return f"{m:02}:{s:02}", duration
-    except Exception:
-        return "00:00", 0
+def build_state(
+    playlist,
+    event_list: Optional[object] = None,
+    mode_selector: Optional[object] = None,
+) -> dict:
+    from utils import events as evmod
+    from utils import player_state as pst
+    from utils.playlist_model import model_for
+
+    playlist_rows = model_for(playlist).rows() if playlist else []
+    event_rows = [event_list.item(item)["values"] for item in event_list.get_children()] if event_list else []
+    with evmod.eventos.lock:   # el hilo del programador también la toca
+        eventos = [dict(e) for e in evmod.eventos]
+
+    return {
+        "play_mode": pst.play_mode,
+        "current_song_index": pst.current_song_index,
+        "paused": pst.paused,
+        "playlist": playlist_rows,
+        "event_list": event_rows,
+        # copias: el hilo escritor no debe ver eventos a medio modificar
+        "eventos": eventos,
+    }
+
+def write_state(state: dict, target_file: str):
+    """Escritura atómica: archivo temporal + os.replace (nunca queda un .pkl a medias)."""
+    tmp_file = f"{target_file}.tmp"
+    with open(tmp_file, "wb") as f:
+        pickle.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, target_file)
 
 def save_state(
     playlist,
@@ -38,47 +59,87 @@ def save_state(
     mode_selector: Optional[object] = None,
     file_path: Optional[str] = None,
 ):
-    from utils import events as evmod
-    from utils import player_state as pst
-
     target_file = file_path if file_path else STATE_FILE
-
     try:
-        playlist_rows = [playlist.item(item)["values"] for item in playlist.get_children()] if playlist else []
-        event_rows = [event_list.item(item)["values"] for item in event_list.get_children()] if event_list else []
-
-        state = {
-            "play_mode": pst.play_mode,
-            "current_song_index": pst.current_song_index,
-            "paused": pst.paused,
-            "playlist": playlist_rows,
-            "event_list": event_rows,
-            "eventos": evmod.eventos,
-        }
-        with open(target_file, "wb") as f:
-            pickle.dump(state, f)
+        if not _journaled(target_file):
+            write_state(build_state(playlist, event_list, mode_selector), target_file)
+            return
+        from utils import journal
+        from utils.persistence import persistence
+        if persistence.bound:
+            # Que lo escriba el autoguardado: mismo hilo escritor, mismo gen
+            persistence.save_now()
+            return
+        # Snapshot con gen nuevo y bitácora vacía: la vieja no se reaplica encima
+        state = build_state(playlist, event_list, mode_selector)
+        gen = journal.current_gen + 1
+        state["journal_gen"] = gen
+        write_state(state, target_file)
+        journal.reset_journal(target_file, gen)
+        journal.current_gen = gen
+        journal.record_count = 0
+        journal.stale = False
     except Exception as e:
         print(f"⚠️ No se pudo guardar estado: {e}")
 
+def _read_with_journal(target_file: str) -> Optional[dict]:
+    """
+    Snapshot + replay de la bitácora (solo para STATE_FILE).
+    Deja en utils.journal el gen vigente y si la bitácora en disco quedó vieja.
+    """
+    from utils import journal
+
+    snapshot_exists = os.path.exists(target_file)
+    state = {}
+    if snapshot_exists:
+        with open(target_file, "rb") as f:
+            state = pickle.load(f)
+    if not _journaled(target_file):
+        return state if snapshot_exists else None
+
+    snap_gen = state.get("journal_gen") if snapshot_exists else 0
+    jgen, records = journal.read_journal(target_file)
+    if not snapshot_exists and jgen is None:
+        return None
+
+    journal.current_gen = snap_gen or 0
+    journal.record_count = 0
+    # Snapshot viejo (sin gen) o bitácora de otra generación: compactar en el próximo guardado
+    journal.stale = snap_gen is None or (jgen is not None and jgen != snap_gen)
+    if jgen is not None and jgen == snap_gen and records:
+        journal.replay(state, records)
+        journal.record_count = len(records)
+    # Eventos sin "id" (guardados antes de la bitácora por evento): snapshot nuevo con ids
+    if any(isinstance(e, dict) and not e.get("id") for e in state.get("eventos") or []):
+        journal.stale = True
+    return state
+
 def load_state(playlist, event_list, mode_selector: Optional[object], file_path: Optional[str] = None):
     from utils import events as evmod
     from utils import player_state as pst
+    from utils.metadata import get_duration
+    from utils.playlist_model import model_for, render, parse_duration
+    from utils.probing import prober
 
     target_file = file_path if file_path else STATE_FILE
-    if not os.path.exists(target_file):
-        return
-
     try:
-        with open(target_file, "rb") as f:
-            state = pickle.load(f)
+        state = _read_with_journal(target_file)
     except Exception as e:
         print(f"⚠️ No se pudo cargar estado: {e}")
         return
+    if state is None:
+        return
 
     try:
-        playlist.delete(*playlist.get_children())
+        # El modelo se llena en Python y el Treeview se pinta una sola vez
+        model = model_for(playlist)
+        model.clear()
         for row in state.get("playlist", []):
-            playlist.insert("", "end", values=row)
+            if len(row) >= 3:
+                model.append(row[0], parse_duration(row[1]), row[2])
+        render(playlist)
+        for pos in model.unknown_positions():
+            prober.submit(playlist, model.iids[pos], model.paths[pos])
 
         event_list.delete(*event_list.get_children())
 
@@ -99,7 +160,7 @@ def load_state(playlist, event_list, mode_selector: Optional[object], file_path:
 
                     file_name = _osp.basename(archivo) if archivo else (nombre or "")
                     hora_str = hora_inicio.strftime("%H:%M:%S")
-                    dur_str, _ = _get_duration_local(archivo) if archivo else ("00:00", 0)
+                    dur_str, _ = get_duration(archivo) if archivo else ("00:00", 0)
                     rep_text = _format_repeat(intervalo)
 
                     event_list.insert("", "end", values=(file_name, hora_str, dur_str, rep_text))
@@ -156,9 +217,8 @@ def load_state(playlist, event_list, mode_selector: Optional[object], file_path:
         if mode_selector is not None and hasattr(mode_selector, "set"):
             mode_selector.set(loaded_mode)
 
-        items = playlist.get_children()
-        if 0 <= loaded_index < len(items):
-            song_id = items[loaded_index]
+        if 0 <= loaded_index < len(model):
+            song_id = model.iids[loaded_index]
             playlist.selection_set(song_id)
             playlist.focus(song_id)
 